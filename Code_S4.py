@@ -1,28 +1,31 @@
 #This code takes the top 1000 Dockers and outputs only the ones with links on ChemSpider in a new spreadsheet. This was used to generate datasets for both top PFAS binder models.
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 
-def search_chemspider_link(cas_number):
-    search_url = f"https://legacy.chemspider.com/Search.aspx?q={cas_number}"
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    response = requests.get(search_url, headers=headers)
+from chemspider_client import default_client, search_url
+from chemspider_extract import extract
 
+def search_chemspider_link(cas_number, response): #Takes the search page fetched by the shared ChemSpider client
+    if response.error:
+        print(f"Error searching ChemSpider for {cas_number}: {response.error}")
+        return None
     if response.status_code == 200: #Check if server response is successful (=200)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        result_message = soup.find('h3', id="ctl00_ctl00_ContentSection_ContentPlaceHolder1_ResultStatementControl1_plhCountMessage")
-        if result_message and "Found 1 result" in result_message.text: #Checks if the result message indicates exactly one result found
+        if extract(response.text).single_hit: #Checks if the result message indicates exactly one result found
             return response.url
         else:
             print(f"No single result found for {cas_number}, or the result message was not found.")
+    else:
+        print(f"Failed to search ChemSpider for {cas_number} (Status Code: {response.status_code})")
     return None
 
 def process_chemicals(input_file, output_file):
     df = pd.read_excel(input_file)
     new_data = []
 
-    for index, row in df.iterrows():
-        chemspider_link = search_chemspider_link(row['CASRN'])
+    with default_client() as client: #Runs all searches concurrently (cached, rate limited)
+        responses = client.fetch_many(search_url(cas) for cas in df['CASRN'])
+
+    for (index, row), response in zip(df.iterrows(), responses):
+        chemspider_link = search_chemspider_link(row['CASRN'], response)
         if chemspider_link: #Checks if a valid ChemSpider link is found and adds it to the new spreadsheet
             new_row = {
                 'CASRN': row['CASRN'],
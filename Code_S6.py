@@ -1,21 +1,20 @@
 #This code creates a new spreadsheet with ChemSpider links for each chemical using each chemical's CASRN. This was used to prepare each spreadsheet for web-scraping.
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 
-def search_chemspider_link(cas_number):
-    search_url = f"https://legacy.chemspider.com/Search.aspx?q={cas_number}"
-    headers = {'User-Agent': 'Mozilla/5.0'} #Only uses Mozilla
-    response = requests.get(search_url, headers=headers)
+from chemspider_client import default_client, search_url
+from chemspider_extract import extract
 
+def search_chemspider_link(cas_number, response): #Takes the search page fetched by the shared ChemSpider client
+    if response.error:
+        print(f"Error searching ChemSpider for {cas_number}: {response.error}")
+        return None
     if response.status_code == 200:
-        soup = BeautifulSoup(response.text, 'html.parser')
-        result_message = soup.find('h3', id="ctl00_ctl00_ContentSection_ContentPlaceHolder1_ResultStatementControl1_plhCountMessage")
-
-        if result_message and "Found 1 result" in result_message.text: #Returns the chemical's link if it exists for the chemical's CASRN
+        if extract(response.text).single_hit: #Returns the chemical's link if it exists for the chemical's CASRN
             return response.url
         else:
             print(f"No single result found for {cas_number}, or the result message was not found.")
+    else:
+        print(f"Failed to search ChemSpider for {cas_number} (Status Code: {response.status_code})")
     return None
 
 def process_chemicals(input_file, output_file):
@@ -24,10 +23,14 @@ def process_chemicals(input_file, output_file):
     if 'ChemSpyder Link' not in data.columns:
         data['ChemSpyder Link'] = None
 
+    searches = {index: cas_number for index, cas_number in data['CASRN'].items() if pd.notna(cas_number)}
+    with default_client() as client: #Runs all searches concurrently (cached, rate limited)
+        responses = dict(zip(searches, client.fetch_many(search_url(cas) for cas in searches.values())))
+
     for index, row in data.iterrows(): #Puts each link in spreadsheet
         cas_number = row['CASRN']
         if pd.notna(cas_number):
-            chemspider_link = search_chemspider_link(cas_number)
+            chemspider_link = search_chemspider_link(cas_number, responses[index])
             if chemspider_link:
                 data.at[index, 'ChemSpyder Link'] = chemspider_link
                 print(f"Added {cas_number} with link: {chemspider_link}")
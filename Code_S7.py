@@ -2,38 +2,26 @@
 #This code was specifically used to generate the spreadsheet for the commonly exposed PFAS.
 import pandas as pd
 import re
-import requests
-from bs4 import BeautifulSoup
 import csv
 
+from chemspider_client import default_client
+from chemspider_extract import extract
+
 def extract_first_number(value): #Function to extract first number from a string 
     match = re.search(r"[-+]?\d*\.\d+|\d+", value)
     return match.group(0) if match else ''
 
-def scrape_properties(url):
-    headers = { #This specifies the User-Agent part of the HTTP request
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.183 Safari/537.36'
-    }
-    try: #This process locates the numbers within the database
-        response = requests.get(url, headers=headers) 
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            properties = {}
-            rows = soup.find_all('tr')
-            for row in rows:
-                title_tag = row.find('td', class_='prop_title')
-                value_tag = row.find('td', class_='prop_value_nowrap') or row.find('td', class_='prop_value')
-                if title_tag and value_tag:
-                    title = title_tag.get_text(strip=True)
-                    value = value_tag.get_text(strip=True)
-                    cleaned_value = extract_first_number(value)
-                    properties[title] = cleaned_value
-            return properties
-        else:
-            print(f"Failed to fetch: {url}, Status Code: {response.status_code}")
-            return {}
-    except Exception as e:
-        print(f"Error fetching URL: {url}, {e}")
+def scrape_properties(url, response): #Takes the page fetched by the shared ChemSpider client
+    if response.error:
+        print(f"Error fetching URL: {url}, {response.error}")
+        return {}
+    if response.status_code == 200: #This process locates the numbers within the database
+        properties = {}
+        for title, value in extract(response.text).properties.items(): #prop_title / prop_value cells
+            properties[title] = extract_first_number(value)
+        return properties
+    else:
+        print(f"Failed to fetch: {url}, Status Code: {response.status_code}")
         return {}
 
 def main():
@@ -57,8 +45,11 @@ def main():
     all_properties = {}
     all_titles = set()
 
-    for url in urls:
-        properties = scrape_properties(url)
+    with default_client() as client: #Fetches all pages concurrently (cached, rate limited)
+        responses = client.fetch_many(urls)
+
+    for url, response in zip(urls, responses):
+        properties = scrape_properties(url, response)
         all_properties[url] = properties
         all_titles.update(properties.keys())
 
@@ -0,0 +1,171 @@
+"""
+Leverage-based applicability domain (Williams plot) of the QSPR models (replaces Code_S11.R).
+
+For an MLR model fitted on n training compounds with p descriptors, the
+leverage of a compound with descriptor row x is h = x' (A'A)^-1 x, where A
+is the training design matrix with an intercept column. A is factorized
+once (A = QR); training leverages are the squared row norms of Q, and any
+batch of query compounds is scored with one triangular solve against R.
+The warning leverage is h* = 3(p + 1)/n. Residuals are standardized as R's
+rstandard() does for training compounds (e / s√(1 - h)) and as prediction
+errors (e / s√(1 + h)) for compounds outside the fit. A compound is outside
+the domain when h > h* or, if its pIC50 is known, |standardized residual| > 3.
+
+    python applicability_domain.py --model "Top Binders ERα"
+    python applicability_domain.py --model "Commonly Exposed ERβ" --query candidates.csv --output williams.csv
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+import qspr_models
+import supplementary_tables
+
+RESIDUAL_LIMIT = 3.0
+WILLIAMS_COLUMNS = ["CASRN", "Set", "pIC50", "Predicted pIC50", "Leverage", "Standardized Residual",
+                    "Outside Leverage", "Outside Residual", "Outside AD"]
+
+
+class ApplicabilityDomain:
+    """Leverages and standardized residuals from one QR factorization of the training design matrix."""
+
+    def __init__(self, X, residuals):
+        X = np.asarray(X, dtype=float)
+        residuals = np.asarray(residuals, dtype=float)
+        self.n, self.p = X.shape
+        if self.n <= self.p + 1:
+            raise ValueError(f"{self.n} training compounds are too few for {self.p} descriptors")
+        # Leverage does not change under column scaling; standardizing keeps R well conditioned
+        self.center = X.mean(axis=0)
+        self.scale = X.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        q, self.r = np.linalg.qr(self._design(X))
+        diagonal = np.abs(np.diag(self.r))
+        if diagonal.min() <= 1e-10 * diagonal.max():
+            raise ValueError("the training descriptors are collinear (rank deficient); leverage is undefined")
+        self.training_leverage = np.einsum("ij,ij->i", q, q)
+        self.h_star = 3 * (self.p + 1) / self.n
+        self.s = np.sqrt(residuals @ residuals / (self.n - self.p - 1))
+        self.training_residuals = residuals / (self.s * np.sqrt(np.clip(1 - self.training_leverage, 1e-12, None)))
+
+    def _design(self, X):
+        return np.column_stack([np.ones(len(X)), (X - self.center) / self.scale])
+
+    def leverage(self, X):
+        """Leverages of a batch of query rows (n_query x p)."""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        if X.shape[1] != self.p:
+            raise ValueError(f"query has {X.shape[1]} descriptors, the model {self.p}")
+        z = np.linalg.solve(self.r.T, self._design(X).T) # R' z = a for every query row a
+        return np.einsum("ij,ij->j", z, z)
+
+    def prediction_residuals(self, residuals, leverage):
+        """Standardize residuals of compounds outside the fit: e / s√(1 + h)."""
+        return np.asarray(residuals, dtype=float) / (self.s * np.sqrt(1 + np.asarray(leverage)))
+
+
+def domain_for(model, data, fitted_rows):
+    """Build the ApplicabilityDomain of a qspr_models fit from its fitted rows."""
+    X = data[model.descriptors].to_numpy(dtype=float)[fitted_rows]
+    residuals = data["pIC50"].to_numpy(dtype=float)[fitted_rows] - model.predict(X)
+    return ApplicabilityDomain(X, residuals)
+
+
+def score(domain, model, queries, ids=None, set_name="Query"):
+    """Williams table rows for query compounds (DataFrame with the model descriptors, optional pIC50)."""
+    predicted = model.predict(queries)
+    leverage = domain.leverage(queries[model.descriptors].to_numpy(dtype=float))
+    observed = queries["pIC50"].to_numpy(dtype=float) if "pIC50" in queries else np.full(len(queries), np.nan)
+    residuals = domain.prediction_residuals(observed - predicted, leverage)
+    table = pd.DataFrame({
+        "CASRN": list(ids) if ids is not None else [f"{set_name} {i + 1}" for i in range(len(queries))],
+        "Set": set_name,
+        "pIC50": observed,
+        "Predicted pIC50": predicted,
+        "Leverage": leverage,
+        "Standardized Residual": residuals,
+    })
+    return _flag(table, domain)
+
+
+def _flag(table, domain):
+    table["Outside Leverage"] = table["Leverage"] > domain.h_star
+    table["Outside Residual"] = table["Standardized Residual"].abs() > RESIDUAL_LIMIT # NaN (no pIC50) compares False
+    table["Outside AD"] = table["Outside Leverage"] | table["Outside Residual"]
+    return table
+
+
+def williams_table(domain, model, data, fitted_rows):
+    """Williams table of a model's compounds: fitted rows (as rstandard) and the remaining rows (as predictions)."""
+    fitted = data[fitted_rows]
+    training = pd.DataFrame({
+        "CASRN": fitted["CASRN"].to_numpy(),
+        "Set": fitted["Set"].to_numpy(),
+        "pIC50": fitted["pIC50"].to_numpy(dtype=float),
+        "Predicted pIC50": model.predict(fitted),
+        "Leverage": domain.training_leverage,
+        "Standardized Residual": domain.training_residuals,
+    })
+    tables = [_flag(training, domain)]
+    rest = data[~fitted_rows]
+    if len(rest):
+        scored = score(domain, model, rest, rest["CASRN"].to_numpy())
+        scored["Set"] = rest["Set"].to_numpy()
+        tables.append(scored)
+    return pd.concat(tables, ignore_index=True)[WILLIAMS_COLUMNS]
+
+
+def read_queries(path, descriptors):
+    """Read query compounds from CSV/Excel; descriptor columns may use the display or workbook names."""
+    queries = pd.read_excel(path) if str(path).lower().endswith((".xlsx", ".xls")) else pd.read_csv(path)
+    return match_descriptor_columns(queries, descriptors)
+
+
+def match_descriptor_columns(queries, descriptors):
+    """Rename query columns to the descriptor names (matched like the workbooks); raise KeyError if any is missing."""
+    columns = [str(column) for column in queries.columns]
+    renames = {}
+    for name in descriptors:
+        column = (supplementary_tables.find_column(columns, name)
+                  or supplementary_tables.find_column(columns, qspr_models.DESCRIPTORS[name]))
+        if column is None:
+            raise KeyError(f"No column for {name}; available columns are: " + ", ".join(columns))
+        renames[column] = name
+    pic50 = supplementary_tables.find_column(columns, "pIC50")
+    if pic50:
+        renames[pic50] = "pIC50"
+    return queries.rename(columns=renames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Williams plot data (leverage, standardized residuals) of a QSPR model.")
+    parser.add_argument("--model", choices=list(qspr_models.MODELS), default="Top Binders ERα")
+    parser.add_argument("--query", help="CSV or Excel file of candidate compounds with the 11 descriptor columns")
+    parser.add_argument("--id-column", default="CASRN", help="identifier column of the query file")
+    parser.add_argument("--output", help="write the Williams table to this CSV")
+    args = parser.parse_args()
+
+    data = qspr_models.model_data(args.model)
+    model, rows = qspr_models.fit_model(data)
+    domain = domain_for(model, data, rows)
+    table = williams_table(domain, model, data, rows)
+    print(f"{args.model}: n = {domain.n}, p = {domain.p}, h* = {domain.h_star:.3f}")
+    for set_name, group in table.groupby("Set", sort=False):
+        print(f"  {set_name}: {group['Outside AD'].sum()} of {len(group)} outside the domain")
+    if args.query:
+        queries = read_queries(args.query, model.descriptors)
+        ids = queries[args.id_column].astype(str).to_numpy() if args.id_column in queries else None
+        scored = score(domain, model, queries, ids)
+        print(scored.round(4).to_string(index=False))
+        table = pd.concat([table, scored], ignore_index=True)
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"Saved {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,112 @@
+"""
+Compare the chemspider_extract backends on a corpus of saved ChemSpider pages:
+    bs4     - BeautifulSoup(html.parser) with a find() per <tr> (what the scripts did)
+    lxml    - lxml.html + XPath
+    stream  - standard library tokenizer, no tree
+
+Every backend's result is checked against bs4 and the parse time per page
+is reported. Pages come from the chemspider_client cache and/or a folder of
+saved .html files.
+
+Usage:
+    python benchmark_html_extraction.py [--cache chemspider_cache.sqlite] [--pages saved_pages/] [--csv results.csv]
+"""
+
+import argparse
+import csv
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import chemspider_extract
+from chemspider_client import DEFAULT_CACHE_PATH
+
+
+def load_corpus(cache_path=None, pages_dir=None):
+    """Return [(name, html)] from the response cache and a folder of .html files."""
+    pages = []
+    if cache_path and Path(cache_path).exists():
+        db = sqlite3.connect(str(cache_path))
+        try:
+            pages += db.execute("SELECT url, body FROM responses WHERE status = 200 ORDER BY url").fetchall()
+        finally:
+            db.close()
+    if pages_dir:
+        for path in sorted(Path(pages_dir).glob("*.htm*")):
+            pages.append((path.name, path.read_text(encoding="utf-8", errors="replace")))
+    return pages
+
+
+def time_backend(backend, html, repeat):
+    """Return (result, best seconds over repeat runs)."""
+    extract = chemspider_extract.BACKENDS[backend]
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = extract(html)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def run_benchmark(pages, backends, repeat=3):
+    rows = []
+    for name, html in pages:
+        row = {"page": name, "kb": len(html.encode()) / 1024}
+        reference = None
+        for backend in backends:
+            result, seconds = time_backend(backend, html, repeat)
+            if reference is None:
+                reference = result
+            row[f"{backend}_ms"] = seconds * 1000
+            row[f"{backend}_match"] = result == reference
+            row["properties"] = len(reference.properties)
+        rows.append(row)
+    return rows
+
+
+def print_summary(rows, backends):
+    total_kb = sum(row["kb"] for row in rows)
+    print(f"{len(rows)} pages, {total_kb:.0f} KB of HTML, "
+          f"{sum(row['properties'] for row in rows) / len(rows):.1f} properties per page")
+    reference_ms = sum(row[f"{backends[0]}_ms"] for row in rows)
+    print(f"{'Backend':<10}{'ms/page':>10}{'MB/s':>10}{'vs ' + backends[0]:>10}{'Mismatches':>12}")
+    for backend in backends:
+        ms = sum(row[f"{backend}_ms"] for row in rows)
+        mismatches = sum(not row[f"{backend}_match"] for row in rows)
+        print(f"{backend:<10}{ms / len(rows):>10.2f}{total_kb / 1024 / (ms / 1000):>10.1f}"
+              f"{reference_ms / ms:>9.1f}x{mismatches:>12}")
+    for row in rows:
+        different = [backend for backend in backends if not row[f"{backend}_match"]]
+        if different:
+            print(f"  {row['page']}: {', '.join(different)} differ from {backends[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML extraction backends on saved ChemSpider pages.")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="chemspider_client SQLite cache to read pages from")
+    parser.add_argument("--pages", help="folder of saved .html pages")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per page and backend (best time is kept)")
+    parser.add_argument("--csv", help="write per-page results to this file")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.cache, args.pages)
+    if not pages:
+        print("No pages found; fetch some with chemspider_client.py or pass --pages")
+        return False
+    # bs4 first: it is the reference the other backends are compared with
+    backends = sorted(chemspider_extract.available_backends(), key=lambda name: name != "bs4")
+    rows = run_benchmark(pages, backends, args.repeat)
+    print_summary(rows, backends)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Saved {args.csv}")
+    return all(row[f"{backend}_match"] for row in rows for backend in backends)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,99 @@
+"""
+Compare what the viewer sends to the browser for every complex:
+    inline   - create_ngl_viewer HTML with the PDB embedded as base64
+    pdb.gz   - gzip PDB static file (static_structures)
+    qsb      - binary structure_codec encoding, raw and gzipped (what the viewer loads now)
+
+Usage:
+    python benchmark_structure_transfer.py [--csv results.csv]
+"""
+
+import argparse
+import csv
+import gzip
+import sys
+import time
+
+import complex_pack
+import structure_codec
+from inline_viewer import create_ngl_viewer
+
+METHODS = ["inline", "pdb_gz", "qsb", "qsb_gz"]
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def measure_complex(data, name):
+    """Return {method: (payload bytes, seconds)} for one complex."""
+    html, inline_time = _timed(lambda: create_ngl_viewer(data.decode(), name))
+    pdb_gz, pdb_gz_time = _timed(gzip.compress, data, 6)
+    qsb, qsb_time = _timed(structure_codec.encode_structure, data)
+    qsb_gz, qsb_gz_time = _timed(gzip.compress, qsb, 6)
+    return {
+        "inline": (len(html.encode()), inline_time),
+        "pdb_gz": (len(pdb_gz), pdb_gz_time),
+        "qsb": (len(qsb), qsb_time),
+        "qsb_gz": (len(qsb_gz), qsb_time + qsb_gz_time),
+    }
+
+
+def run_benchmark(folders):
+    rows = []
+    for folder in folders:
+        pack = complex_pack.open_pack(folder)
+        files = complex_pack.find_complex_files(folder)
+        ligands = list(files) if files or pack is None else pack.ligands()
+        for casrn in ligands:
+            # The same read path as the app's load_complex
+            data = complex_pack.read_complex(folder, casrn, pack)
+            row = {"folder": folder, "casrn": casrn, "pdb": len(data)}
+            for method, (size, seconds) in measure_complex(data, casrn).items():
+                row[f"{method}_bytes"] = size
+                row[f"{method}_ms"] = seconds * 1000
+            rows.append(row)
+    return rows
+
+
+def print_summary(rows):
+    print(f"{'Folder':<20}{'Files':>6}{'PDB KB':>10}" + "".join(f"{m + ' KB':>12}" for m in METHODS))
+    for folder in dict.fromkeys(row["folder"] for row in rows):
+        subset = [row for row in rows if row["folder"] == folder]
+        print(f"{folder:<20}{len(subset):>6}{sum(r['pdb'] for r in subset) / 1024:>10.0f}"
+              + "".join(f"{sum(r[f'{m}_bytes'] for r in subset) / 1024:>12.0f}" for m in METHODS))
+
+    total_pdb = sum(row["pdb"] for row in rows)
+    total_inline = sum(row["inline_bytes"] for row in rows)
+    print(f"\n{len(rows)} complexes, {total_pdb / 1024:.0f} KB of PDB text")
+    for method in METHODS:
+        size = sum(row[f"{method}_bytes"] for row in rows)
+        ms = sum(row[f"{method}_ms"] for row in rows)
+        print(f"  {method:<8}{size / 1024:>9.0f} KB  {total_inline / size:>5.1f}x smaller than inline"
+              f"  {ms / len(rows):>7.2f} ms/complex to prepare")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark structure payloads sent to the 3D viewer.")
+    parser.add_argument("folders", nargs="*", default=complex_pack.DATASET_FOLDERS)
+    parser.add_argument("--csv", help="write per-complex results to this file")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.folders)
+    if not rows:
+        print("No complexes found")
+        return False
+    print_summary(rows)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Saved {args.csv}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,186 @@
+"""
+Binding-pocket extraction for the receptor pages.
+
+Keeps only the receptor residues that have at least one atom within a given
+radius of the docked UNL ligand. Neighbor search uses a cell list (uniform
+grid) built once per receptor with NumPy, so a pocket query only measures
+distances to the atoms in the grid cells around the ligand instead of all
+~2,300 receptor atoms.
+
+    index = ReceptorIndex(receptor_bytes)
+    pocket = index.pocket(ligand_coordinates(ligand_bytes), radius=6.0)
+    pocket.pdb        # receptor ATOM + CONECT records of the pocket residues
+    pocket.residues   # [(chain, residue name, residue number), ...]
+"""
+
+import argparse
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+import complex_pack
+from coordinate_store import parse_pdb_atoms
+
+DEFAULT_RADIUS = 6.0
+
+Pocket = namedtuple("Pocket", ["pdb", "residues", "atom_count", "receptor_atom_count"])
+
+
+class CellList:
+    """Uniform grid over a fixed set of points for fixed-radius neighbor queries."""
+
+    def __init__(self, coords, cell_size=DEFAULT_RADIUS):
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+        self.cell_size = float(cell_size)
+        if len(self.coords):
+            self.origin = self.coords.min(axis=0)
+        else:
+            self.origin = np.zeros(3)
+        cells = self._cells(self.coords)
+        self.shape = cells.max(axis=0) + 1 if len(cells) else np.ones(3, dtype=np.int64)
+        keys = np.ravel_multi_index(cells.T, self.shape)
+        # Points sorted by cell; each occupied cell is a contiguous run of self.order
+        self.order = np.argsort(keys, kind="stable")
+        self.cell_keys, self.cell_starts, counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+        self.cell_stops = self.cell_starts + counts
+
+    def _cells(self, points):
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+    def candidates(self, points, radius):
+        """Return indices of the points in every cell that can lie within radius of points."""
+        reach = int(np.ceil(radius / self.cell_size))
+        steps = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(steps, steps, steps, indexing="ij"), axis=-1).reshape(-1, 3)
+        cells = (self._cells(np.asarray(points, dtype=np.float64).reshape(-1, 3))[:, None, :] + offsets).reshape(-1, 3)
+        cells = cells[((cells >= 0) & (cells < self.shape)).all(axis=1)]
+        keys = np.unique(np.ravel_multi_index(cells.T, self.shape))
+        found = np.searchsorted(self.cell_keys, keys)
+        found = found[found < len(self.cell_keys)]
+        found = found[np.isin(self.cell_keys[found], keys)]
+        starts, stops = self.cell_starts[found], self.cell_stops[found]
+        counts = stops - starts
+        # Concatenate the ranges starts[i]:stops[i] without a Python loop
+        positions = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts) + np.arange(counts.sum())
+        return self.order[positions]
+
+    def pairs(self, points, radius):
+        """Return (query indices, point indices) of every query/indexed point pair within radius.
+
+        All query points are handled in one vectorized pass, e.g. every ligand
+        atom of a dataset against the receptor.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if not len(points) or not len(self.coords):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        reach = int(np.ceil(radius / self.cell_size))
+        steps = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(steps, steps, steps, indexing="ij"), axis=-1).reshape(-1, 3)
+        cells = self._cells(points)[:, None, :] + offsets
+        valid = ((cells >= 0) & (cells < self.shape)).all(axis=2)
+        query = np.repeat(np.arange(len(points)), len(offsets))[valid.ravel()]
+        keys = np.ravel_multi_index(cells[valid].T, self.shape)
+        found = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+        occupied = self.cell_keys[found] == keys
+        query, found = query[occupied], found[occupied]
+        starts = self.cell_starts[found]
+        counts = self.cell_stops[found] - starts
+        query = np.repeat(query, counts)
+        positions = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts) + np.arange(counts.sum())
+        candidates = self.order[positions]
+        deltas = self.coords[candidates] - points[query]
+        close = np.einsum("ij,ij->i", deltas, deltas) <= radius * radius
+        return query[close], candidates[close]
+
+    def within(self, points, radius):
+        """Return a boolean mask of the indexed points within radius of any of points."""
+        mask = np.zeros(len(self.coords), dtype=bool)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if not len(points) or not len(self.coords):
+            return mask
+        candidates = self.candidates(points, radius)
+        deltas = self.coords[candidates][:, None, :] - points[None, :, :]
+        close = (np.einsum("ijk,ijk->ij", deltas, deltas) <= radius * radius).any(axis=1)
+        mask[candidates[close]] = True
+        return mask
+
+
+def ligand_coordinates(ligand_block):
+    """Return the (n, 3) coordinates of the ligand atoms in a ligand block."""
+    return parse_pdb_atoms(ligand_block)["coords"]
+
+
+class ReceptorIndex:
+    """Receptor atoms, residues and cell list, built once and queried per ligand."""
+
+    def __init__(self, receptor_block, cell_size=DEFAULT_RADIUS):
+        lines = receptor_block.splitlines()
+        self.atom_lines = [line for line in lines if line[:6] in (b"ATOM  ", b"HETATM")]
+        self.conect_lines = [line for line in lines if line.startswith(b"CONECT")]
+        self.columns = parse_pdb_atoms(receptor_block)
+        self.serials = np.array([int(line[6:11]) for line in self.atom_lines], dtype=np.int64)
+
+        # Residue id per atom: a new residue starts wherever chain or residue number changes
+        chain, res_seq = self.columns["chain"], self.columns["res_seq"]
+        starts = np.ones(len(res_seq), dtype=bool)
+        starts[1:] = (chain[1:] != chain[:-1]) | (res_seq[1:] != res_seq[:-1])
+        self.residue_ids = np.cumsum(starts) - 1
+        self.residue_first_atom = np.flatnonzero(starts)
+        self.cells = CellList(self.columns["coords"], cell_size)
+
+    def residue_label(self, residue):
+        atom = self.residue_first_atom[residue]
+        return (self.columns["chain"][atom].decode(), self.columns["res_name"][atom].decode(),
+                int(self.columns["res_seq"][atom]))
+
+    def pocket_atoms(self, ligand_coords, radius=DEFAULT_RADIUS):
+        """Return (atom mask, residue ids) of whole residues within radius of the ligand."""
+        close = self.cells.within(ligand_coords, radius)
+        residues = np.unique(self.residue_ids[close])
+        return np.isin(self.residue_ids, residues), residues
+
+    def pocket(self, ligand_coords, radius=DEFAULT_RADIUS):
+        """Return a Pocket with the PDB records of the residues within radius of the ligand."""
+        mask, residues = self.pocket_atoms(ligand_coords, radius)
+        kept_serials = set(self.serials[mask].tolist())
+        records = [line for line, keep in zip(self.atom_lines, mask) if keep]
+        # CONECT partners outside the pocket are ignored by the viewer
+        records += [line for line in self.conect_lines if int(line[6:11]) in kept_serials]
+        records.append(b"END")
+        return Pocket(
+            pdb=b"\n".join(records) + b"\n",
+            residues=[self.residue_label(residue) for residue in residues],
+            atom_count=int(mask.sum()),
+            receptor_atom_count=len(mask),
+        )
+
+
+def extract_pocket(complex_data, radius=DEFAULT_RADIUS):
+    """Return the Pocket for one complex (receptor + docked ligand bytes)."""
+    receptor, ligand = complex_pack.split_complex(complex_data)
+    return ReceptorIndex(receptor).pocket(ligand_coordinates(ligand), radius)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the binding-pocket residues of a docked ligand.")
+    parser.add_argument("folder", choices=complex_pack.DATASET_FOLDERS)
+    parser.add_argument("casrn")
+    parser.add_argument("--radius", type=float, default=DEFAULT_RADIUS, help="distance cutoff in angstrom")
+    args = parser.parse_args()
+
+    data = complex_pack.read_complex(args.folder, args.casrn, complex_pack.open_pack(args.folder))
+    if data is None:
+        print(f"{args.casrn} not found in {args.folder}")
+        return False
+
+    pocket = extract_pocket(data, args.radius)
+    print(f"{len(pocket.residues)} residues / {pocket.atom_count} of {pocket.receptor_atom_count} receptor atoms "
+          f"within {args.radius:g} A of {args.casrn}")
+    for chain, res_name, res_seq in pocket.residues:
+        print(f"  {chain or '-'} {res_name} {res_seq}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,262 @@
+"""
+Shared HTTP client for the ChemSpider scraping scripts (Code_S1, S4-S7).
+
+- One pooled requests.Session; fetch_many() runs requests on a small
+  thread pool (default 4 at a time) behind a global rate limit (default
+  2 requests/s), so the site sees a polite, steady request rate.
+- 429 / 5xx responses and connection errors are retried with exponential
+  backoff (honouring Retry-After).
+- Successful pages are stored in a SQLite cache keyed by URL
+  (chemspider_cache.sqlite) and reused until they are older than the TTL
+  (default 30 days), so an interrupted run resumes from where it stopped.
+- Replay mode never touches the network: pages come from the cache
+  regardless of age, and a missing page is answered with status 504 (as
+  an HTTP "only-if-cached" request would be).
+- base_url redirects ChemSpider requests to another server, e.g. a local
+  stub serving saved pages. Cache keys and returned URLs keep the original
+  ChemSpider URLs.
+
+The scripts pick these settings up from the environment:
+CHEMSPIDER_REPLAY=1, CHEMSPIDER_CACHE=<path>, CHEMSPIDER_BASE_URL=<url>,
+CHEMSPIDER_CONCURRENCY=<n>, CHEMSPIDER_RATE=<requests per second>.
+
+    client = default_client()
+    for response in client.fetch_many(urls):
+        if response.status_code == 200:
+            ...response.text...
+
+    python chemspider_client.py --stats
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CHEMSPIDER_URL = "https://legacy.chemspider.com"
+DEFAULT_CACHE_PATH = Path(__file__).parent / "chemspider_cache.sqlite"
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 2.0
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/86.0.4240.183 Safari/537.36")
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REPLAY_MISS_STATUS = 504
+
+# url is the final URL after redirects, like requests.Response.url; error is set when no response was received
+Response = namedtuple("Response", ["url", "status_code", "text", "from_cache", "error"])
+
+
+def search_url(cas_number):
+    return f"{CHEMSPIDER_URL}/Search.aspx?q={cas_number}"
+
+
+class RateLimiter:
+    """Spaces calls to wait() at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class ResponseCache:
+    """SQLite store of fetched pages keyed by requested URL."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = str(path)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, final_url TEXT, "
+                            "status INTEGER, body TEXT, fetched_at REAL)")
+
+    def get(self, url, ttl=None):
+        """Return the cached Response for url, or None if missing or older than ttl seconds."""
+        with self.lock:
+            row = self.db.execute("SELECT final_url, status, body, fetched_at FROM responses WHERE url = ?",
+                                  (url,)).fetchone()
+        if row is None or (ttl is not None and time.time() - row[3] > ttl):
+            return None
+        return Response(row[0], row[1], row[2], True, None)
+
+    def put(self, url, response):
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                            (url, response.url, response.status_code, response.text, time.time()))
+
+    def purge(self, ttl):
+        """Delete entries older than ttl seconds; return how many were removed."""
+        with self.lock, self.db:
+            return self.db.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - ttl,)).rowcount
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+
+class ChemSpiderClient:
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, concurrency=DEFAULT_CONCURRENCY,
+                 rate=DEFAULT_RATE, retries=4, backoff=1.0, timeout=10, replay=False, base_url=None,
+                 user_agent=USER_AGENT):
+        self.cache = ResponseCache(cache_path) if cache_path else None
+        self.ttl = ttl
+        self.concurrency = max(int(concurrency), 1)
+        self.rate_limiter = RateLimiter(rate)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.replay = replay
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _remote_url(self, url):
+        """The URL actually requested: ChemSpider URLs are pointed at base_url when one is set."""
+        if not self.base_url:
+            return url
+        parts = urlsplit(url)
+        if not parts.netloc.endswith("chemspider.com"):
+            return url
+        base = urlsplit(self.base_url)
+        return urlunsplit((base.scheme, base.netloc, base.path + parts.path, parts.query, parts.fragment))
+
+    def _original_url(self, url):
+        if self.base_url and url.startswith(self.base_url):
+            return CHEMSPIDER_URL + url[len(self.base_url):]
+        return url
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * 2 ** attempt * (1 + random.random() * 0.1)
+
+    def _download(self, url):
+        remote_url = self._remote_url(url)
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.wait()
+            try:
+                response = self.session.get(remote_url, timeout=self.timeout)
+            except requests.RequestException:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self._retry_delay(attempt))
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+            return Response(self._original_url(response.url), response.status_code, response.text, False, None)
+
+    def get(self, url):
+        """Return the Response for url from the cache or the network; errors are returned, not raised."""
+        if self.cache is not None:
+            cached = self.cache.get(url, None if self.replay else self.ttl)
+            if cached is not None:
+                return cached
+        if self.replay:
+            return Response(url, REPLAY_MISS_STATUS, "", False, "not in cache (replay mode)")
+        try:
+            response = self._download(url)
+        except requests.RequestException as e:
+            return Response(url, None, "", False, str(e))
+        if self.cache is not None and response.status_code == 200:
+            self.cache.put(url, response)
+        return response
+
+    def fetch_many(self, urls):
+        """Return the Responses for urls, in order. Repeated URLs are fetched once."""
+        urls = list(urls)
+        unique = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            responses = dict(zip(unique, pool.map(self.get, unique)))
+        return [responses[url] for url in urls]
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def default_client():
+    """Client configured from the CHEMSPIDER_* environment variables (see module docstring)."""
+    return ChemSpiderClient(
+        cache_path=os.environ.get("CHEMSPIDER_CACHE", DEFAULT_CACHE_PATH),
+        concurrency=int(os.environ.get("CHEMSPIDER_CONCURRENCY", DEFAULT_CONCURRENCY)),
+        rate=float(os.environ.get("CHEMSPIDER_RATE", DEFAULT_RATE)),
+        replay=os.environ.get("CHEMSPIDER_REPLAY", "") not in ("", "0"),
+        base_url=os.environ.get("CHEMSPIDER_BASE_URL") or None,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch ChemSpider pages into the shared response cache.")
+    parser.add_argument("urls", nargs="*", help="pages to fetch (CAS numbers are turned into search URLs)")
+    parser.add_argument("--from-file", help="text file with one URL or CAS number per line")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="SQLite cache path")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="requests per second")
+    parser.add_argument("--replay", action="store_true", help="only read from the cache")
+    parser.add_argument("--base-url", help="send ChemSpider requests to this server instead")
+    parser.add_argument("--purge-expired", action="store_true", help="delete cache entries older than the TTL")
+    parser.add_argument("--stats", action="store_true", help="print the number of cached pages")
+    args = parser.parse_args()
+
+    urls = list(args.urls)
+    if args.from_file:
+        urls += [line.strip() for line in Path(args.from_file).read_text().splitlines() if line.strip()]
+    urls = [url if url.startswith("http") else search_url(url) for url in urls]
+
+    with ChemSpiderClient(args.cache, concurrency=args.concurrency, rate=args.rate, replay=args.replay,
+                          base_url=args.base_url) as client:
+        if args.purge_expired:
+            print(f"Removed {client.cache.purge(client.ttl)} expired pages")
+        failed = 0
+        if urls:
+            start = time.perf_counter()
+            responses = client.fetch_many(urls)
+            for url, response in zip(urls, responses):
+                if response.status_code != 200:
+                    failed += 1
+                    print(f"{url}: {response.error or response.status_code}")
+            cached = sum(response.from_cache for response in responses)
+            print(f"Fetched {len(urls)} pages ({cached} from cache, {failed} failed) "
+                  f"in {time.perf_counter() - start:.1f}s")
+        if args.stats:
+            print(f"{len(client.cache)} pages cached in {client.cache.path}")
+    return not failed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,255 @@
+"""
+Targeted extraction of the fields the scraping scripts read from a ChemSpider page.
+
+    page = extract(html)
+    page.single_hit    # search result message says "Found 1 result"
+    page.smiles        # text of the SMILES span, or None
+    page.properties    # {prop_title text: prop_value text}, as Code_S5/S7 build it
+
+Backends (the same fields, checked against bs4 by the benchmark):
+    bs4     - the original BeautifulSoup(html.parser) tree with a find() per <tr>
+              (reference implementation)
+    lxml    - lxml.html tree and three XPath queries
+    stream  - single pass of the standard library HTMLParser tokenizer, no tree
+
+The stream backend nests unclosed tags exactly as html.parser does, so it
+matches bs4 even on broken markup; lxml closes an unclosed <td> at the next
+cell as browsers do, so it can return different fields on such pages. The
+default is therefore stream (identical to the bs4 code); CHEMSPIDER_PARSER
+selects another backend, e.g. lxml after the benchmark shows no differences
+on the pages at hand.
+benchmark_html_extraction.py checks every backend against bs4 on a corpus
+of saved pages and measures the per-page cost.
+"""
+
+import os
+from collections import namedtuple
+from html.parser import HTMLParser
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+RESULT_MESSAGE_ID = "ctl00_ctl00_ContentSection_ContentPlaceHolder1_ResultStatementControl1_plhCountMessage"
+SMILES_SPAN_ID = ("ctl00_ctl00_ContentSection_ContentPlaceHolder1_RecordViewDetails_rptDetailsView_ctl00_"
+                  "moreDetails_WrapControl2")
+SINGLE_HIT_TEXT = "Found 1 result"
+TITLE_CLASS = "prop_title"
+VALUE_CLASSES = ("prop_value_nowrap", "prop_value") # In order of preference
+
+PageData = namedtuple("PageData", ["single_hit", "smiles", "properties"])
+
+
+def _join_stripped(strings):
+    """Concatenate stripped, non-empty strings, like BeautifulSoup get_text(strip=True)."""
+    return "".join(s.strip() for s in strings)
+
+
+def extract_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    result_message = soup.find("h3", id=RESULT_MESSAGE_ID)
+    smiles_tag = soup.find("span", id=SMILES_SPAN_ID)
+    properties = {}
+    for row in soup.find_all("tr"):
+        title_tag = row.find("td", class_=TITLE_CLASS)
+        value_tag = row.find("td", class_=VALUE_CLASSES[0]) or row.find("td", class_=VALUE_CLASSES[1])
+        if title_tag and value_tag:
+            properties[title_tag.get_text(strip=True)] = value_tag.get_text(strip=True)
+    return PageData(
+        single_hit=bool(result_message and SINGLE_HIT_TEXT in result_message.text),
+        smiles=smiles_tag.get_text(strip=True) if smiles_tag else None,
+        properties=properties,
+    )
+
+
+def _lxml_strings(element):
+    """Text nodes under element in document order, skipping comments and script/style content."""
+    strings = []
+
+    def walk(node):
+        if node.tag in ("script", "style"):
+            return
+        if node.text:
+            strings.append(node.text)
+        for child in node:
+            if isinstance(child.tag, str):
+                walk(child)
+            if child.tail:
+                strings.append(child.tail)
+
+    walk(element)
+    return strings
+
+
+def _class_test(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_LXML_PARSER = lxml.html.HTMLParser(encoding="utf-8") if lxml is not None else None
+_LXML_ROW_QUERY = f"//tr[.//td[{_class_test(TITLE_CLASS)}]]"
+_LXML_CELL_QUERIES = {name: f"(.//td[{_class_test(name)}])[1]" for name in (TITLE_CLASS, *VALUE_CLASSES)}
+
+
+def extract_lxml(html):
+    if not html.strip():
+        return PageData(False, None, {})
+    # Bytes, so pages that start with an XML encoding declaration parse too
+    root = lxml.html.fromstring(html.encode("utf-8"), parser=_LXML_PARSER)
+    result_message = root.xpath(f"(//h3[@id='{RESULT_MESSAGE_ID}'])[1]")
+    smiles_tag = root.xpath(f"(//span[@id='{SMILES_SPAN_ID}'])[1]")
+    properties = {}
+    for row in root.xpath(_LXML_ROW_QUERY):
+        title_tag = row.xpath(_LXML_CELL_QUERIES[TITLE_CLASS])
+        value_tag = row.xpath(_LXML_CELL_QUERIES[VALUE_CLASSES[0]]) or row.xpath(_LXML_CELL_QUERIES[VALUE_CLASSES[1]])
+        if value_tag:
+            properties[_join_stripped(_lxml_strings(title_tag[0]))] = _join_stripped(_lxml_strings(value_tag[0]))
+    return PageData(
+        single_hit=bool(result_message and SINGLE_HIT_TEXT in "".join(_lxml_strings(result_message[0]))),
+        smiles=_join_stripped(_lxml_strings(smiles_tag[0])) if smiles_tag else None,
+        properties=properties,
+    )
+
+
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source",
+                 "track", "wbr"}
+
+
+class _StreamExtractor(HTMLParser):
+    """Collects the page fields in one pass over the tokens, without building a tree.
+
+    Keeps only a stack of open tag names. An end tag closes everything back
+    to the nearest open element of that name and stray end tags are ignored,
+    which is how the BeautifulSoup tree builder nests unclosed tags.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = [] # (tag, captures started by the element, row started by the element)
+        self.rows = [] # {class name: strings of the first matching <td>} for every <tr>, in document order
+        self.open_rows = []
+        self.captures = [] # string lists of the elements currently being collected
+        self.result_message = None
+        self.smiles = None
+        self.skip_depth = 0 # inside <script>/<style>, whose text get_text() leaves out
+        self.in_text = False
+
+    def _capture(self):
+        strings = []
+        self.captures.append(strings)
+        return strings
+
+    def handle_starttag(self, tag, attrs):
+        self.in_text = False
+        if tag in VOID_ELEMENTS:
+            return
+        captures = []
+        row = None
+        if tag == "tr":
+            row = {}
+            self.rows.append(row)
+            self.open_rows.append(row)
+        elif tag == "td" and self.open_rows:
+            classes = (dict(attrs).get("class") or "").split()
+            for name in (TITLE_CLASS, *VALUE_CLASSES):
+                # A <td> counts for every open <tr> (nested tables included) that has no such cell yet
+                rows = [open_row for open_row in self.open_rows if name not in open_row] if name in classes else []
+                if rows:
+                    strings = self._capture()
+                    captures.append(strings)
+                    for open_row in rows:
+                        open_row[name] = strings
+        elif tag == "h3" and self.result_message is None and dict(attrs).get("id") == RESULT_MESSAGE_ID:
+            self.result_message = self._capture()
+            captures.append(self.result_message)
+        elif tag == "span" and self.smiles is None and dict(attrs).get("id") == SMILES_SPAN_ID:
+            self.smiles = self._capture()
+            captures.append(self.smiles)
+        if tag in ("script", "style"):
+            self.skip_depth += 1
+        self.stack.append((tag, captures, row))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self.in_text = False
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                break
+        else:
+            return
+        closed = set()
+        for closed_tag, captures, row in self.stack[index:]:
+            closed.update(id(strings) for strings in captures)
+            if row is not None:
+                self.open_rows = [open_row for open_row in self.open_rows if open_row is not row]
+            if closed_tag in ("script", "style"):
+                self.skip_depth -= 1
+        del self.stack[index:]
+        # Identity, not equality: two empty string lists compare equal
+        self.captures = [strings for strings in self.captures if id(strings) not in closed]
+
+    def handle_comment(self, data):
+        self.in_text = False
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        for strings in self.captures:
+            if self.in_text and strings:
+                strings[-1] += data # Same text node delivered in pieces
+            else:
+                strings.append(data)
+        self.in_text = True
+
+    def page_data(self):
+        properties = {}
+        for row in self.rows:
+            title = row.get(TITLE_CLASS)
+            value = row.get(VALUE_CLASSES[0])
+            if value is None:
+                value = row.get(VALUE_CLASSES[1])
+            if title is not None and value is not None:
+                properties[_join_stripped(title)] = _join_stripped(value)
+        return PageData(
+            single_hit=bool(self.result_message and SINGLE_HIT_TEXT in "".join(self.result_message)),
+            smiles=_join_stripped(self.smiles) if self.smiles is not None else None,
+            properties=properties,
+        )
+
+
+def extract_stream(html):
+    parser = _StreamExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.page_data()
+
+
+BACKENDS = {"bs4": extract_bs4, "lxml": extract_lxml, "stream": extract_stream}
+
+
+def available_backends():
+    missing = {"bs4": BeautifulSoup is None, "lxml": lxml is None}
+    return [name for name in BACKENDS if not missing.get(name)]
+
+
+def default_backend():
+    name = os.environ.get("CHEMSPIDER_PARSER")
+    if name:
+        if name not in available_backends():
+            raise ValueError(f"Unknown or unavailable HTML parser backend: {name}")
+        return name
+    return "stream"
+
+
+def extract(html, backend=None):
+    """Return the PageData of a ChemSpider page with the given (or default) backend."""
+    return BACKENDS[backend or default_backend()](html)
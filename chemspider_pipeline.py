@@ -0,0 +1,170 @@
+"""
+Single-pass CASRN enrichment: ChemSpider link, SMILES and descriptor properties.
+
+Replaces the chain Code_S4/S6 (CASRN search) -> Code_S1 (SMILES) ->
+Code_S5/S7 (properties), which requested the same record page up to three
+times and passed an intermediate spreadsheet between every step. Here each
+CASRN costs one request: a search with a single hit lands on the record
+page, and the search result check, the SMILES and the properties are all
+read from that one parse (chemspider_extract).
+
+Chemicals are fetched in batches through chemspider_client (cached, rate
+limited), and each finished batch is appended to one output CSV. A rerun
+skips the CASRNs already resolved (Status "ok"). Rows that failed (network
+errors, HTTP 429/5xx, no single result) are first removed from the output
+and then fetched again, so every CASRN appears once.
+
+    python chemspider_pipeline.py PFASDatabaseTop1000Binders.xlsx enriched.csv
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+from chemspider_client import default_client, search_url
+from chemspider_extract import extract
+
+DESCRIPTOR_PROPERTIES = [
+    "#Freely Rotating Bonds",
+    "#H bond acceptors",
+    "#H bond donors",
+    "ACD/LogD (pH 7.4)",
+    "ACD/LogP",
+    "Boiling Point",
+    "Density",
+    "Enthalpy of Vaporization",
+    "Polar Surface Area",
+    "Polarizability",
+    "Surface Tension",
+]
+LINK_COLUMN = "ChemSpider Link"
+STATUS_COLUMN = "Status"
+DEFAULT_BATCH_SIZE = 50
+
+
+def extract_numeric_value(property_text):
+    """Return the first number in a property value, as Code_S5 does."""
+    match = re.search(r"[-+]?[0-9]*\.?[0-9]+", property_text)
+    return float(match.group(0)) if match else None
+
+
+def parse_record_page(html):
+    """Return (single search hit, SMILES, {property title: number}) from one parse of a ChemSpider page."""
+    page = extract(html)
+    properties = {title: extract_numeric_value(value) for title, value in page.properties.items()}
+    return page.single_hit, page.smiles, properties
+
+
+def enrich_chemical(cas_number, response, properties=DESCRIPTOR_PROPERTIES):
+    """Return the link / SMILES / property / status fields for one CASRN from its search response."""
+    row = {LINK_COLUMN: None, "SMILES": None, **{prop: None for prop in properties}}
+    if response.error:
+        row[STATUS_COLUMN] = f"error: {response.error}"
+    elif response.status_code != 200:
+        row[STATUS_COLUMN] = f"HTTP {response.status_code}"
+    else:
+        single_hit, smiles, found = parse_record_page(response.text)
+        if not single_hit:
+            row[STATUS_COLUMN] = "no single result"
+        else:
+            row[LINK_COLUMN] = response.url
+            row["SMILES"] = smiles
+            row.update({prop: found.get(prop) for prop in properties})
+            row[STATUS_COLUMN] = "ok" if smiles else "ok, SMILES not found"
+    return row
+
+
+def read_chemicals(input_file, cas_column="CASRN"):
+    if str(input_file).lower().endswith((".xlsx", ".xls")):
+        data = pd.read_excel(input_file)
+    else:
+        data = pd.read_csv(input_file)
+    if cas_column not in data.columns:
+        raise KeyError(f"The column '{cas_column}' is missing from {input_file}. "
+                       "Available columns are: " + ", ".join(map(str, data.columns)))
+    data = data.dropna(subset=[cas_column])
+    data[cas_column] = data[cas_column].astype(str).str.strip()
+    return data
+
+
+def is_finished(status):
+    """True for the Status of a resolved chemical ("ok" or "ok, SMILES not found")."""
+    return isinstance(status, str) and status.startswith("ok")
+
+
+def finished_chemicals(output_file, cas_column="CASRN"):
+    """CASRNs resolved by an earlier run.
+
+    The output is rewritten without the other rows (and without repeated
+    CASRNs), so the chemicals that failed can be fetched and appended again.
+    """
+    if not os.path.exists(output_file):
+        return set()
+    # Read as text so the kept rows are written back unchanged
+    previous = pd.read_csv(output_file, dtype=str, keep_default_na=False)
+    finished = previous[previous[STATUS_COLUMN].map(is_finished)].drop_duplicates(cas_column, keep="last")
+    if len(finished) < len(previous):
+        tmp_file = f"{output_file}.tmp"
+        finished.to_csv(tmp_file, index=False)
+        os.replace(tmp_file, output_file)
+    return set(finished[cas_column])
+
+
+def enrich(input_file, output_file, cas_column="CASRN", properties=DESCRIPTOR_PROPERTIES,
+           batch_size=DEFAULT_BATCH_SIZE, client=None):
+    """Enrich every CASRN of input_file, appending each finished batch to output_file; yield the batches."""
+    data = read_chemicals(input_file, cas_column)
+    done = finished_chemicals(output_file, cas_column)
+    data = data[~data[cas_column].isin(done)]
+    produced = [LINK_COLUMN, "SMILES", *properties, STATUS_COLUMN]
+    # Input columns are kept; a scraped SMILES replaces an input one
+    columns = [col for col in data.columns if col not in produced] + produced
+    print(f"{len(data)} chemicals to enrich, {len(done)} already resolved in {output_file}")
+
+    own_client = client is None
+    client = client or default_client()
+    try:
+        for start in range(0, len(data), batch_size):
+            batch = data.iloc[start:start + batch_size]
+            responses = client.fetch_many(search_url(cas) for cas in batch[cas_column])
+            rows = []
+            for record, response in zip(batch.to_dict("records"), responses):
+                fields = enrich_chemical(record[cas_column], response, properties)
+                if fields["SMILES"] is None and pd.notna(record.get("SMILES")):
+                    fields["SMILES"] = record["SMILES"]
+                rows.append({**record, **fields})
+            table = pd.DataFrame(rows, columns=columns)
+            table.to_csv(output_file, mode="a", header=not os.path.exists(output_file), index=False)
+            yield table
+    finally:
+        if own_client:
+            client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add ChemSpider link, SMILES and descriptors to a CASRN table.")
+    parser.add_argument("input_file", help="CSV or Excel file with a CASRN column")
+    parser.add_argument("output_file", help="CSV file to write (reruns keep resolved rows and retry the rest)")
+    parser.add_argument("--cas-column", default="CASRN")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="chemicals per written batch")
+    parser.add_argument("--property", action="append", dest="properties",
+                        help="property title to extract (repeatable; default: the Code_S5 descriptors)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = resolved = 0
+    for table in enrich(args.input_file, args.output_file, args.cas_column,
+                        args.properties or DESCRIPTOR_PROPERTIES, args.batch_size):
+        written += len(table)
+        resolved += table[LINK_COLUMN].notna().sum()
+        print(f"{written} chemicals written ({resolved} resolved)")
+    print(f"Done in {time.perf_counter() - start:.1f}s; results in {args.output_file}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,144 @@
+"""
+Local stand-in for legacy.chemspider.com that serves saved pages.
+
+Point the scraping scripts at it through chemspider_client's base_url
+(CHEMSPIDER_BASE_URL) to run them offline or in tests:
+
+    python chemspider_stub_server.py saved_pages/ --port 8765
+    CHEMSPIDER_BASE_URL=http://127.0.0.1:8765 python Code_S1.py
+
+Pages are looked up by request:
+    /Search.aspx?q=<term>  -> saved_pages/search/<term>.html
+    /<path>                -> saved_pages/<path>  (e.g. Chemical-Structure.2157.html)
+Unknown pages answer 404. StubServer can also be given the pages as a
+{path: html} dict, and queue_response() makes the next requests for a
+path answer with a chosen status and headers (e.g. 503, or 429 with
+Retry-After) before the page is served, to exercise retries. Every request
+is recorded in StubServer.requests.
+"""
+
+import argparse
+import sys
+import threading
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+SEARCH_PATH = "/Search.aspx"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        stub = self.server.stub
+        status, headers, body = stub.respond(self.path)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.stub.verbose:
+            super().log_message(format, *args)
+
+
+class StubServer:
+    """Serve saved ChemSpider pages on 127.0.0.1 from a background thread."""
+
+    def __init__(self, pages, port=0, verbose=False):
+        self.pages = pages if isinstance(pages, dict) else None
+        self.folder = None if self.pages is not None else Path(pages)
+        self.verbose = verbose
+        self.requests = []
+        self._queued = defaultdict(deque)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def queue_response(self, path, status, headers=None, times=1):
+        """Answer the next `times` requests for path (with its query) with status before serving the page."""
+        with self._lock:
+            self._queued[path].extend([(status, dict(headers or {}))] * times)
+
+    def hits(self, path):
+        with self._lock:
+            return sum(1 for request in self.requests if request == path)
+
+    def _page(self, path):
+        if self.pages is not None:
+            return self.pages.get(path)
+        parts = urlsplit(path)
+        if parts.path == SEARCH_PATH:
+            term = parse_qs(parts.query).get("q", [""])[0]
+            file = self.folder / "search" / f"{term}.html"
+        else:
+            file = self.folder / parts.path.lstrip("/")
+        try:
+            file.resolve().relative_to(self.folder.resolve())
+        except ValueError:
+            return None # Outside the pages folder
+        return file.read_text(encoding="utf-8", errors="replace") if file.is_file() else None
+
+    def respond(self, path):
+        """Return (status, headers, body) for a request path."""
+        with self._lock:
+            self.requests.append(path)
+            queued = self._queued[path].popleft() if self._queued[path] else None
+        if queued:
+            return queued[0], queued[1], ""
+        page = self._page(path)
+        if page is None:
+            return 404, {}, "Not found"
+        return 200, {}, page
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown() # Blocks until serve_forever returns, so only when it runs
+            self._thread = None
+        self._server.server_close()
+
+    def serve_forever(self):
+        """Serve in the calling thread until interrupted (Ctrl+C)."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve saved ChemSpider pages for offline runs and tests.")
+    parser.add_argument("pages", help="folder of saved pages (search/<term>.html and record pages)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = StubServer(args.pages, args.port, verbose=True)
+    print(f"Serving {args.pages} at {server.url} (set CHEMSPIDER_BASE_URL={server.url})")
+    server.serve_forever()
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,271 @@
+"""
+Packed storage for the *_Combined receptor-ligand complex folders.
+
+Every complex in a dataset folder starts with the same receptor block and only
+the docked ligand block (from the "MODEL" record onwards) differs. A pack keeps
+each distinct receptor block once plus one compressed ligand record per CASRN,
+and rebuilds the byte-identical complex on demand.
+
+The pack records the size and mtime of every source PDB file. open_pack()
+builds a missing pack and rebuilds one whose sources were added, removed or
+changed, and read_complex() reads the PDB file itself whenever it no longer
+matches its packed record, so an edited complex is never shadowed by stale
+pack content. The packs are generated files (gitignored); build them
+explicitly with:
+    python complex_pack.py
+    python complex_pack.py Alpha_CE_Combined --verify
+"""
+
+import argparse
+import json
+import struct
+import sys
+import threading
+import zlib
+from pathlib import Path
+
+DATASET_FOLDERS = ['Alpha_CE_Combined', 'Beta_CE_Combined', 'Alpha_TB_Combined', 'Beta_TB_Combined']
+
+# File name patterns used by the combined complexes (CE sets and Top Binder sets)
+COMPLEX_FILE_PATTERNS = ["combined_*_out.pdb", "*_top_complex.pdb", "*_out_complex.pdb"]
+
+PACK_FILE_NAME = "complexes.pack"
+PACK_MAGIC = b"QSARPACK1\n"
+_INDEX_HEADER = struct.Struct("<Q")
+LIGAND_MARKER = b"MODEL"
+
+
+def casrn_from_file_name(file_name):
+    """Return the CASRN encoded in a complex file name, or None if it does not match."""
+    for pattern in COMPLEX_FILE_PATTERNS:
+        prefix, suffix = pattern.split("*")
+        if file_name.startswith(prefix) and file_name.endswith(suffix) and len(file_name) > len(prefix) + len(suffix):
+            return file_name[len(prefix):-len(suffix)]
+    return None
+
+
+def find_complex_files(folder_path):
+    """Map CASRN -> complex PDB path for every complex file in a dataset folder."""
+    files = {}
+    for pattern in COMPLEX_FILE_PATTERNS:
+        for file in Path(folder_path).glob(pattern):
+            casrn = casrn_from_file_name(file.name)
+            if casrn and casrn not in files:
+                files[casrn] = file
+    return dict(sorted(files.items()))
+
+
+def complex_file_path(folder_path, casrn):
+    """Return the complex PDB path for a CASRN, or None if no file exists."""
+    for pattern in COMPLEX_FILE_PATTERNS:
+        path = Path(folder_path) / pattern.replace("*", casrn)
+        if path.exists():
+            return path
+    return None
+
+
+def split_complex(data):
+    """Split complex bytes into (receptor block, ligand block) at the first MODEL record."""
+    pos = data.find(b"\n" + LIGAND_MARKER)
+    if pos < 0:
+        # No docked ligand block: keep the whole file as the ligand record
+        return b"", data
+    return data[:pos + 1], data[pos + 1:]
+
+
+def pack_path_for(folder_path):
+    return Path(folder_path) / PACK_FILE_NAME
+
+
+def build_pack(folder_path, output_path=None):
+    """Pack every complex in folder_path and return the path of the written pack."""
+    folder_path = Path(folder_path)
+    output_path = Path(output_path) if output_path else pack_path_for(folder_path)
+
+    receptor_ids = {}
+    blobs = []
+    offset = 0
+    receptors = []
+    ligands = []
+
+    def add_blob(raw):
+        nonlocal offset
+        compressed = zlib.compress(raw, 9)
+        blobs.append(compressed)
+        entry = [offset, len(compressed), len(raw)]
+        offset += len(compressed)
+        return entry
+
+    for casrn, file in find_complex_files(folder_path).items():
+        stat = file.stat()
+        data = file.read_bytes()
+        receptor, ligand = split_complex(data)
+        if receptor not in receptor_ids:
+            receptor_ids[receptor] = len(receptors)
+            receptors.append(add_blob(receptor))
+        ligands.append({
+            "casrn": casrn,
+            "file_name": file.name,
+            "receptor": receptor_ids[receptor],
+            "size": len(data),
+            "mtime_ns": stat.st_mtime_ns,
+            "blob": add_blob(ligand),
+        })
+
+    index = json.dumps({"folder": folder_path.name, "receptors": receptors, "ligands": ligands}).encode()
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(PACK_MAGIC)
+        f.write(_INDEX_HEADER.pack(len(index)))
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+    tmp_path.replace(output_path)
+    return output_path
+
+
+class ComplexPack:
+    """Random-access reader for a complexes.pack file.
+
+    Only the index is read on open; receptor blocks are decompressed once and
+    kept in memory, ligand records are read from disk on each request.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            if f.read(len(PACK_MAGIC)) != PACK_MAGIC:
+                raise ValueError(f"{self.path} is not a complex pack")
+            (index_length,) = _INDEX_HEADER.unpack(f.read(_INDEX_HEADER.size))
+            index = json.loads(f.read(index_length))
+        self._data_start = len(PACK_MAGIC) + _INDEX_HEADER.size + index_length
+        self._receptor_entries = index["receptors"]
+        self._entries = {entry["casrn"]: entry for entry in index["ligands"]}
+        self._receptors = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, casrn):
+        return casrn in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ligands(self):
+        return sorted(self._entries)
+
+    def file_name(self, casrn):
+        return self._entries[casrn]["file_name"]
+
+    def size(self, casrn):
+        return self._entries[casrn]["size"]
+
+    def _read_blob(self, entry):
+        offset, length, raw_length = entry
+        with open(self.path, "rb") as f:
+            f.seek(self._data_start + offset)
+            raw = zlib.decompress(f.read(length))
+        if len(raw) != raw_length:
+            raise ValueError(f"Corrupt record in {self.path}")
+        return raw
+
+    def receptor(self, receptor_id=0):
+        with self._lock:
+            if receptor_id not in self._receptors:
+                self._receptors[receptor_id] = self._read_blob(self._receptor_entries[receptor_id])
+            return self._receptors[receptor_id]
+
+    def matches(self, casrn, stat):
+        """True if the packed record of casrn was built from a file with this os.stat() result."""
+        entry = self._entries.get(casrn)
+        return entry is not None and entry["size"] == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
+
+    def is_current(self, files):
+        """True if the pack holds exactly the {CASRN: path} files, unchanged since it was built."""
+        if set(files) != set(self._entries):
+            return False
+        return all(self.file_name(casrn) == file.name and self.matches(casrn, file.stat()) for casrn, file in files.items())
+
+    def ligand_block(self, casrn):
+        return self._read_blob(self._entries[casrn]["blob"])
+
+    def read_complex(self, casrn):
+        """Return the original complex file contents as bytes."""
+        entry = self._entries[casrn]
+        return self.receptor(entry["receptor"]) + self._read_blob(entry["blob"])
+
+
+def open_pack(folder_path, build=True):
+    """Open the pack for a dataset folder, or return None if there is none.
+
+    With build=True a missing pack, or one that no longer matches the PDB
+    files in the folder, is (re)built first. A folder holding only a pack
+    (no PDB files) opens the pack as it is.
+    """
+    path = pack_path_for(folder_path)
+    pack = None
+    if path.exists():
+        try:
+            pack = ComplexPack(path)
+        except (OSError, ValueError, KeyError):
+            pack = None
+    if build:
+        files = find_complex_files(folder_path)
+        if files and (pack is None or not pack.is_current(files)):
+            try:
+                pack = ComplexPack(build_pack(folder_path))
+            except OSError as e:
+                # Read-only folder: serve the PDB files directly
+                print(f"Could not build {path}: {e}")
+                pack = None
+    return pack
+
+
+def read_complex(folder_path, casrn, pack=None):
+    """Return the complex bytes of casrn, or None if it is missing.
+
+    Served from the pack when its record matches the PDB file on disk (or
+    the file is gone), otherwise from the PDB file.
+    """
+    file_path = complex_file_path(folder_path, casrn)
+    if pack is not None and casrn in pack and (file_path is None or pack.matches(casrn, file_path.stat())):
+        return pack.read_complex(casrn)
+    if file_path is None:
+        return None
+    return file_path.read_bytes()
+
+
+def verify_pack(folder_path):
+    """Return the CASRNs whose rebuilt complex differs from the PDB file on disk."""
+    pack = ComplexPack(pack_path_for(folder_path))
+    files = find_complex_files(folder_path)
+    mismatches = [casrn for casrn, file in files.items() if casrn not in pack or pack.read_complex(casrn) != file.read_bytes()]
+    mismatches += [casrn for casrn in pack.ligands() if casrn not in files]
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the *_Combined complex folders.")
+    parser.add_argument("folders", nargs="*", default=DATASET_FOLDERS)
+    parser.add_argument("--verify", action="store_true", help="check byte-identical round trips after packing")
+    args = parser.parse_args()
+
+    ok = True
+    for folder in args.folders:
+        if not find_complex_files(folder):
+            print(f"No complex PDB files found in {folder}, skipping.")
+            continue
+        path = build_pack(folder)
+        source_size = sum(file.stat().st_size for file in find_complex_files(folder).values())
+        print(f"{folder}: {source_size / 1024:.0f} KB -> {path.stat().st_size / 1024:.0f} KB ({path})")
+        if args.verify:
+            mismatches = verify_pack(folder)
+            if mismatches:
+                ok = False
+                print(f"  Round trip failed for: {', '.join(mismatches)}")
+            else:
+                print("  Round trip verified.")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,202 @@
+"""
+Parallel, resumable SMILES-to-3D conversion for Code_S2.
+
+Each molecule is parsed once with RDKit, hydrogens are added, a 3D geometry
+is embedded and MMFF-optimized, and the result is written to <name>.pdb.
+Molecules are spread over a process pool in small chunks.
+
+With conformers > 1, that many ETKDGv3 conformers are embedded, all are
+MMFF-optimized and only the lowest-energy one is written. The default (1)
+is the original single EmbedMolecule(randomSeed=42) geometry.
+
+Every finished molecule is appended to conformers_log.jsonl in the output
+folder (SMILES hash, status, MMFF energy, seconds). A rerun skips molecules
+whose .pdb exists and whose last log entry has the same SMILES hash and
+conformer setting, so an interrupted run picks up where it stopped. Repeated
+names get a _2, _3, ... suffix so two workers never write the same file.
+
+    python conformers.py molecules.csv QSAR_PDB_Files --conformers 10
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from rdkit import Chem
+from rdkit.Chem import AllChem
+
+LOG_FILE_NAME = "conformers_log.jsonl"
+RANDOM_SEED = 42
+
+
+def smiles_hash(smiles):
+    return hashlib.sha1(smiles.encode()).hexdigest()
+
+
+def unique_names(names):
+    """Suffix repeated names (name, name_2, name_3, ...) so no two molecules share an output file."""
+    taken = set(names)
+    seen = set()
+    unique = []
+    for name in names:
+        if name in seen:
+            k = 2
+            while f"{name}_{k}" in taken:
+                k += 1
+            print(f"Duplicate name {name}: writing it as {name}_{k}")
+            name = f"{name}_{k}"
+            taken.add(name)
+        seen.add(name)
+        unique.append(name)
+    return unique
+
+
+def read_molecules(csv_file):
+    """Return [(name, SMILES)] from a CSV with Name and SMILES columns, cleaned as Code_S2 always has."""
+    df = pd.read_csv(csv_file)
+    for col in ["Name", "SMILES"]:
+        if col not in df.columns:
+            raise KeyError(f"The column '{col}' is missing from the CSV file. Available columns are: " + ", ".join(map(str, df.columns)))
+    df = df.dropna(subset=["SMILES"])
+    smiles = df["SMILES"].astype(str).str.replace("-", "") # Hyphens are removed from SMILES for RDKit
+    return [(str(name), s) for name, s in zip(df["Name"], smiles)]
+
+
+def mmff_energy(mol, conf_id=-1):
+    props = AllChem.MMFFGetMoleculeProperties(mol)
+    return AllChem.MMFFGetMoleculeForceField(mol, props, confId=conf_id).CalcEnergy()
+
+
+def embed_single(mol):
+    """Embed and MMFF-optimize one conformer in place; return its energy."""
+    if AllChem.EmbedMolecule(mol, randomSeed=RANDOM_SEED) == -1:
+        raise ValueError("embedding failed")
+    AllChem.MMFFOptimizeMolecule(mol)
+    return mmff_energy(mol)
+
+
+def embed_lowest_energy(mol, conformers):
+    """Embed several ETKDGv3 conformers, MMFF-optimize them all and return (molecule with the best one, energy)."""
+    params = AllChem.ETKDGv3()
+    params.randomSeed = RANDOM_SEED
+    conf_ids = list(AllChem.EmbedMultipleConfs(mol, numConfs=conformers, params=params))
+    if not conf_ids:
+        raise ValueError("embedding failed")
+    energies = [energy for _, energy in AllChem.MMFFOptimizeMoleculeConfs(mol)]
+    best = min(range(len(conf_ids)), key=energies.__getitem__)
+    best_mol = Chem.Mol(mol)
+    best_mol.RemoveAllConformers()
+    best_mol.AddConformer(mol.GetConformer(conf_ids[best]), assignId=True)
+    return best_mol, energies[best]
+
+
+def generate_conformer(task):
+    """Worker: SMILES -> optimized 3D structure -> .pdb file. Returns the log record."""
+    name, smiles, output_file, conformers = task
+    start = time.perf_counter()
+    record = {"name": name, "smiles_hash": smiles_hash(smiles), "conformers": conformers, "status": "ok"}
+    try:
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            raise ValueError(f"Failed to convert SMILES to molecule (SMILES: {smiles})")
+        mol = Chem.AddHs(mol)
+        try:
+            if conformers > 1:
+                mol, energy = embed_lowest_energy(mol, conformers)
+            else:
+                energy = embed_single(mol)
+        except Exception as e:
+            raise ValueError(f"Optimization failed: {e}")
+        Chem.MolToPDBFile(mol, output_file)
+        record["energy"] = round(energy, 4)
+    except Exception as e:
+        record["status"] = "failed"
+        record["error"] = str(e)
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def read_log(log_path):
+    """Return {name: last log record} from earlier runs."""
+    done = {}
+    if os.path.exists(log_path):
+        with open(log_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue # Line cut short by an interrupted run
+                done[record["name"]] = record
+    return done
+
+
+def pending_tasks(molecules, output_dir, conformers=1, force=False):
+    """Return (tasks to run, number skipped because their output is up to date)."""
+    done = {} if force else read_log(os.path.join(output_dir, LOG_FILE_NAME))
+    tasks = []
+    for name, smiles in molecules:
+        output_file = os.path.join(output_dir, f"{name}.pdb")
+        previous = done.get(name)
+        if (previous and previous["status"] == "ok" and previous["smiles_hash"] == smiles_hash(smiles)
+                and previous.get("conformers", 1) == conformers and os.path.exists(output_file)):
+            continue
+        tasks.append((name, smiles, output_file, conformers))
+    return tasks, len(molecules) - len(tasks)
+
+
+def convert_molecules(molecules, output_dir, conformers=1, workers=None, force=False):
+    """Convert [(name, SMILES)] to .pdb files in output_dir; yield each log record as it finishes."""
+    os.makedirs(output_dir, exist_ok=True)
+    conformers = max(int(conformers), 1)
+    molecules = list(zip(unique_names([name for name, _ in molecules]), [smiles for _, smiles in molecules]))
+    tasks, skipped = pending_tasks(molecules, output_dir, conformers, force)
+    print(f"{len(tasks)} molecules to convert, {skipped} already up to date")
+    if not tasks:
+        return
+    workers = workers or os.cpu_count() or 1
+    # Small chunks keep every process busy when a few molecules take much longer than the rest
+    chunksize = max(1, min(16, len(tasks) // (workers * 4)))
+    with open(os.path.join(output_dir, LOG_FILE_NAME), "a") as log, ProcessPoolExecutor(max_workers=workers) as pool:
+        for record in pool.map(generate_conformer, tasks, chunksize=chunksize):
+            log.write(json.dumps(record) + "\n")
+            log.flush()
+            yield record
+
+
+def convert_csv_to_pdb(csv_file, output_dir, conformers=1, workers=None, force=False):
+    """Convert every molecule of a Name/SMILES CSV, printing per-molecule timings; return the failure count."""
+    molecules = read_molecules(csv_file)
+    start = time.perf_counter()
+    converted = failed = 0
+    for record in convert_molecules(molecules, output_dir, conformers, workers, force):
+        if record["status"] == "ok":
+            converted += 1
+            print(f"{record['name']}: {record['seconds']:.2f}s, MMFF energy {record['energy']:.2f}")
+        else:
+            failed += 1
+            print(f"An error occurred with {record['name']}: {record['error']}")
+    print(f"Converted {converted} molecules ({failed} failed) in {time.perf_counter() - start:.1f}s")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate MMFF-optimized 3D .pdb files from a Name/SMILES CSV.")
+    parser.add_argument("csv_file")
+    parser.add_argument("output_dir")
+    parser.add_argument("--conformers", type=int, default=1,
+                        help="ETKDG conformers per molecule; the lowest MMFF energy one is kept (default: 1)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument("--force", action="store_true", help="ignore the log and regenerate every molecule")
+    args = parser.parse_args()
+
+    convert_csv_to_pdb(args.csv_file, args.output_dir, args.conformers, args.workers, args.force)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,178 @@
+"""
+Ligand x residue contact matrices for the *_Combined datasets.
+
+For every docked ligand in a folder, records which receptor residues have
+an atom within the cutoff of any ligand atom. All ligand atoms of a folder
+are queried against the receptor cell list in one vectorized pass
+(binding_pocket.CellList.pairs), and the matrix is stored sparsely as
+(ligand, residue) index pairs in contact_cache/<folder>_<cutoff>A.npz. The
+cache records the dataset manifest hash it was built from and is rebuilt
+when that changes.
+
+    python contact_matrix.py --cutoff 4.5
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+import complex_pack
+import dataset_manifest
+from binding_pocket import ReceptorIndex, ligand_coordinates
+from coordinate_store import iter_dataset_complexes
+
+CACHE_DIR = Path(__file__).parent / "contact_cache"
+DEFAULT_CUTOFF = 4.5
+
+
+class ContactMatrix:
+    """Sparse boolean contact matrix: rows are ligands, columns are residues."""
+
+    def __init__(self, folder, cutoff, manifest_hash, ligands, residues, rows, cols):
+        self.folder = folder
+        self.cutoff = cutoff
+        self.manifest_hash = manifest_hash
+        self.ligands = list(ligands)
+        # (chain, residue name, residue number), sorted by chain and number
+        self.residues = [tuple(residue) for residue in residues]
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self.cols = np.asarray(cols, dtype=np.int32)
+
+    @property
+    def shape(self):
+        return len(self.ligands), len(self.residues)
+
+    def dense(self):
+        matrix = np.zeros(self.shape, dtype=bool)
+        matrix[self.rows, self.cols] = True
+        return matrix
+
+    def residue_counts(self):
+        """Number of ligands contacting each residue."""
+        return np.bincount(self.cols, minlength=len(self.residues))
+
+    def residue_frequency(self):
+        return self.residue_counts() / max(len(self.ligands), 1)
+
+    def residue_labels(self):
+        return [f"{res_name} {res_seq}{chain}" for chain, res_name, res_seq in self.residues]
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"folder": self.folder, "cutoff": self.cutoff, "manifest_hash": self.manifest_hash,
+                "ligands": self.ligands, "residues": self.residues}
+        tmp_path = path.with_name(path.name + ".tmp.npz")
+        np.savez_compressed(tmp_path, meta=np.array(json.dumps(meta)), rows=self.rows, cols=self.cols)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(meta["folder"], meta["cutoff"], meta["manifest_hash"], meta["ligands"], meta["residues"],
+                       data["rows"], data["cols"])
+
+
+def compute_contacts(folder, cutoff=DEFAULT_CUTOFF, manifest_hash=None):
+    """Compute the contact matrix of every complex in a dataset folder."""
+    ligands = []
+    groups = {}
+    for casrn, data in iter_dataset_complexes(folder):
+        receptor, ligand_block = complex_pack.split_complex(data)
+        # Complexes sharing a receptor block (normally the whole folder) are queried together
+        groups.setdefault(receptor, []).append((len(ligands), ligand_coordinates(ligand_block)))
+        ligands.append(casrn)
+
+    residue_index = {}
+    rows, cols = [], []
+    for receptor, members in groups.items():
+        index = ReceptorIndex(receptor)
+        coords = np.concatenate([ligand_coords for _, ligand_coords in members])
+        owner = np.repeat([row for row, _ in members], [len(ligand_coords) for _, ligand_coords in members])
+        query, atoms = index.cells.pairs(coords, cutoff)
+        pairs = np.unique(np.stack([owner[query], index.residue_ids[atoms]], axis=1), axis=0)
+        labels = np.array([residue_index.setdefault(index.residue_label(residue), len(residue_index))
+                           for residue in range(len(index.residue_first_atom))], dtype=np.int64)
+        rows.append(pairs[:, 0])
+        cols.append(labels[pairs[:, 1]] if len(pairs) else pairs[:, 1])
+
+    # Order residue columns by chain and residue number
+    residues = sorted(residue_index, key=lambda residue: (residue[0], residue[2]))
+    new_column = np.empty(len(residues), dtype=np.int64)
+    new_column[[residue_index[residue] for residue in residues]] = np.arange(len(residues))
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    cols = new_column[np.concatenate(cols)] if cols else np.empty(0, dtype=np.int64)
+    return ContactMatrix(Path(folder).name, cutoff, manifest_hash, ligands, residues, rows, cols)
+
+
+def cache_path_for(folder, cutoff, cache_dir=CACHE_DIR):
+    return Path(cache_dir) / f"{Path(folder).name}_{cutoff:g}A.npz"
+
+
+def load_contacts(folder, cutoff=DEFAULT_CUTOFF, cache_dir=CACHE_DIR):
+    """Return the contact matrix for a folder, from cache when the dataset manifest is unchanged."""
+    manifest = dataset_manifest.get_manifest(folder)
+    manifest_hash = manifest["hash"] if manifest else None
+    path = cache_path_for(folder, cutoff, cache_dir)
+    if path.exists():
+        try:
+            contacts = ContactMatrix.load(path)
+        except (OSError, ValueError, KeyError):
+            contacts = None
+        if contacts is not None and contacts.manifest_hash == manifest_hash:
+            return contacts
+    contacts = compute_contacts(folder, cutoff, manifest_hash)
+    contacts.save(path)
+    return contacts
+
+
+def cluster_order(matrix):
+    """Return a leaf order of an average-linkage clustering of the rows by Jaccard distance."""
+    x = np.asarray(matrix, dtype=np.float64)
+    n = len(x)
+    if n < 3:
+        return np.arange(n)
+    shared = x @ x.T
+    counts = x.sum(axis=1)
+    union = counts[:, None] + counts[None, :] - shared
+    distance = 1.0 - np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+    np.fill_diagonal(distance, np.inf)
+
+    members = {i: [i] for i in range(n)}
+    active = list(range(n))
+    while len(active) > 1:
+        sub = distance[np.ix_(active, active)]
+        i, j = np.unravel_index(np.argmin(sub), sub.shape)
+        a, b = active[i], active[j]
+        size_a, size_b = len(members[a]), len(members[b])
+        merged = (size_a * distance[a] + size_b * distance[b]) / (size_a + size_b)
+        distance[a, :] = distance[:, a] = merged
+        distance[a, a] = np.inf
+        members[a] += members.pop(b)
+        active.remove(b)
+    return np.array(members[active[0]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the ligand x residue contact matrices.")
+    parser.add_argument("folders", nargs="*", default=complex_pack.DATASET_FOLDERS)
+    parser.add_argument("--cutoff", type=float, default=DEFAULT_CUTOFF, help="contact distance in angstrom")
+    parser.add_argument("--top", type=int, default=10, help="most frequently contacted residues to list")
+    args = parser.parse_args()
+
+    for folder in args.folders:
+        contacts = load_contacts(folder, args.cutoff)
+        print(f"{folder}: {contacts.shape[0]} ligands x {contacts.shape[1]} residues, {len(contacts.rows)} contacts")
+        counts = contacts.residue_counts()
+        labels = contacts.residue_labels()
+        for column in np.argsort(-counts, kind="stable")[:args.top]:
+            print(f"  {labels[column]:<12}{counts[column]:>4} ({counts[column] / contacts.shape[0]:.0%})")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
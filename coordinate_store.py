@@ -0,0 +1,221 @@
+"""
+Memory-mapped columnar coordinate store for every complex in the *_Combined folders.
+
+The build step parses each complex once and writes one .npy file per column
+(coordinates, element, atom/residue names, residue number, chain, ligand mask)
+plus an offset table. Every distinct receptor block is stored once per dataset
+and every docked ligand gets its own atom range, so any ligand's atoms are a
+zero-copy slice and batch geometry over all ligands is a single array pass.
+
+Build (or rebuild) the store after changing any of the complexes:
+    python coordinate_store.py
+"""
+
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+
+import complex_pack
+
+STORE_DIR = "coordinate_store"
+STORE_VERSION = 1
+
+# column name -> dtype of the per-atom arrays
+COLUMNS = {
+    "coords": np.float32,
+    "element": "S2",
+    "atom_name": "S4",
+    "res_name": "S3",
+    "res_seq": np.int32,
+    "chain": "S1",
+    "is_ligand": np.bool_,
+}
+
+
+def parse_pdb_atoms(data):
+    """Parse the ATOM/HETATM records of PDB bytes into a dict of column arrays."""
+    rows = [line for line in data.splitlines() if line[:6] in (b"ATOM  ", b"HETATM")]
+    n = len(rows)
+    coords = np.empty((n, 3), dtype=np.float32)
+    res_seq = np.empty(n, dtype=np.int32)
+    for i, line in enumerate(rows):
+        coords[i] = (float(line[30:38]), float(line[38:46]), float(line[46:54]))
+        res_seq[i] = int(line[22:26] or 0)
+    return {
+        "coords": coords,
+        "element": np.array([line[76:78].strip() or line[12:16].strip()[:1] for line in rows], dtype="S2"),
+        "atom_name": np.array([line[12:16].strip() for line in rows], dtype="S4"),
+        "res_name": np.array([line[17:20].strip() for line in rows], dtype="S3"),
+        "res_seq": res_seq,
+        "chain": np.array([line[21:22].strip() for line in rows], dtype="S1"),
+    }
+
+
+def iter_dataset_complexes(folder):
+    """Yield (casrn, complex bytes) for a dataset, read as the app's load_complex reads them."""
+    files = complex_pack.find_complex_files(folder)
+    pack = complex_pack.open_pack(folder)
+    for casrn in files if files or pack is None else pack.ligands():
+        yield casrn, complex_pack.read_complex(folder, casrn, pack)
+
+
+def build_store(folders=None, output_dir=STORE_DIR):
+    """Parse every complex in folders and write the store to output_dir."""
+    folders = folders or complex_pack.DATASET_FOLDERS
+    output_dir = Path(output_dir)
+
+    blocks = []
+    offset = 0
+    complexes = []
+    receptors = {}
+
+    def add_block(data, is_ligand):
+        nonlocal offset
+        columns = parse_pdb_atoms(data)
+        n = len(columns["res_seq"])
+        columns["is_ligand"] = np.full(n, is_ligand, dtype=np.bool_)
+        blocks.append(columns)
+        span = [offset, offset + n]
+        offset += n
+        return span
+
+    for folder in folders:
+        dataset = Path(folder).name
+        for casrn, data in iter_dataset_complexes(folder):
+            receptor, ligand = complex_pack.split_complex(data)
+            key = (dataset, receptor)
+            if key not in receptors:
+                receptors[key] = add_block(receptor, False)
+            complexes.append({
+                "dataset": dataset,
+                "casrn": casrn,
+                "receptor": receptors[key],
+                "ligand": add_block(ligand, True),
+            })
+
+    tmp_dir = output_dir.with_name(output_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    for name, dtype in COLUMNS.items():
+        if blocks:
+            column = np.concatenate([block[name] for block in blocks]).astype(dtype, copy=False)
+        else:
+            column = np.empty((0, 3) if name == "coords" else 0, dtype=dtype)
+        np.save(tmp_dir / f"{name}.npy", column)
+    offsets = np.array([c["receptor"] + c["ligand"] for c in complexes], dtype=np.int64).reshape(-1, 4)
+    np.save(tmp_dir / "offsets.npy", offsets)
+    index = {
+        "version": STORE_VERSION,
+        "complexes": [{"dataset": c["dataset"], "casrn": c["casrn"]} for c in complexes],
+    }
+    (tmp_dir / "index.json").write_text(json.dumps(index, indent=1))
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    tmp_dir.rename(output_dir)
+    return output_dir
+
+
+class CoordinateStore:
+    """Read-only view over a built coordinate store.
+
+    Columns are memory-mapped, so slices returned by the accessors are views
+    into the files on disk rather than copies.
+
+    offsets has one row per complex: receptor start, receptor stop, ligand
+    start, ligand stop (atom indices into the column arrays).
+    """
+
+    def __init__(self, path=STORE_DIR):
+        self.path = Path(path)
+        index = json.loads((self.path / "index.json").read_text())
+        if index.get("version") != STORE_VERSION:
+            raise ValueError(f"{self.path} was built by an incompatible version, rebuild it")
+        self.complexes = [(c["dataset"], c["casrn"]) for c in index["complexes"]]
+        self._rows = {key: row for row, key in enumerate(self.complexes)}
+        self.offsets = np.load(self.path / "offsets.npy", mmap_mode="r")
+        for name in COLUMNS:
+            setattr(self, name, np.load(self.path / f"{name}.npy", mmap_mode="r"))
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def __len__(self):
+        return len(self.complexes)
+
+    def datasets(self):
+        return sorted({dataset for dataset, _ in self.complexes})
+
+    def ligands(self, dataset):
+        return sorted(casrn for d, casrn in self.complexes if d == dataset)
+
+    def row(self, dataset, casrn):
+        return self._rows[(dataset, casrn)]
+
+    def ligand_slice(self, dataset, casrn):
+        start, stop = self.offsets[self.row(dataset, casrn), 2:4]
+        return slice(int(start), int(stop))
+
+    def receptor_slice(self, dataset, casrn):
+        start, stop = self.offsets[self.row(dataset, casrn), 0:2]
+        return slice(int(start), int(stop))
+
+    def ligand_coords(self, dataset, casrn):
+        return self.coords[self.ligand_slice(dataset, casrn)]
+
+    def receptor_coords(self, dataset, casrn):
+        return self.coords[self.receptor_slice(dataset, casrn)]
+
+    def ligand_rows(self, dataset=None):
+        """Return the store rows of every complex (optionally in one dataset)."""
+        return np.array([row for row, (d, _) in enumerate(self.complexes) if dataset is None or d == dataset], dtype=np.int64)
+
+    def ligand_atom_owner(self):
+        """Return (atom indices, complex rows) for every ligand atom in the store.
+
+        Useful for reductions over all ligands in one pass, e.g.
+        np.add.at(sums, owner, coords[atoms]) for per-ligand centroids.
+        """
+        starts = self.offsets[:, 2]
+        counts = self.offsets[:, 3] - starts
+        owner = np.repeat(np.arange(len(self.complexes)), counts)
+        atoms = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts) + np.arange(counts.sum())
+        return atoms, owner
+
+    def ligand_centroids(self):
+        """Return an (n_complexes, 3) array of ligand centroids computed in one pass."""
+        atoms, owner = self.ligand_atom_owner()
+        sums = np.zeros((len(self.complexes), 3), dtype=np.float64)
+        np.add.at(sums, owner, self.coords[atoms])
+        counts = np.bincount(owner, minlength=len(self.complexes)).reshape(-1, 1)
+        return sums / np.maximum(counts, 1)
+
+
+def open_store(path=STORE_DIR):
+    """Open the coordinate store, or return None if it has not been built."""
+    if not (Path(path) / "index.json").exists():
+        return None
+    return CoordinateStore(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the memory-mapped coordinate store.")
+    parser.add_argument("folders", nargs="*", default=complex_pack.DATASET_FOLDERS)
+    parser.add_argument("--output", default=STORE_DIR)
+    args = parser.parse_args()
+
+    path = build_store(args.folders, args.output)
+    store = CoordinateStore(path)
+    print(f"Stored {len(store)} complexes / {len(store.coords)} atoms in {path}")
+    for dataset in store.datasets():
+        print(f"  {dataset}: {len(store.ligands(dataset))} ligands")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,207 @@
+"""
+Per-folder manifests for the *_Combined datasets.
+
+A manifest.json in each dataset folder records, for every complex: CASRN,
+file name, byte size, receptor/ligand atom counts, the Vina REMARK energies
+and a SHA-256 content hash. A refresh stats every file and only re-reads the
+ones whose size or mtime no longer match their entry; the folder is only
+listed again (for added or removed files) when its mtime changed, since
+rewriting a file in place does not change it. Entries whose content is
+unchanged are reused. get_manifest() keeps one copy per process so repeated
+page loads never touch the directory tree.
+
+Rebuild the manifests explicitly with:
+    python dataset_manifest.py
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import threading
+from pathlib import Path
+
+import complex_pack
+
+MANIFEST_FILE_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# REMARK label -> manifest field for the energies written by AutoDock Vina
+VINA_REMARKS = {
+    "VINA RESULT": "vina_score",
+    "INTER + INTRA": "inter_intra",
+    "INTER": "inter",
+    "INTRA": "intra",
+    "UNBOUND": "unbound",
+}
+ENERGY_FIELDS = list(VINA_REMARKS.values())
+
+_VINA_REMARK_RE = re.compile(rb"^REMARK (VINA RESULT|INTER \+ INTRA|INTER|INTRA|UNBOUND):\s*([-+]?\d*\.?\d+)")
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def parse_vina_remarks(lines):
+    """Parse Vina energies from an iterable of PDB lines (bytes).
+
+    Stops at the first ATOM/HETATM record, so it can be fed the ligand block
+    of a complex (or a streamed file) without scanning the coordinates.
+    """
+    energies = dict.fromkeys(ENERGY_FIELDS)
+    for line in lines:
+        if line.startswith((b"ATOM", b"HETATM")):
+            break
+        match = _VINA_REMARK_RE.match(line)
+        if match:
+            field = VINA_REMARKS[match.group(1).decode()]
+            if energies[field] is None:
+                energies[field] = float(match.group(2))
+    return energies
+
+
+def count_atoms(data):
+    return sum(1 for line in data.splitlines() if line.startswith((b"ATOM", b"HETATM")))
+
+
+def describe_complex(casrn, file_name, data):
+    """Build the manifest entry for one complex from its raw bytes."""
+    receptor, ligand = complex_pack.split_complex(data)
+    entry = {
+        "casrn": casrn,
+        "file_name": file_name,
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "receptor_atoms": count_atoms(receptor),
+        "ligand_atoms": count_atoms(ligand),
+    }
+    entry.update(parse_vina_remarks(ligand.splitlines()))
+    return entry
+
+
+def manifest_path_for(folder_path):
+    return Path(folder_path) / MANIFEST_FILE_NAME
+
+
+def _sources(folder_path, known=None):
+    """Yield (casrn, file name, stat path, loader) for every complex in the folder.
+
+    known maps CASRN -> file name from a manifest whose folder mtime still
+    matches, so the folder does not need to be listed again. The loader
+    reads through complex_pack.read_complex, as the app's load_complex
+    does, so the hash and size describe the bytes shown.
+    """
+    if known is None:
+        files = complex_pack.find_complex_files(folder_path)
+    else:
+        files = {casrn: folder_path / name for casrn, name in known.items() if (folder_path / name).exists()}
+    # A folder holding only a pack serves every complex from it
+    pack = None if files else complex_pack.open_pack(folder_path, build=False)
+    casrns = files if files or pack is None else pack.ligands()
+    for casrn in casrns:
+        file = files.get(casrn)
+        file_name = file.name if file else pack.file_name(casrn)
+        yield (casrn, file_name, file or pack.path,
+               lambda casrn=casrn: complex_pack.read_complex(folder_path, casrn, pack))
+
+
+def _read_manifest(path):
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(path, manifest):
+    try:
+        # Creating the file bumps the folder mtime and rewriting it in place does not,
+        # so create it before reading the mtime that is recorded
+        path.touch()
+        manifest["folder_mtime_ns"] = path.parent.stat().st_mtime_ns
+        path.write_text(json.dumps(manifest, indent=1))
+    except OSError as e:
+        print(f"Could not write {path}: {e}")
+
+
+def _manifest_hash(entries):
+    digest = hashlib.sha256()
+    for entry in entries:
+        digest.update(f"{entry['casrn']}:{entry['sha256']}\n".encode())
+    return digest.hexdigest()
+
+
+def refresh_manifest(folder_path, force=False):
+    """Load the manifest for folder_path from disk, rebuilding it only if stale."""
+    folder_path = Path(folder_path)
+    if not folder_path.exists():
+        return None
+    path = manifest_path_for(folder_path)
+    old = None if force else _read_manifest(path)
+    old_entries = {entry["casrn"]: entry for entry in old["ligands"]} if old else {}
+    # An unchanged folder mtime means no file was added or removed, but files rewritten
+    # in place keep it, so every file's signature is still checked
+    same_files = old is not None and old.get("folder_mtime_ns") == folder_path.stat().st_mtime_ns
+    known = {casrn: entry["file_name"] for casrn, entry in old_entries.items()} if same_files else None
+
+    entries = []
+    changed = not same_files
+    for casrn, file_name, stat_path, load in _sources(folder_path, known):
+        stat = stat_path.stat()
+        signature = [stat.st_size, stat.st_mtime_ns]
+        entry = old_entries.get(casrn)
+        if entry is None or entry["file_name"] != file_name or entry.get("signature") != signature:
+            changed = True
+            new_entry = describe_complex(casrn, file_name, load())
+            # Unchanged content keeps its entry even if only the mtime moved (e.g. after a git checkout)
+            if entry is None or entry["sha256"] != new_entry["sha256"]:
+                entry = new_entry
+        entry = dict(entry, signature=signature)
+        entries.append(entry)
+    if not changed and len(entries) == len(old_entries):
+        return old
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "folder": folder_path.name,
+        "hash": _manifest_hash(entries),
+        "ligands": entries,
+    }
+    _write_manifest(path, manifest)
+    return manifest
+
+
+def get_manifest(folder_path):
+    """Return the manifest for folder_path, loading it at most once per process."""
+    key = str(Path(folder_path).resolve())
+    with _cache_lock:
+        if key not in _cache:
+            _cache[key] = refresh_manifest(folder_path)
+        return _cache[key]
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the dataset manifests for the *_Combined folders.")
+    parser.add_argument("folders", nargs="*", default=complex_pack.DATASET_FOLDERS)
+    parser.add_argument("--force", action="store_true", help="rehash every file even if the manifest looks current")
+    args = parser.parse_args()
+
+    for folder in args.folders:
+        manifest = refresh_manifest(folder, force=args.force)
+        if manifest is None:
+            print(f"{folder}: Missing")
+            continue
+        print(f"{folder}: {len(manifest['ligands'])} complexes, hash {manifest['hash'][:12]}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,159 @@
+"""
+Batched accumulated local effects (ALE) of the QSPR models (replaces Code_S14.R).
+
+Follows iml's FeatureEffect(method = "ale") for numeric features: the grid
+is grid_size + 1 type-1 quantiles of each descriptor; every compound is
+moved to the lower and upper border of its interval (left-open); the
+prediction differences are averaged per interval, accumulated, and
+centered by the count-weighted mean of the interval midpoints.
+
+Instead of one FeatureEffect call per descriptor predicting row by row,
+the lower/upper shifted copies of the data for all descriptors are built
+as one stacked (2 x p x n, p) array and predicted in a single matrix
+multiply. The bounds table has the columns of Code_S14's export
+(X_min, X_max, ALE_min, ALE_max, ALE_range).
+
+    python feature_effects.py                       # Commonly Exposed ERα / ERβ fitted on all rows, as Code_S14
+    python feature_effects.py --models "Top Binders ERα" --fit-on training --output ale_bounds.xlsx
+"""
+
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import qspr_models
+
+DEFAULT_GRID_SIZE = 20
+BOUNDS_COLUMNS = ["X_min", "X_max", "ALE_min", "ALE_max", "ALE_range"]
+# Code_S14 computed the Commonly Exposed (Table S5) models; its combined table labels them ERA / ERB
+DEFAULT_MODELS = {"Commonly Exposed ERα": "ERA", "Commonly Exposed ERβ": "ERB"}
+
+ALECurve = namedtuple("ALECurve", ["descriptor", "grid", "ale", "counts"])
+
+
+def _interval_borders(X, grid_size):
+    """Per descriptor: (unique type-1 quantile borders, 1-based interval index of every row)."""
+    probabilities = np.linspace(0, 1, grid_size + 1)
+    borders = []
+    for column in X.T:
+        quantiles = np.unique(np.quantile(column, probabilities, method="inverted_cdf")) # R's type = 1
+        # findInterval(x, quantiles, left.open = TRUE), with the lowest value put in interval 1
+        index = np.clip(np.searchsorted(quantiles, column, side="left"), 1, max(len(quantiles) - 1, 1))
+        borders.append((quantiles, index))
+    return borders
+
+
+def ale_curves(predict, X, descriptors, grid_size=DEFAULT_GRID_SIZE):
+    """Return an ALECurve per descriptor of X (n x p), predicting all shifted rows in one predict() call.
+
+    predict takes an (m, p) array and returns m predictions. Descriptors
+    with a single distinct value have no ALE and are skipped.
+    """
+    X = np.asarray(X, dtype=float)
+    n, p = X.shape
+    borders = _interval_borders(X, grid_size)
+    stacked = np.broadcast_to(X, (2, p, n, p)).copy() # [lower/upper, shifted descriptor, row, column]
+    for j, (quantiles, index) in enumerate(borders):
+        if len(quantiles) > 1:
+            stacked[0, j, :, j] = quantiles[index - 1]
+            stacked[1, j, :, j] = quantiles[index]
+    predictions = np.asarray(predict(stacked.reshape(-1, p)), dtype=float).reshape(2, p, n)
+    deltas = predictions[1] - predictions[0]
+
+    curves = []
+    for j, (quantiles, index) in enumerate(borders):
+        if len(quantiles) < 2:
+            continue
+        intervals = len(quantiles) - 1
+        counts = np.bincount(index - 1, minlength=intervals)
+        sums = np.bincount(index - 1, weights=deltas[j], minlength=intervals)
+        means = np.divide(sums, counts, out=np.zeros(intervals), where=counts > 0)
+        accumulated = np.concatenate([[0.0], np.cumsum(means)])
+        center = ((accumulated[:-1] + accumulated[1:]) / 2 * counts).sum() / counts.sum()
+        curves.append(ALECurve(descriptors[j], quantiles, accumulated - center, counts))
+    return curves
+
+
+def bounds_table(curves):
+    """The ALE bounds table: one row per descriptor with X_min, X_max, ALE_min, ALE_max and ALE_range."""
+    rows = [{
+        "Descriptor": curve.descriptor,
+        "X_min": curve.grid.min(),
+        "X_max": curve.grid.max(),
+        "ALE_min": curve.ale.min(),
+        "ALE_max": curve.ale.max(),
+    } for curve in curves]
+    table = pd.DataFrame(rows, columns=["Descriptor", *BOUNDS_COLUMNS[:4]])
+    table["ALE_range"] = table["ALE_max"] - table["ALE_min"]
+    return table
+
+
+def curves_table(curves):
+    """Long table of the curves: Descriptor, X, ALE, Count (rows in the interval ending at X)."""
+    columns = ["Descriptor", "X", "ALE", "Count"]
+    if not curves:
+        return pd.DataFrame(columns=columns)
+    return pd.concat([pd.DataFrame({
+        "Descriptor": curve.descriptor,
+        "X": curve.grid,
+        "ALE": curve.ale,
+        "Count": np.concatenate([[0], curve.counts]),
+    }, columns=columns) for curve in curves], ignore_index=True)
+
+
+def model_curves(data, descriptors=None, fit_set=qspr_models.TRAINING, grid_size=DEFAULT_GRID_SIZE):
+    """Fit a qspr_models model and return (model, ALE curves over the rows it was fitted on)."""
+    model, rows = qspr_models.fit_model(data, descriptors, fit_set)
+    X = data[model.descriptors].to_numpy(dtype=float)[rows]
+    return model, ale_curves(model.predict, X, model.descriptors, grid_size)
+
+
+def combined_bounds(tables):
+    """Side-by-side bounds of several models: {label: bounds table} -> columns X_min_<label>, ..."""
+    combined = None
+    for label, table in tables.items():
+        table = table.set_index("Descriptor")[BOUNDS_COLUMNS].add_suffix(f"_{label}")
+        combined = table if combined is None else combined.join(table, how="outer")
+    return combined.sort_index().reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ALE bounds of the QSPR models (batched, no R needed).")
+    parser.add_argument("--models", nargs="+", choices=list(qspr_models.MODELS), default=list(DEFAULT_MODELS))
+    parser.add_argument("--fit-on", choices=["all", "training"], default="all",
+                        help="rows the model is fitted and the ALE computed on (Code_S14 used all rows)")
+    parser.add_argument("--grid-size", type=int, default=DEFAULT_GRID_SIZE)
+    parser.add_argument("--output", help=".xlsx (a sheet per model and a Combined sheet) or .csv (combined table)")
+    args = parser.parse_args()
+
+    fit_set = None if args.fit_on == "all" else qspr_models.TRAINING
+    tables = {}
+    for name in args.models:
+        data = qspr_models.model_data(name)
+        start = time.perf_counter()
+        _, curves = model_curves(data, fit_set=fit_set, grid_size=args.grid_size)
+        elapsed = time.perf_counter() - start
+        table = bounds_table(curves).sort_values("Descriptor").reset_index(drop=True)
+        tables[DEFAULT_MODELS.get(name, name)] = table
+        print(f"{name} ({len(curves)} descriptors, {elapsed * 1000:.1f} ms):")
+        print(table.round(4).to_string(index=False))
+        print()
+    combined = combined_bounds(tables)
+    if args.output:
+        if str(args.output).lower().endswith(".xlsx"):
+            with pd.ExcelWriter(args.output) as writer:
+                for label, table in tables.items():
+                    table.to_excel(writer, sheet_name=label[:31], index=False)
+                combined.to_excel(writer, sheet_name="Combined", index=False)
+        else:
+            combined.to_csv(args.output, index=False)
+        print(f"Saved {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,244 @@
+"""
+Concurrent Fukui job runner with a resumable journal (used by Code_S10).
+
+Jobs are run through a backend with at most max_in_flight at a time:
+    ComputeBackend(compute)        - blocking call like dummy_compute_workflow(name=, molecule=, workflow=),
+                                     run in worker threads
+    PollingBackend(submit, status) - submit(name, molecule, workflow) returns a job id; status(job_id)
+                                     returns the result dict once finished, None while still running
+    StubBackend()                  - offline stand-in with random latency, values and failures
+
+Every finished row is appended to a JSON-lines journal (<output>.journal.jsonl)
+as soon as its result is in, so a crash or Ctrl-C loses at most the jobs
+in flight. Each record has a status: "ok", "failed" (the workflow returned
+status 0 or no F(+) data) or "error" (an exception, e.g. a backend or
+network error). A rerun skips the "ok" rows journaled with the same SMILES,
+always reruns "error" rows, and reruns "failed" rows with retry_failed
+(--retry-failed). The F+ table is materialized once, at the end.
+
+    python fukui_jobs.py molecules.csv fukui.csv --stub --max-in-flight 8
+    python fukui_jobs.py molecules.csv fukui.csv --stub --retry-failed
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_POLL_INTERVAL = 5.0
+WORKFLOW = "fukui"
+RESULT_COLUMN = "F+"
+MISSING = "NA"
+
+FukuiTask = namedtuple("FukuiTask", ["key", "row", "name", "smiles"])
+
+
+class ComputeBackend:
+    """Runs a blocking compute(name=, molecule=, workflow=) call per job in a worker thread."""
+
+    def __init__(self, compute):
+        self.compute = compute
+
+    async def run(self, name, molecule):
+        return await asyncio.to_thread(self.compute, name=name, molecule=molecule, workflow=WORKFLOW)
+
+
+class PollingBackend:
+    """Submits each job, then polls its status until the result is available."""
+
+    def __init__(self, submit, status, poll_interval=DEFAULT_POLL_INTERVAL, timeout=None):
+        self.submit = submit
+        self.status = status
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    async def run(self, name, molecule):
+        job_id = await asyncio.to_thread(self.submit, name, molecule, WORKFLOW)
+        start = time.monotonic()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            result = await asyncio.to_thread(self.status, job_id)
+            if result is not None:
+                return result
+            if self.timeout is not None and time.monotonic() - start > self.timeout:
+                raise TimeoutError(f"job {job_id} still running after {self.timeout:g}s")
+
+
+class StubBackend(PollingBackend):
+    """Offline stand-in for testing: jobs finish after a random delay; some fail with status 0."""
+
+    def __init__(self, latency=(0.05, 0.3), failure_rate=0.1, poll_interval=0.05, seed=None):
+        super().__init__(self._submit, self._status, poll_interval)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.jobs = {}
+        self.job_ids = itertools.count()
+
+    def _submit(self, name, molecule, workflow):
+        job_id = f"{name}-{next(self.job_ids)}"
+        self.jobs[job_id] = time.monotonic() + self.random.uniform(*self.latency)
+        return job_id
+
+    def _status(self, job_id):
+        if time.monotonic() < self.jobs[job_id]:
+            return None
+        if self.random.random() < self.failure_rate:
+            return {"object_status": 0, "object_data": {}}
+        return {"object_status": 1, "object_data": {"fukui_positive": [self.random.random() for _ in range(3)]}}
+
+
+def fukui_value(result):
+    """Return (highest F(+) value, its atom index, message) from a workflow result, as Code_S10 reads it."""
+    if result.get("object_status", None) == 0:
+        return MISSING, None, "Returned status 0"
+    object_data = result.get("object_data", {})
+    if "fukui_positive" not in object_data:
+        return MISSING, None, "No 'fukui_positive' data found"
+    fukui_pos = object_data["fukui_positive"]
+    highest_index = max(range(len(fukui_pos)), key=lambda i: fukui_pos[i])
+    return fukui_pos[highest_index], highest_index, None
+
+
+class Journal:
+    """Append-only JSON-lines record of finished rows."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        """Return {key: record} of the rows finished by earlier runs (the last record per key wins)."""
+        records = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue # Line cut short by a crash
+                    records[record["key"]] = record
+        return records
+
+    def open(self):
+        self.file = open(self.path, "a")
+        return self
+
+    def append(self, record):
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def record_status(record):
+    """"ok", "failed" or "error" for a journal record (records written before statuses were added included)."""
+    if "status" in record:
+        return record["status"]
+    if not record.get("message"):
+        return "ok"
+    return "error" if record["message"].startswith("Exception encountered") else "failed"
+
+
+def journal_path_for(output_csv):
+    return f"{output_csv}.journal.jsonl"
+
+
+def build_tasks(df):
+    """One task per row, keyed by CASRN when the table has one (else by row number)."""
+    tasks = []
+    for idx, row_data in df.iterrows():
+        key = str(row_data["CASRN"]) if "CASRN" in df.columns and pd.notna(row_data["CASRN"]) else f"row {idx}"
+        tasks.append(FukuiTask(key, idx, f"Fukui_{idx}", str(row_data["SMILES"]).strip()))
+    return tasks
+
+
+async def run_tasks(tasks, backend, journal, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+    """Run every task with at most max_in_flight jobs at once, journaling each result as it arrives."""
+    slots = asyncio.Semaphore(max_in_flight)
+    done = [0]
+
+    async def run(task):
+        async with slots:
+            print(f"Processing row {task.row}, SMILES: {task.smiles}")
+            try:
+                value, atom_index, message = fukui_value(await backend.run(task.name, task.smiles))
+                status = "failed" if message else "ok"
+            except Exception as e:
+                value, atom_index, message = MISSING, None, f"Exception encountered: {e}"
+                status = "error"
+        journal.append({"key": task.key, "smiles": task.smiles, RESULT_COLUMN: value, "atom_index": atom_index,
+                        "message": message, "status": status})
+        done[0] += 1
+        if message:
+            print(f"Row {task.row}: {message}; marking F+ as NA. ({done[0]}/{len(tasks)})")
+        else:
+            print(f"Row {task.row}: Highest F(+) = {value} (Atom index: {atom_index}) ({done[0]}/{len(tasks)})")
+
+    await asyncio.gather(*(run(task) for task in tasks))
+
+
+def is_done(record, smiles, retry_failed=False):
+    """True if a journal record is a result for smiles that a rerun keeps."""
+    if record is None or record["smiles"] != smiles:
+        return False
+    status = record_status(record)
+    return status == "ok" or (status == "failed" and not retry_failed)
+
+
+def run_fukui_jobs(df, output_csv, backend, max_in_flight=DEFAULT_MAX_IN_FLIGHT, fresh=False, retry_failed=False):
+    """Fill the F+ column of df, resuming from the journal next to output_csv; return the table."""
+    journal = Journal(journal_path_for(output_csv))
+    if fresh and os.path.exists(journal.path):
+        os.remove(journal.path)
+    finished = journal.read()
+    tasks = build_tasks(df)
+    pending = [task for task in tasks if not is_done(finished.get(task.key), task.smiles, retry_failed)]
+    pending_keys = {task.key for task in pending}
+    kept_failed = sum(1 for task in tasks if task.key not in pending_keys and record_status(finished[task.key]) == "failed")
+    print(f"{len(pending)} Fukui jobs to run, {len(tasks) - len(pending)} already in {journal.path}"
+          + (f" ({kept_failed} failed; rerun them with --retry-failed)" if kept_failed else ""))
+    if pending:
+        journal.open()
+        try:
+            asyncio.run(run_tasks(pending, backend, journal, max_in_flight))
+        finally:
+            journal.close()
+        finished = journal.read()
+
+    df = df.copy()
+    df[RESULT_COLUMN] = [finished[task.key][RESULT_COLUMN] if task.key in finished else MISSING for task in tasks]
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Fukui workflows for a SMILES table with a resumable journal.")
+    parser.add_argument("input_csv", help="CSV with a SMILES column (and CASRN)")
+    parser.add_argument("output_csv")
+    parser.add_argument("--stub", action="store_true", help="use the offline stub backend (required here)")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT, help="jobs running at once")
+    parser.add_argument("--fresh", action="store_true", help="ignore the journal and rerun every row")
+    parser.add_argument("--retry-failed", action="store_true", help="rerun rows whose workflow returned no F(+) value")
+    args = parser.parse_args()
+
+    if not args.stub:
+        print("Only the offline stub backend can be run from the command line; use Code_S10.py for workflows")
+        return False
+    df = pd.read_csv(args.input_csv)
+    start = time.perf_counter()
+    df = run_fukui_jobs(df, args.output_csv, StubBackend(), args.max_in_flight, args.fresh, args.retry_failed)
+    df.to_csv(args.output_csv, index=False)
+    print(f"Results saved to {args.output_csv} in {time.perf_counter() - start:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,72 @@
+"""
+Self-contained NGL viewer HTML for st.components.v1.html.
+
+This is the original viewer path: every call builds a fresh page that loads
+NGL and the structure, either embedded as base64 or fetched from a
+static_structures URL. The app falls back to it when static serving is
+off, and benchmark_structure_transfer.py uses it as the baseline.
+"""
+
+import base64
+
+
+def create_ngl_viewer(pdb_content, structure_name, structure_url=None):
+    if structure_url:
+        # Served as a gzip-compressed static file; NGL decompresses it in the browser
+        load_source = f'fetchStructure("{structure_url}")'
+        load_params = f'{{ ext: "pdb", compressed: "gz", name: "{structure_name}" }}'
+    else:
+        pdb_encoded = base64.b64encode(pdb_content.encode()).decode()
+        load_source = f'Promise.resolve(new Blob([atob("{pdb_encoded}")], {{type: "chemical/x-pdb"}}))'
+        load_params = '{ext: "pdb"}'
+    html_code = f"""
+    <div class='viewer-container'>
+        <div id='ngl-viewer' style='width: 100%; height: 520px; border: 1px solid #ddd; border-radius: 12px;'></div>
+    </div>
+    <script src='https://unpkg.com/ngl@0.10.4/dist/ngl.js'></script>
+    <script>
+        // Structure URLs are content-addressed, so a cached copy never goes stale
+        function fetchStructure(url) {{
+            if (!window.caches) {{
+                return fetch(url).then(function (response) {{ return response.blob(); }});
+            }}
+            return caches.open("qsar-structures").then(function (cache) {{
+                return cache.match(url).then(function (cached) {{
+                    if (cached) {{
+                        return cached.blob();
+                    }}
+                    return fetch(url).then(function (response) {{
+                        if (response.ok) {{
+                            cache.put(url, response.clone());
+                        }}
+                        return response.blob();
+                    }});
+                }});
+            }});
+        }}
+
+        var stage = new NGL.Stage("ngl-viewer");
+        stage.setParameters({{ backgroundColor: "white" }});
+        
+        {load_source}.then(function (data) {{
+            return stage.loadFile(data, {load_params});
+        }}).then(function (component) {{
+            // Default representation - let NGL Viewer decide based on PDB content
+            component.addRepresentation("cartoon");
+            
+            // Try different selections for ligands
+            component.addRepresentation("ball+stick", {{ sele: "hetero" }});
+            component.addRepresentation("ball+stick", {{ sele: "UNL" }});
+            component.addRepresentation("ball+stick", {{ sele: "not protein" }});
+            
+            component.autoView();
+        }});
+        
+        // Prevent page scroll when zooming
+        var viewerDiv = document.getElementById("ngl-viewer");
+        viewerDiv.addEventListener('wheel', function(event) {{
+            event.preventDefault();
+        }}, {{ passive: false }});
+    </script>
+    """
+    return html_code
@@ -0,0 +1,134 @@
+"""
+Headless interacting-residue extraction for docked ligand libraries.
+
+Does what Code_S13 used to do in ChimeraX (open receptor, viewdockx the
+first pose, "select sel :< 5", save selected atoms) without ChimeraX and
+without reloading the receptor for every ligand:
+    - the receptor is parsed once and indexed with a cell list
+      (binding_pocket.ReceptorIndex)
+    - each .pdbqt ligand's first pose is read and every receptor residue
+      with an atom within the cutoff is selected
+    - <ligand>_interacting_residues.pdb is written with those residues
+      followed by the ligand pose, like ChimeraX's "save ... selectedOnly true"
+
+Ligands are processed in parallel worker processes, each building the
+receptor index once.
+
+    python interacting_residues.py receptor.pdbqt ligands/ output/ --cutoff 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from binding_pocket import ReceptorIndex, ligand_coordinates
+
+DEFAULT_CUTOFF = 5.0
+
+# AutoDock atom types that are not element symbols
+_AUTODOCK_ELEMENTS = {b"A": b"C", b"OA": b"O", b"NA": b"N", b"NS": b"N", b"SA": b"S", b"HD": b"H", b"HS": b"H"}
+
+_receptor_index = None
+
+
+def first_pose(data):
+    """Return the ATOM/HETATM lines of the first MODEL of a Vina .pdbqt (or the whole file if unmodelled)."""
+    lines = []
+    for line in data.splitlines():
+        if line.startswith(b"ENDMDL"):
+            break
+        if line[:6] in (b"ATOM  ", b"HETATM"):
+            lines.append(line)
+    return lines
+
+
+def to_pdb_record(line):
+    """Rewrite a PDB or PDBQT atom line as a plain PDB record (columns 1-66 plus the element)."""
+    line = line.rstrip()
+    if line[66:76].strip():
+        # PDBQT: partial charge in columns 71-76, AutoDock atom type in 78-79
+        atom_type = line[77:79].strip()
+    else:
+        atom_type = line[76:78].strip()
+    element = _AUTODOCK_ELEMENTS.get(atom_type, atom_type) or line[12:16].strip()[:1]
+    return line[:66].ljust(66) + b" " * 10 + element.rjust(2)
+
+
+def select_residues(receptor_index, pose_lines, cutoff=DEFAULT_CUTOFF):
+    """Return the receptor atom mask of whole residues within cutoff of the pose."""
+    mask, _ = receptor_index.pocket_atoms(ligand_coordinates(b"\n".join(pose_lines)), cutoff)
+    return mask
+
+
+def interacting_residues_pdb(receptor_index, pose_lines, cutoff=DEFAULT_CUTOFF):
+    """Return the PDB bytes of the interacting receptor residues plus the ligand pose."""
+    mask = select_residues(receptor_index, pose_lines, cutoff)
+    records = [to_pdb_record(line) for line, keep in zip(receptor_index.atom_lines, mask) if keep]
+    records.append(b"TER")
+    records += [to_pdb_record(line) for line in pose_lines]
+    records.append(b"END")
+    return b"\n".join(records) + b"\n", int(mask.sum())
+
+
+def output_path_for(ligand_path, output_folder):
+    return Path(output_folder) / f"{Path(ligand_path).stem}_interacting_residues.pdb"
+
+
+def _init_worker(receptor_data):
+    global _receptor_index
+    _receptor_index = ReceptorIndex(receptor_data)
+
+
+def _process_ligand(args):
+    ligand_path, output_folder, cutoff = args
+    pose = first_pose(Path(ligand_path).read_bytes())
+    if not pose:
+        return ligand_path, None
+    pdb, atoms = interacting_residues_pdb(_receptor_index, pose, cutoff)
+    output_path_for(ligand_path, output_folder).write_bytes(pdb)
+    return ligand_path, atoms
+
+
+def extract_all(protein_path, ligands_folder, output_folder, cutoff=DEFAULT_CUTOFF, workers=None):
+    """Write <ligand>_interacting_residues.pdb for every .pdbqt in ligands_folder.
+
+    Returns {ligand path: number of receptor atoms selected, or None if the
+    file had no atoms}.
+    """
+    Path(output_folder).mkdir(parents=True, exist_ok=True)
+    receptor_data = Path(protein_path).read_bytes()
+    ligands = sorted(Path(ligands_folder).glob("*.pdbqt"))
+    tasks = [(str(path), str(output_folder), cutoff) for path in ligands]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(tasks) < 2:
+        _init_worker(receptor_data)
+        return dict(map(_process_ligand, tasks))
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(receptor_data,)) as pool:
+        return dict(pool.map(_process_ligand, tasks, chunksize=chunksize))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the receptor residues within a cutoff of each docked ligand.")
+    parser.add_argument("protein", help="receptor .pdb or .pdbqt")
+    parser.add_argument("ligands", help="folder of Vina output .pdbqt files")
+    parser.add_argument("output", help="folder for the *_interacting_residues.pdb files")
+    parser.add_argument("--cutoff", type=float, default=DEFAULT_CUTOFF, help="distance in angstrom (default 5)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = extract_all(args.protein, args.ligands, args.output, args.cutoff, args.workers)
+    empty = [path for path, atoms in results.items() if atoms is None]
+    for path in empty:
+        print(f"No atoms found in {path}")
+    print(f"Wrote {len(results) - len(empty)} files to {args.output} in {time.perf_counter() - start:.1f}s")
+    return not empty
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
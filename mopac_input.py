@@ -0,0 +1,182 @@
+"""
+Headless MOPAC input generation from SDF files (replaces the Avogadro GUI automation in Code_S8).
+
+Reads the first molecule of each <CASRN>.sdf (V2000 or V3000 molfile),
+keeps its 3D coordinates and writes <CASRN>.mop:
+
+     AUX LARGE CHARGE=0 SINGLET PM6        <- keywords (charge / multiplicity from the molecule)
+    335-67-1                               <- title
+                                           <- comment
+      C     -1.23456700 1   0.12345600 1   2.34567800 1
+      ...
+
+The total charge comes from the molfile (M  CHG lines, or the atom block
+charge codes), and the multiplicity is SINGLET or DOUBLET from the electron
+count, as Avogadro's MOPAC dialog sets them. Files are converted across a
+process pool.
+
+    python mopac_input.py sdf_folder/ mop_folder/ --keywords "PM7 PRECISE EF EPS=78.4"
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+DEFAULT_KEYWORDS = "AUX LARGE PM6" # Avogadro's MOPAC dialog default (CHARGE and multiplicity are added)
+
+_ELEMENTS = ("H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn Ga Ge As Se Br Kr "
+             "Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb "
+             "Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb Bi Po At Rn").split()
+ATOMIC_NUMBERS = {symbol: number for number, symbol in enumerate(_ELEMENTS, 1)}
+ATOMIC_NUMBERS["D"] = 1
+# Atom block charge field of V2000 molfiles -> formal charge (4 is a doublet radical, not a charge)
+_V2000_CHARGE_CODES = {1: 3, 2: 2, 3: 1, 5: -1, 6: -2, 7: -3}
+_MULTIPLICITY_NAMES = {1: "SINGLET", 2: "DOUBLET"}
+
+Molecule = namedtuple("Molecule", ["title", "symbols", "coords", "charge"])
+
+
+def _first_record(text):
+    return text.split("$$$$")[0].splitlines()
+
+
+def _parse_v2000(lines):
+    n_atoms = int(lines[3][0:3])
+    symbols, coords, codes = [], [], []
+    for line in lines[4:4 + n_atoms]:
+        coords.append((float(line[0:10]), float(line[10:20]), float(line[20:30])))
+        symbols.append(line[31:34].strip())
+        code = line[36:39].strip()
+        codes.append(_V2000_CHARGE_CODES.get(int(code), 0) if code else 0)
+    charges = None
+    for line in lines[4 + n_atoms:]:
+        if line.startswith("M  END"):
+            break
+        if line.startswith("M  CHG"):
+            # "M  CHG" lines replace every atom block charge
+            charges = charges or {}
+            fields = line[9:].split()
+            for atom, charge in zip(fields[0::2], fields[1::2]):
+                charges[int(atom)] = int(charge)
+    total = sum(charges.values()) if charges is not None else sum(codes)
+    return symbols, coords, total
+
+
+def _parse_v3000(lines):
+    symbols, coords = [], []
+    total = 0
+    in_atoms = False
+    pending = ""
+    for line in lines:
+        if not line.startswith("M  V30 "):
+            continue
+        content = pending + line[7:].rstrip()
+        if content.endswith("-"): # Continued on the next line
+            pending = content[:-1]
+            continue
+        pending = ""
+        if content.startswith("BEGIN ATOM"):
+            in_atoms = True
+        elif content.startswith("END ATOM"):
+            break
+        elif in_atoms:
+            fields = content.split()
+            symbols.append(fields[1])
+            coords.append((float(fields[2]), float(fields[3]), float(fields[4])))
+            for field in fields[6:]:
+                if field.startswith("CHG="):
+                    total += int(field[4:])
+    return symbols, coords, total
+
+
+def parse_molfile(text):
+    """Return a Molecule from the first record of SDF / molfile text."""
+    lines = _first_record(text)
+    if len(lines) < 4:
+        raise ValueError("not a molfile: fewer than 4 lines")
+    if "V3000" in lines[3]:
+        symbols, coords, charge = _parse_v3000(lines)
+    else:
+        symbols, coords, charge = _parse_v2000(lines)
+    if not symbols:
+        raise ValueError("no atoms")
+    return Molecule(lines[0].strip(), symbols, coords, charge)
+
+
+def multiplicity(molecule):
+    """Lowest spin multiplicity for the molecule's electron count (1 if even, 2 if odd)."""
+    try:
+        electrons = sum(ATOMIC_NUMBERS[symbol.capitalize()] for symbol in molecule.symbols) - molecule.charge
+    except KeyError as e:
+        raise ValueError(f"unknown element {e.args[0]}")
+    return 1 if electrons % 2 == 0 else 2
+
+
+def is_flat(molecule):
+    return all(abs(z) < 1e-4 for _, _, z in molecule.coords)
+
+
+def mopac_input(molecule, title, keywords=DEFAULT_KEYWORDS, optimize=True):
+    """Return the .mop text: keywords, title, blank comment and Cartesian coordinates."""
+    spin = _MULTIPLICITY_NAMES.get(multiplicity(molecule))
+    header = f" {keywords} CHARGE={molecule.charge} {spin}"
+    flag = 1 if optimize else 0
+    lines = [header, title, ""]
+    for symbol, (x, y, z) in zip(molecule.symbols, molecule.coords):
+        lines.append(f"  {symbol.capitalize():<2} {x:14.8f} {flag} {y:14.8f} {flag} {z:14.8f} {flag}")
+    return "\n".join(lines) + "\n"
+
+
+def _convert_file(task):
+    sdf_path, output_folder, keywords, optimize = task
+    casrn = Path(sdf_path).stem
+    try:
+        molecule = parse_molfile(Path(sdf_path).read_text(errors="replace"))
+        text = mopac_input(molecule, casrn, keywords, optimize)
+    except (OSError, ValueError, IndexError) as e:
+        return casrn, f"failed: {e}"
+    Path(output_folder, f"{casrn}.mop").write_text(text)
+    return casrn, "2D coordinates (all z = 0)" if is_flat(molecule) else None
+
+
+def convert_folder(sdf_folder, output_folder, keywords=DEFAULT_KEYWORDS, optimize=True, workers=None):
+    """Write a .mop for every .sdf in sdf_folder; return [(CASRN, problem or None)]."""
+    os.makedirs(output_folder, exist_ok=True)
+    tasks = [(str(path), str(output_folder), keywords, optimize) for path in sorted(Path(sdf_folder).glob("*.sdf"))]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) < 2:
+        return list(map(_convert_file, tasks))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_convert_file, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write MOPAC .mop inputs for a folder of SDF files.")
+    parser.add_argument("sdf_folder")
+    parser.add_argument("output_folder")
+    parser.add_argument("--keywords", default=DEFAULT_KEYWORDS,
+                        help=f"MOPAC keywords; CHARGE= and the multiplicity are appended (default: {DEFAULT_KEYWORDS})")
+    parser.add_argument("--single-point", action="store_true", help="mark every coordinate as fixed (flag 0)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = convert_folder(args.sdf_folder, args.output_folder, args.keywords, not args.single_point, args.workers)
+    if not results:
+        print("No SDF files found in the folder.")
+        return False
+    failed = 0
+    for casrn, problem in results:
+        if problem:
+            failed += problem.startswith("failed")
+            print(f"{casrn}: {problem}")
+    print(f"Wrote {len(results) - failed} .mop files to {args.output_folder} in {time.perf_counter() - start:.1f}s")
+    return not failed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,279 @@
+"""
+Local MOPAC job scheduler (between Code_S8 input generation and Code_S9 parsing).
+
+Finds the .mop files in a folder and runs the MOPAC executable on each,
+N jobs at a time:
+- every worker slot owns one CPU core; each job is pinned to its slot's
+  core (Linux) and told to use one thread, so jobs don't compete
+- a job running past the wall-time limit is killed and marked "timeout"
+- a job is "done" when MOPAC exits with 0 and its .out file has the
+  final results block; otherwise it is "failed"
+
+Job status lives in mopac_jobs.sqlite in the .mop folder (input hash,
+status, attempts, core, run time, return code, message). A rerun skips
+finished jobs whose input is unchanged and whose .out is still there,
+requeues jobs left "running" by an interrupted sweep, and retries failed
+and timed-out jobs only with --retry-failed.
+
+    python mopac_jobs.py mop_files/ --executable MOPAC2016.exe --workers 8 --timeout 3600
+    python mopac_jobs.py mop_files/ --stub       # stand-in executable writing synthetic .out files
+    python mopac_jobs.py mop_files/ --status
+"""
+
+import argparse
+import hashlib
+import os
+import queue
+import random
+import shlex
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+JOB_TABLE_NAME = "mopac_jobs.sqlite"
+DEFAULT_EXECUTABLE = os.environ.get("MOPAC_EXE", "mopac")
+DEFAULT_TIMEOUT = 6 * 3600
+COMPLETE_MARKER = b"FINAL HEAT OF FORMATION" # Start of MOPAC's final results block
+STATUSES = ["pending", "running", "done", "failed", "timeout"]
+# Environment for pinned jobs: one core, so one thread
+SINGLE_THREAD_ENV = {"OMP_NUM_THREADS": "1", "MKL_NUM_THREADS": "1", "OPENBLAS_NUM_THREADS": "1"}
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def output_path_for(mop_path):
+    return Path(mop_path).with_suffix(".out")
+
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class JobTable:
+    """SQLite table of MOPAC jobs keyed by .mop file name."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS jobs (name TEXT PRIMARY KEY, input_hash TEXT, status TEXT, "
+                            "attempts INTEGER, core INTEGER, started_at REAL, finished_at REAL, seconds REAL, "
+                            "returncode INTEGER, message TEXT)")
+
+    def sync(self, folder):
+        """Add new .mop files, requeue changed ones and jobs left running; return the number requeued."""
+        folder = Path(folder)
+        with self.lock:
+            known = dict(self.db.execute("SELECT name, input_hash FROM jobs"))
+            done = {name for (name,) in self.db.execute("SELECT name FROM jobs WHERE status = 'done'")}
+        requeue = []
+        for path in sorted(folder.glob("*.mop")):
+            digest = file_hash(path)
+            if known.get(path.name) != digest:
+                requeue.append((path.name, digest))
+            elif path.name in done and not output_path_for(path).exists():
+                requeue.append((path.name, digest))
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO jobs (name, input_hash, status, attempts) "
+                                "VALUES (?, ?, 'pending', 0)", requeue)
+            interrupted = self.db.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'").rowcount
+        return len(requeue) + interrupted
+
+    def runnable(self, retry_failed=False):
+        statuses = ("pending", "failed", "timeout") if retry_failed else ("pending",)
+        with self.lock:
+            rows = self.db.execute(f"SELECT name FROM jobs WHERE status IN ({', '.join('?' * len(statuses))}) "
+                                   "ORDER BY name", statuses)
+            return [name for (name,) in rows]
+
+    def start(self, name, core):
+        with self.lock, self.db:
+            self.db.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, core = ?, started_at = ?, "
+                            "finished_at = NULL, seconds = NULL, returncode = NULL, message = NULL WHERE name = ?",
+                            (core, time.time(), name))
+
+    def finish(self, name, status, returncode, seconds, message):
+        with self.lock, self.db:
+            self.db.execute("UPDATE jobs SET status = ?, finished_at = ?, seconds = ?, returncode = ?, message = ? "
+                            "WHERE name = ?", (status, time.time(), seconds, returncode, message, name))
+
+    def counts(self):
+        with self.lock:
+            counts = dict(self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+        return {status: counts.get(status, 0) for status in STATUSES}
+
+    def problems(self):
+        """[(name, status, message)] of failed and timed-out jobs."""
+        with self.lock:
+            return self.db.execute("SELECT name, status, message FROM jobs WHERE status IN ('failed', 'timeout') "
+                                   "ORDER BY name").fetchall()
+
+    def close(self):
+        self.db.close()
+
+
+def output_complete(out_path):
+    if not out_path.exists():
+        return False
+    with open(out_path, "rb") as f:
+        return any(COMPLETE_MARKER in line for line in f)
+
+
+def run_job(command, mop_path, core=None, timeout=DEFAULT_TIMEOUT):
+    """Run command + [mop file] in the .mop folder; return (status, returncode, seconds, message)."""
+    mop_path = Path(mop_path)
+    env = dict(os.environ)
+    if core is not None:
+        env.update(SINGLE_THREAD_ENV)
+    # A .out left by an earlier attempt must not pass for this run's output
+    output_path_for(mop_path).unlink(missing_ok=True)
+    # On Linux the affinity set here applies to the calling thread only and the child inherits it,
+    # so MOPAC starts on its core (preexec_fn is not safe with several worker threads)
+    previous_cores = None
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            previous_cores = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, {core})
+        except OSError:
+            previous_cores = None # The core is not ours; the job still runs unpinned
+    start = time.monotonic()
+    try:
+        process = subprocess.Popen(command + [mop_path.name], cwd=mop_path.parent, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except OSError as e:
+        return "failed", None, 0.0, f"could not start {command[0]}: {e}"
+    finally:
+        if previous_cores is not None:
+            os.sched_setaffinity(0, previous_cores)
+    try:
+        _, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        return "timeout", process.returncode, time.monotonic() - start, f"killed after {timeout:g}s"
+    seconds = time.monotonic() - start
+    if process.returncode != 0:
+        message = stderr.decode(errors="replace").strip().splitlines()
+        return "failed", process.returncode, seconds, message[-1] if message else f"exit code {process.returncode}"
+    if not output_complete(output_path_for(mop_path)):
+        return "failed", process.returncode, seconds, "no final results in the .out file"
+    return "done", process.returncode, seconds, None
+
+
+def run_jobs(folder, executable=DEFAULT_EXECUTABLE, workers=None, timeout=DEFAULT_TIMEOUT, retry_failed=False,
+             pin=True):
+    """Run every runnable job of folder; return the status counts of the job table."""
+    folder = Path(folder)
+    command = shlex.split(executable, posix=os.name != "nt") if isinstance(executable, str) else list(executable)
+    cores = available_cores()
+    workers = workers or len(cores)
+    slots = queue.Queue()
+    for slot in range(workers):
+        slots.put(cores[slot % len(cores)] if pin else None)
+
+    table = JobTable(folder / JOB_TABLE_NAME)
+    try:
+        requeued = table.sync(folder)
+        names = table.runnable(retry_failed)
+        print(f"{len(names)} MOPAC jobs to run ({requeued} new, changed or interrupted), {workers} at a time")
+        done = [0]
+        progress = threading.Lock()
+
+        def run(name):
+            core = slots.get()
+            try:
+                table.start(name, core)
+                status, returncode, seconds, message = run_job(command, folder / name, core, timeout)
+                table.finish(name, status, returncode, seconds, message)
+            finally:
+                slots.put(core)
+            with progress:
+                done[0] += 1
+                detail = f": {message}" if message else ""
+                print(f"[{done[0]}/{len(names)}] {name} {status} in {seconds:.1f}s{detail}")
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run, names))
+        return table.counts()
+    finally:
+        table.close()
+
+
+def stub_job(mop_path):
+    """Stand-in for the MOPAC executable: writes a synthetic .out file for mop_path.
+
+    MOPAC_STUB_SECONDS sets the run time (default 0.2 s) and
+    MOPAC_STUB_FAILURE_RATE the fraction of jobs that exit with an error
+    (chosen by file name, so reruns fail the same jobs).
+    """
+    mop_path = Path(mop_path)
+    rng = random.Random(mop_path.stem)
+    time.sleep(float(os.environ.get("MOPAC_STUB_SECONDS", "0.2")))
+    if rng.random() < float(os.environ.get("MOPAC_STUB_FAILURE_RATE", "0")):
+        print(f"stub failure for {mop_path.name}", file=sys.stderr)
+        return False
+    lines = mop_path.read_text().splitlines()
+    atoms = len([line for line in lines[3:] if line.strip()])
+    homo = -rng.uniform(9, 13)
+    dipole = [rng.uniform(-2, 2) for _ in range(3)]
+    total = sum(d * d for d in dipole) ** 0.5
+    output_path_for(mop_path).write_text(
+        f" {lines[0].strip()}\n {lines[1].strip()}\n\n"
+        f"          FINAL HEAT OF FORMATION =       {rng.uniform(-900, 100):.5f} KCAL/MOL\n"
+        f"          COSMO AREA              =       {rng.uniform(100, 400):.2f} SQUARE ANGSTROMS\n"
+        f"          IONIZATION POTENTIAL    =        {-homo:.6f} EV\n"
+        f"          HOMO LUMO ENERGIES (EV) =        {homo:.3f}  {rng.uniform(-3, 1):.3f}\n"
+        f"          MOLECULAR WEIGHT        =        {atoms * 12.011:.4f}\n\n"
+        " DIPOLE           X         Y         Z       TOTAL\n"
+        " POINT-CHG.    0.000     0.000     0.000     0.000\n"
+        " HYBRID        0.000     0.000     0.000     0.000\n"
+        f" SUM        {dipole[0]:8.3f}  {dipole[1]:8.3f}  {dipole[2]:8.3f}  {total:8.3f}\n\n"
+        " == MOPAC DONE ==\n")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run MOPAC on every .mop file of a folder, resuming interrupted sweeps.")
+    parser.add_argument("folder", help="folder with the .mop files (the .out files are written next to them)")
+    parser.add_argument("--executable", default=DEFAULT_EXECUTABLE,
+                        help=f"MOPAC command, the .mop file name is appended (default: $MOPAC_EXE or {DEFAULT_EXECUTABLE})")
+    parser.add_argument("--stub", action="store_true", help="run the synthetic stand-in instead of MOPAC")
+    parser.add_argument("--workers", type=int, default=None, help="jobs at a time (default: one per available core)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="wall-time limit per job in seconds")
+    parser.add_argument("--retry-failed", action="store_true", help="rerun failed and timed-out jobs")
+    parser.add_argument("--no-pin", action="store_true", help="do not pin jobs to cores")
+    parser.add_argument("--status", action="store_true", help="print the job table counts and exit")
+    parser.add_argument("--stub-job", action="store_true", help=argparse.SUPPRESS) # folder is then the .mop file
+    args = parser.parse_args()
+
+    if args.stub_job:
+        return stub_job(args.folder)
+    if args.status:
+        table = JobTable(Path(args.folder) / JOB_TABLE_NAME)
+        print(", ".join(f"{status}: {count}" for status, count in table.counts().items()))
+        for name, status, message in table.problems():
+            print(f"  {name} {status}: {message}")
+        table.close()
+        return True
+
+    executable = [sys.executable, os.path.abspath(__file__), "--stub-job"] if args.stub else args.executable
+    start = time.perf_counter()
+    counts = run_jobs(args.folder, executable, args.workers, args.timeout, args.retry_failed, not args.no_pin)
+    print(", ".join(f"{status}: {count}" for status, count in counts.items()),
+          f"({time.perf_counter() - start:.1f}s)")
+    return counts["failed"] == 0 and counts["timeout"] == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
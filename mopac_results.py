@@ -0,0 +1,249 @@
+"""
+Parallel, incremental parser for MOPAC .out files (used by Code_S9).
+
+Reads the descriptors of MOPAC's final results block from every .out file
+in a folder:
+
+    Molecular Weight       MOLECULAR WEIGHT        =  414.0703
+    HOMO, LUMO (eV)        HOMO LUMO ENERGIES (EV) =  -12.674  -1.234
+    Ionization Potential   IONIZATION POTENTIAL    =  12.674357 EV
+    Heat of Formation      FINAL HEAT OF FORMATION =  -836.72545 KCAL/MOL
+    Dipole (Debye)         TOTAL of the SUM row of the DIPOLE table
+    COSMO Area             COSMO AREA              =  215.96 SQUARE ANGSTROMS
+
+Files are read line by line in a process pool, and reading stops as soon
+as every requested field has been found (the results block is printed
+once, so the first match is the final value). mopac_results_cache.json in
+the .out folder keeps each file's (mtime, size) and parsed values, so a
+rerun only parses new or changed outputs. The result is one typed table, written
+as Parquet or CSV depending on the output file's extension.
+
+    python mopac_results.py out_files/ "MOPAC results.csv"
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+CACHE_FILE_NAME = "mopac_results_cache.json"
+CACHE_VERSION = 1
+
+_NUMBER = rb"([-+]?\d*\.?\d+(?:[EeDd][-+]?\d+)?)"
+
+# field -> (line keyword, regex capturing the value(s)); HOMO and LUMO share one line
+_LINE_FIELDS = {
+    "molecular_weight": (b"MOLECULAR WEIGHT", re.compile(rb"MOLECULAR WEIGHT\s*=\s*" + _NUMBER)),
+    "homo_lumo": (b"HOMO LUMO ENERGIES", re.compile(rb"HOMO LUMO ENERGIES.*=\s*" + _NUMBER + rb"\s+" + _NUMBER)),
+    "ionization_potential": (b"IONIZATION POTENTIAL", re.compile(rb"IONIZATION POTENTIAL\s*=\s*" + _NUMBER)),
+    "heat_of_formation": (b"HEAT OF FORMATION", re.compile(rb"HEAT OF FORMATION\s*=\s*" + _NUMBER)),
+    "cosmo_area": (b"COSMO AREA", re.compile(rb"COSMO AREA\s*=\s*" + _NUMBER)),
+}
+_DIPOLE_HEADER_RE = re.compile(rb"^\s*DIPOLE\s+X\s+Y\s+Z\s+TOTAL")
+_DIPOLE_SUM_RE = re.compile(rb"^\s*SUM\s+.*?" + _NUMBER + rb"\s*$")
+_DIPOLE_TABLE_ROWS = 3 # POINT-CHG., HYBRID, SUM
+
+# field -> output column(s)
+FIELD_COLUMNS = {
+    "molecular_weight": ["Molecular Weight"],
+    "homo_lumo": ["HOMO", "LUMO"],
+    "ionization_potential": ["Ionization Potential"],
+    "heat_of_formation": ["Heat of Formation"],
+    "dipole": ["Dipole"],
+    "cosmo_area": ["COSMO Area"],
+}
+FIELDS = list(FIELD_COLUMNS)
+REQUIRED_FIELDS = ["molecular_weight", "homo_lumo"] # What Code_S9 always required
+
+# column -> dtype of the result table
+RESULT_COLUMNS = {
+    "CASRN": "string",
+    "Molecular Weight": "float64",
+    "HOMO": "float64",
+    "LUMO": "float64",
+    "Ionization Potential": "float64",
+    "Heat of Formation": "float64",
+    "Dipole": "float64",
+    "COSMO Area": "float64",
+    "File": "string",
+}
+
+
+def _float(value):
+    return float(value.replace(b"D", b"E").replace(b"d", b"e"))
+
+
+def parse_out_lines(lines, fields=FIELDS):
+    """Return {field: value} from an iterable of MOPAC output lines (bytes), stopping once all are found.
+
+    homo_lumo is a (HOMO, LUMO) pair; fields that are not found are None.
+    """
+    pending = [field for field in fields if field in _LINE_FIELDS]
+    want_dipole = "dipole" in fields
+    values = dict.fromkeys(fields)
+    dipole_rows = 0 # rows of the DIPOLE table still to read
+    for line in lines:
+        if dipole_rows:
+            dipole_rows -= 1
+            match = _DIPOLE_SUM_RE.match(line)
+            if match:
+                values["dipole"] = _float(match.group(1))
+                want_dipole = False
+                dipole_rows = 0
+        elif b"=" in line:
+            for field in pending:
+                keyword, regex = _LINE_FIELDS[field]
+                if keyword in line:
+                    match = regex.search(line)
+                    if match:
+                        numbers = [_float(group) for group in match.groups()]
+                        values[field] = tuple(numbers) if len(numbers) > 1 else numbers[0]
+                        pending.remove(field)
+                    break
+        elif want_dipole and b"DIPOLE" in line and _DIPOLE_HEADER_RE.match(line):
+            dipole_rows = _DIPOLE_TABLE_ROWS
+        if not pending and not want_dipole:
+            break
+    return values
+
+
+def parse_out_file(path, fields=FIELDS):
+    with open(path, "rb") as f:
+        return parse_out_lines(f, fields)
+
+
+def _parse_task(task):
+    path, fields = task
+    try:
+        return parse_out_file(path, fields), None
+    except OSError as e:
+        return None, str(e)
+
+
+def _cache_path(folder):
+    return Path(folder) / CACHE_FILE_NAME
+
+
+def read_cache(folder):
+    path = _cache_path(folder)
+    if not path.exists():
+        return {}
+    try:
+        cache = json.loads(path.read_text())
+    except ValueError:
+        return {}
+    return cache.get("files", {}) if cache.get("version") == CACHE_VERSION else {}
+
+
+def write_cache(folder, files):
+    path = _cache_path(folder)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps({"version": CACHE_VERSION, "files": files}))
+    tmp_path.replace(path)
+
+
+def parse_folder(folder, fields=FIELDS, workers=None, use_cache=True):
+    """Return ({file name: {field: value}}, {file name: error}) for every .out file in folder.
+
+    Files whose (mtime, size) match the cache entry and whose cached entry
+    covers the requested fields are not read again.
+    """
+    folder = Path(folder)
+    cached = read_cache(folder) if use_cache else {}
+    entries, tasks, errors = {}, [], {}
+    for entry in sorted(os.scandir(folder), key=lambda entry: entry.name):
+        if not entry.name.endswith(".out") or not entry.is_file():
+            continue
+        stat = entry.stat()
+        previous = cached.get(entry.name)
+        if (previous and previous["mtime_ns"] == stat.st_mtime_ns and previous["size"] == stat.st_size
+                and all(field in previous["values"] for field in fields)):
+            entries[entry.name] = previous
+        else:
+            entries[entry.name] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "values": None}
+            tasks.append((entry.path, list(fields)))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) < 2:
+        results = list(map(_parse_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    for (path, _), (values, error) in zip(tasks, results):
+        name = os.path.basename(path)
+        if error is not None:
+            errors[name] = error
+            del entries[name]
+        else:
+            entries[name]["values"] = values
+
+    if use_cache and (tasks or set(cached) != set(entries)):
+        write_cache(folder, entries)
+    return {name: entry["values"] for name, entry in entries.items()}, errors
+
+
+def results_table(parsed, fields=FIELDS):
+    """Turn parse_folder results into the typed result table (one row per file)."""
+    columns = ["CASRN"] + [column for field in fields for column in FIELD_COLUMNS[field]] + ["File"]
+    rows = []
+    for name, values in parsed.items():
+        row = {"CASRN": os.path.splitext(name)[0], "File": name}
+        for field in fields:
+            value = values.get(field)
+            if field == "homo_lumo":
+                row["HOMO"], row["LUMO"] = value if value is not None else (None, None)
+            else:
+                row[FIELD_COLUMNS[field][0]] = value
+        rows.append(row)
+    dtypes = {column: RESULT_COLUMNS[column] for column in columns}
+    return pd.DataFrame(rows, columns=columns).astype(dtypes)
+
+
+def incomplete_rows(table, required=REQUIRED_FIELDS):
+    """Boolean mask of rows missing any required field."""
+    columns = [column for field in required for column in FIELD_COLUMNS[field] if column in table.columns]
+    return table[columns].isna().any(axis=1)
+
+
+def write_results(table, output_file):
+    if str(output_file).lower().endswith(".parquet"):
+        table.to_parquet(output_file, index=False)
+    else:
+        table.to_csv(output_file, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect MOPAC descriptors from a folder of .out files.")
+    parser.add_argument("folder", help="folder with the MOPAC .out files")
+    parser.add_argument("output", nargs="?", default="MOPAC results.csv", help=".csv or .parquet file to write")
+    parser.add_argument("--fields", nargs="+", choices=FIELDS, default=FIELDS, help="descriptors to extract")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument("--no-cache", action="store_true", help="parse every file again")
+    parser.add_argument("--keep-incomplete", action="store_true",
+                        help="keep files missing the molecular weight, HOMO or LUMO (left empty)")
+    args = parser.parse_args()
+
+    parsed, errors = parse_folder(args.folder, args.fields, args.workers, not args.no_cache)
+    if not parsed and not errors:
+        print("No OUT files found in the folder.")
+        return False
+    for name, error in errors.items():
+        print(f"Warning: could not read {name}: {error}")
+    table = results_table(parsed, args.fields)
+    incomplete = incomplete_rows(table, [field for field in REQUIRED_FIELDS if field in args.fields])
+    for name in table.loc[incomplete, "File"]:
+        print(f"Warning: Unable to extract all values from file {name}")
+    if not args.keep_incomplete:
+        table = table[~incomplete].reset_index(drop=True)
+    write_results(table, args.output)
+    print(f"Results for {len(table)} files written to '{args.output}'")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,113 @@
+"""
+Persistent NGL viewer component for the receptor pages.
+
+Unlike create_ngl_viewer (a fresh st.components.v1.html iframe per rerun),
+this component stays mounted across reruns: the NGL stage is created once,
+structures already in the stage are kept, and only structures whose URL
+changed are fetched and swapped. Clicked atoms are sent back to Python as
+the component value.
+
+The frontend lives in ngl_viewer_frontend/ and loads the committed ngl.js
+(NGL 1.0.0-beta.4, MIT licence), so it works without internet access and is
+never fetched from a CDN. The bundle is the dist build shipped in the MDsrv
+wheel on PyPI and is pinned by its SHA-256. Check it, or fetch it again from
+the pinned source, with:
+    python ngl_viewer.py
+    python ngl_viewer.py --vendor
+"""
+
+import argparse
+import functools
+import hashlib
+import io
+import sys
+import urllib.request
+import zipfile
+from pathlib import Path
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+NGL_VERSION = "1.0.0-beta.4"
+NGL_SHA256 = "b93655280d7ab660b9b6362e88407b01c403f87e79b0d03739f8b9cf8c9dfefd"
+NGL_SOURCE_URL = ("https://files.pythonhosted.org/packages/2b/4e/f7e5636be378bdd114fdb6481278a8c5587d1b750cbe1d08a7c640cd22d1/"
+                  "MDsrv-0.3.5.post1-py3-none-any.whl")
+NGL_SOURCE_MEMBER = "mdsrv/webapp/js/ngl.js"
+FRONTEND_DIR = Path(__file__).parent / "ngl_viewer_frontend"
+NGL_BUNDLE_PATH = FRONTEND_DIR / "ngl.js"
+
+_component = components.declare_component("ngl_viewer", path=str(FRONTEND_DIR))
+
+
+def structure(url, kind="ligand", name=None, visible=True, color=None, format="pdb"):
+    """Describe one structure for ngl_viewer().
+
+    kind is "receptor" (cartoon), "pocket" (licorice, for a subset of
+    receptor residues) or "ligand" (ball+stick). url must be a
+    content-addressed URL from static_structures.publish_structure, since the
+    viewer uses it to decide whether a structure is already loaded. format is
+    "pdb" for gzipped PDB text or "qsb" for structure_codec binary files.
+    """
+    item = {"url": url, "kind": kind, "name": name or url, "visible": visible, "format": format}
+    if color:
+        item["color"] = color
+    return item
+
+
+def ngl_viewer(structures, height=520, key=None):
+    """Render the persistent viewer and return the last clicked atom (or None).
+
+    Keep key fixed for a page so the same viewer instance is reused on reruns.
+    """
+    problem = bundle_problem()
+    if problem:
+        st.error(f"{problem}, so the 3D viewer cannot load. Restore it from git or run "
+                 "`python ngl_viewer.py --vendor` and restart the app.")
+    return _component(structures=structures, height=height, key=key, default=None)
+
+
+@functools.lru_cache(maxsize=1)
+def bundle_problem(path=NGL_BUNDLE_PATH):
+    """Return why the vendored NGL bundle cannot be used, or None if it matches NGL_SHA256."""
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return f"The NGL bundle {FRONTEND_DIR.name}/{path.name} is missing"
+    if hashlib.sha256(data).hexdigest() != NGL_SHA256:
+        return f"The NGL bundle {FRONTEND_DIR.name}/{path.name} does not match the pinned ngl@{NGL_VERSION} checksum"
+    return None
+
+
+def vendor_ngl(url=NGL_SOURCE_URL, path=NGL_BUNDLE_PATH):
+    """Download the pinned NGL bundle from its source wheel into the component folder, checking its SHA-256."""
+    with urllib.request.urlopen(url, timeout=60) as response:
+        wheel = response.read()
+    with zipfile.ZipFile(io.BytesIO(wheel)) as archive:
+        data = archive.read(NGL_SOURCE_MEMBER)
+    digest = hashlib.sha256(data).hexdigest()
+    if digest != NGL_SHA256:
+        raise ValueError(f"{NGL_SOURCE_MEMBER} has SHA-256 {digest}, expected {NGL_SHA256}")
+    path.write_bytes(data)
+    bundle_problem.cache_clear()
+    return path, len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the NGL viewer component assets.")
+    parser.add_argument("--vendor", action="store_true",
+                        help=f"download ngl@{NGL_VERSION} again from its pinned source into {FRONTEND_DIR.name}/")
+    args = parser.parse_args()
+
+    if args.vendor:
+        path, size = vendor_ngl()
+        print(f"Saved {size / 1024:.0f} KB to {path}")
+    problem = bundle_problem()
+    if problem:
+        print(f"{problem}; the viewer cannot load structures. Restore it from git or run: python ngl_viewer.py --vendor")
+        return False
+    print(f"Vendored NGL bundle: {NGL_BUNDLE_PATH} (ngl@{NGL_VERSION}, checksum OK)")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
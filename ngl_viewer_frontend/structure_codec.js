@@ -0,0 +1,125 @@
+// Decoder for the QSB1 binary structure format written by structure_codec.py.
+// decodeStructure(arrayBuffer) returns minimal PDB text that NGL can parse.
+(function (root) {
+    "use strict";
+
+    var COORD_SCALE = 1000;
+    var COORD_ESCAPE = -32768;
+
+    // Must match ARRAY_FIELDS in structure_codec.py
+    var ARRAY_FIELDS = [
+        ["coords", "int16", "atoms", 3],
+        ["coord_escapes", "int32", "escapes", 1],
+        ["res_seq", "int32", "residues", 1],
+        ["chain_residues", "uint32", "chains", 1],
+        ["bonds", "index", "bonds", 2],
+        ["atom_name", "uint16", "atoms", 1],
+        ["res_name", "uint16", "residues", 1],
+        ["res_atoms", "uint16", "residues", 1],
+        ["element", "uint8", "atoms", 1],
+        ["res_hetero", "uint8", "residues", 1],
+        ["chain_id", "uint8", "chains", 1],
+        ["bond_order", "uint8", "bonds", 1]
+    ];
+
+    var TYPED_ARRAYS = {
+        int16: Int16Array, int32: Int32Array, uint32: Uint32Array,
+        uint16: Uint16Array, uint8: Uint8Array
+    };
+
+    function arrayLayout(header) {
+        var layout = ARRAY_FIELDS.map(function (field, order) {
+            var type = field[1];
+            if (type === "index") {
+                type = header.index_bytes === 2 ? "uint16" : "uint32";
+            }
+            return { name: field[0], type: TYPED_ARRAYS[type], length: header[field[2]] * field[3], order: order };
+        });
+        // Widest types first, keeping field order within each size (same as the Python sort)
+        layout.sort(function (a, b) {
+            return (b.type.BYTES_PER_ELEMENT - a.type.BYTES_PER_ELEMENT) || (a.order - b.order);
+        });
+        return layout;
+    }
+
+    function pad(value, width, left) {
+        value = String(value);
+        while (value.length < width) {
+            value = left ? value + " " : " " + value;
+        }
+        return value;
+    }
+
+    function formatAtomName(name, element) {
+        if (name.length < 4 && element.length === 1) {
+            return " " + pad(name, 3, true);
+        }
+        return pad(name, 4, true);
+    }
+
+    function decodeStructure(buffer) {
+        var bytes = new Uint8Array(buffer);
+        var magic = String.fromCharCode(bytes[0], bytes[1], bytes[2], bytes[3]);
+        if (magic !== "QSB1") {
+            throw new Error("Not a QSB1 structure");
+        }
+        var view = new DataView(buffer);
+        var headerLength = view.getUint32(4, true);
+        var header = JSON.parse(new TextDecoder().decode(bytes.subarray(8, 8 + headerLength)));
+
+        var arrays = {};
+        var offset = 8 + headerLength;
+        arrayLayout(header).forEach(function (item) {
+            arrays[item.name] = new item.type(buffer, offset, item.length);
+            offset += item.length * item.type.BYTES_PER_ELEMENT;
+        });
+
+        var lines = [];
+        var coords = arrays.coords;
+        var escapes = arrays.coord_escapes;
+        var escapeIndex = 0;
+        var position = [0, 0, 0];
+        var atom = 0;
+        var residue = 0;
+
+        for (var c = 0; c < arrays.chain_id.length; c++) {
+            var chain = header.chain_ids[arrays.chain_id[c]] || " ";
+            for (var r = 0; r < arrays.chain_residues[c]; r++, residue++) {
+                var record = arrays.res_hetero[residue] ? "HETATM" : "ATOM  ";
+                var resName = pad(header.res_names[arrays.res_name[residue]], 3);
+                var resSeq = pad(arrays.res_seq[residue], 4);
+                for (var a = 0; a < arrays.res_atoms[residue]; a++, atom++) {
+                    for (var k = 0; k < 3; k++) {
+                        var delta = coords[atom * 3 + k];
+                        position[k] += delta === COORD_ESCAPE ? escapes[escapeIndex++] : delta;
+                    }
+                    var element = header.elements[arrays.element[atom]];
+                    lines.push(
+                        record + pad(atom + 1, 5) + " " +
+                        formatAtomName(header.atom_names[arrays.atom_name[atom]], element) + " " +
+                        resName + " " + chain + resSeq + "    " +
+                        pad((position[0] / COORD_SCALE).toFixed(3), 8) +
+                        pad((position[1] / COORD_SCALE).toFixed(3), 8) +
+                        pad((position[2] / COORD_SCALE).toFixed(3), 8) +
+                        "  1.00  0.00          " + pad(element, 2)
+                    );
+                }
+            }
+        }
+
+        var bonds = arrays.bonds;
+        for (var b = 0; b < arrays.bond_order.length; b++) {
+            var conect = "CONECT" + pad(bonds[b * 2] + 1, 5) + pad(bonds[b * 2 + 1] + 1, 5);
+            for (var order = 0; order < arrays.bond_order[b]; order++) {
+                lines.push(conect);
+            }
+        }
+        lines.push("END");
+        return lines.join("\n") + "\n";
+    }
+
+    root.decodeStructure = decodeStructure;
+    if (typeof module !== "undefined") {
+        module.exports = { decodeStructure: decodeStructure };
+    }
+})(typeof window !== "undefined" ? window : this);
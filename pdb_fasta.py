@@ -0,0 +1,132 @@
+"""
+Local PDB-to-FASTA conversion for the interacting-residue files.
+
+Replaces the zhanggroup.org pdb2fasta upload in Code_S12: residues are read
+from the ATOM records (one per chain / residue number / insertion code, in
+file order), mapped to one-letter codes and written one FASTA record per
+chain, the same layout the web service returns (">pdb:A" header). Ligand
+records (HETATM, or ATOM records of non-amino-acid residues such as UNL)
+are skipped.
+
+    python pdb_fasta.py interacting_residues/ AA_New_BPAs.xlsx
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+THREE_TO_ONE = {
+    "ALA": "A", "ARG": "R", "ASN": "N", "ASP": "D", "CYS": "C", "GLN": "Q", "GLU": "E", "GLY": "G",
+    "HIS": "H", "ILE": "I", "LEU": "L", "LYS": "K", "MET": "M", "PHE": "F", "PRO": "P", "SER": "S",
+    "THR": "T", "TRP": "W", "TYR": "Y", "VAL": "V",
+    # Common variants written by protonation / modelling tools
+    "HID": "H", "HIE": "H", "HIP": "H", "HSD": "H", "HSE": "H", "HSP": "H", "CYX": "C", "CYM": "C",
+    "ASH": "D", "GLH": "E", "LYN": "K", "MSE": "M", "SEC": "U", "PYL": "O",
+}
+UNKNOWN_RESIDUE = "X"
+FASTA_FILE_SUFFIX = "_interacting_residues.pdb"
+
+
+def read_residues(data):
+    """Return {chain: [(residue number, insertion code, one-letter code), ...]} from PDB bytes."""
+    chains = {}
+    seen = set()
+    for line in data.splitlines():
+        if not line.startswith(b"ATOM  "):
+            continue
+        res_name = line[17:20].decode().strip()
+        code = THREE_TO_ONE.get(res_name)
+        if code is None:
+            # Unknown residues only count if they are part of the chain (have a CA atom)
+            if line[12:16].strip() != b"CA":
+                continue
+            code = UNKNOWN_RESIDUE
+        chain = line[21:22].decode().strip() or "A"
+        key = (chain, line[22:26], line[26:27])
+        if key in seen:
+            continue
+        seen.add(key)
+        chains.setdefault(chain, []).append((int(line[22:26]), line[26:27].decode().strip(), code))
+    return chains
+
+
+def chain_sequence(residues, fill_gaps=False):
+    """Join residues into a sequence; with fill_gaps, missing residue numbers become X."""
+    if not fill_gaps:
+        return "".join(code for _, _, code in residues)
+    sequence = []
+    previous = None
+    for number, _, code in residues:
+        if previous is not None and number > previous + 1:
+            sequence.append(UNKNOWN_RESIDUE * (number - previous - 1))
+        sequence.append(code)
+        previous = number
+    return "".join(sequence)
+
+
+def pdb_to_fasta(data, name="pdb", fill_gaps=False):
+    """Return FASTA text with one >name:chain record per chain."""
+    return "\n".join(f">{name}:{chain}\n{chain_sequence(residues, fill_gaps)}"
+                     for chain, residues in read_residues(data).items())
+
+
+def fasta_sequence(data, fill_gaps=False):
+    """Return the sequence text Code_S12 stores: the FASTA with the leading ">pdb:A" header removed."""
+    fasta = pdb_to_fasta(data, fill_gaps=fill_gaps)
+    if fasta.startswith(">pdb:A"):
+        fasta = fasta[len(">pdb:A"):].strip()
+    return fasta or None
+
+
+def ligand_name_for(file_name):
+    return file_name.split("_")[0]
+
+
+def _convert_file(args):
+    path, fill_gaps = args
+    return ligand_name_for(Path(path).name), fasta_sequence(Path(path).read_bytes(), fill_gaps)
+
+
+def convert_folder(folder_path, fill_gaps=False, workers=None):
+    """Return [(ligand name, sequence or None)] for every *_interacting_residues.pdb in folder_path."""
+    paths = sorted(str(path) for path in Path(folder_path).glob(f"*{FASTA_FILE_SUFFIX}"))
+    tasks = [(path, fill_gaps) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) < 2:
+        return list(map(_convert_file, tasks))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_convert_file, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+def save_to_excel(data, excel_file_path):
+    df = pd.DataFrame(data, columns=["Ligand Name", "FASTA Sequence"])
+    df.to_excel(excel_file_path, index=False)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert *_interacting_residues.pdb files to FASTA sequences.")
+    parser.add_argument("folder", help="folder with the *_interacting_residues.pdb files")
+    parser.add_argument("output", nargs="?", default="AA_New_BPAs.xlsx", help="Excel file to write")
+    parser.add_argument("--fill-gaps", action="store_true", help="insert X for missing residue numbers")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    args = parser.parse_args()
+
+    results = convert_folder(args.folder, args.fill_gaps, args.workers)
+    data = []
+    for ligand_name, sequence in results:
+        if sequence:
+            data.append((ligand_name, sequence))
+        else:
+            print(f"FASTA sequence not found for {ligand_name}")
+    save_to_excel(data, args.output)
+    print(f"Saved {len(data)} sequences to {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,179 @@
+"""
+Incremental, parallel PDB-to-PDBQT conversion with Open Babel for Code_S3.
+
+Inputs are converted in batches: one obabel process per batch of files
+(`obabel a.pdb b.pdb ... -opdbqt -m -O tmp/out.pdbqt`), several batches at
+a time. obabel numbers the -m outputs in input order, so each out<i>.pdbqt
+is moved to <name>.pdbqt. If the molecule count obabel reports does not
+match the batch, the batch is rerun one file at a time so a single bad
+input only fails itself.
+
+pdbqt_manifest.json in the output folder records the SHA-1 of each source
+.pdb; a rerun only converts new or changed files. Failures are written to
+conversion_report.json (file, return code, obabel output) instead of being
+printed and lost.
+
+    python pdbqt_conversion.py QSAR_PDB_Files QSAR_PDBQT_Files --obabel obabel
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MANIFEST_FILE_NAME = "pdbqt_manifest.json"
+REPORT_FILE_NAME = "conversion_report.json"
+DEFAULT_BATCH_SIZE = 25
+
+_CONVERTED_RE = re.compile(r"(\d+) molecules? converted")
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def output_name_for(filename):
+    return os.path.splitext(filename)[0] + ".pdbqt"
+
+
+def converted_count(stderr):
+    """Return the molecule count from obabel's 'N molecules converted' line, or None."""
+    match = _CONVERTED_RE.search(stderr)
+    return int(match.group(1)) if match else None
+
+
+def read_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_FILE_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def pending_inputs(input_dir, output_dir, manifest, force=False):
+    """Return ([(filename, source hash)] that need converting, number already up to date)."""
+    pending = []
+    skipped = 0
+    for filename in sorted(os.listdir(input_dir)):
+        if not filename.endswith(".pdb"):
+            continue
+        source_hash = file_hash(os.path.join(input_dir, filename))
+        if (not force and manifest.get(filename) == source_hash
+                and os.path.exists(os.path.join(output_dir, output_name_for(filename)))):
+            skipped += 1
+            continue
+        pending.append((filename, source_hash))
+    return pending, skipped
+
+
+def convert_single(obabel_path, input_file, output_file):
+    """Convert one file; return None on success or a failure record."""
+    result = subprocess.run([obabel_path, input_file, "-O", output_file], capture_output=True, text=True)
+    if (result.returncode == 0 and converted_count(result.stderr)
+            and os.path.exists(output_file) and os.path.getsize(output_file)):
+        return None
+    return {"file": os.path.basename(input_file), "returncode": result.returncode, "output": result.stderr.strip()}
+
+
+def convert_batch(obabel_path, input_dir, output_dir, filenames):
+    """Convert a batch of files with one obabel run; return (converted filenames, failure records)."""
+    inputs = [os.path.join(input_dir, filename) for filename in filenames]
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp:
+        if len(inputs) > 1:
+            command = [obabel_path, *inputs, "-opdbqt", "-m", "-O", os.path.join(tmp, "out.pdbqt")]
+            result = subprocess.run(command, capture_output=True, text=True)
+            produced = [os.path.join(tmp, f"out{i}.pdbqt") for i in range(1, len(inputs) + 1)]
+            if (result.returncode == 0 and converted_count(result.stderr) == len(inputs)
+                    and all(os.path.exists(path) for path in produced)):
+                for filename, path in zip(filenames, produced):
+                    shutil.move(path, os.path.join(output_dir, output_name_for(filename)))
+                return list(filenames), []
+
+        # Single file, or the batch went wrong: convert one by one to isolate the failures
+        converted, failures = [], []
+        for filename, input_file in zip(filenames, inputs):
+            tmp_output = os.path.join(tmp, output_name_for(filename))
+            failure = convert_single(obabel_path, input_file, tmp_output)
+            if failure is None:
+                shutil.move(tmp_output, os.path.join(output_dir, output_name_for(filename)))
+                converted.append(filename)
+            else:
+                failures.append(failure)
+        return converted, failures
+
+
+def convert_folder(input_dir, output_dir, obabel_path="obabel", workers=None, batch_size=DEFAULT_BATCH_SIZE,
+                   force=False):
+    """Convert every new or changed .pdb in input_dir; return (converted, skipped, failure records)."""
+    if shutil.which(obabel_path) is None and not os.path.exists(obabel_path):
+        raise FileNotFoundError(f"obabel executable not found: {obabel_path}. Check obabel_path.")
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = read_manifest(output_dir)
+    pending, skipped = pending_inputs(input_dir, output_dir, manifest, force)
+    hashes = dict(pending)
+    filenames = [filename for filename, _ in pending]
+
+    workers = workers or os.cpu_count() or 1
+    # Batches no larger than needed to give every worker some work
+    batch_size = max(1, min(batch_size, -(-len(filenames) // workers)))
+    batches = [filenames[i:i + batch_size] for i in range(0, len(filenames), batch_size)]
+
+    converted, failures = 0, []
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE_NAME)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(convert_batch, obabel_path, input_dir, output_dir, batch) for batch in batches]
+        for future in as_completed(futures):
+            done, batch_failures = future.result()
+            for filename in done:
+                manifest[filename] = hashes[filename]
+            for failure in batch_failures:
+                manifest.pop(failure["file"], None)
+            converted += len(done)
+            failures += batch_failures
+            write_json(manifest_path, manifest) # Saved per batch so an interrupted run keeps its progress
+
+    write_json(os.path.join(output_dir, REPORT_FILE_NAME),
+               {"converted": converted, "skipped": skipped, "failed": sorted(failures, key=lambda f: f["file"])})
+    return converted, skipped, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a folder of .pdb files to .pdbqt with Open Babel.")
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--obabel", default="obabel", help="path to the obabel executable")
+    parser.add_argument("--workers", type=int, default=None, help="parallel obabel processes (default: all CPUs)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="files per obabel run")
+    parser.add_argument("--force", action="store_true", help="reconvert files even if their source is unchanged")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    converted, skipped, failures = convert_folder(args.input_dir, args.output_dir, args.obabel, args.workers,
+                                                  args.batch_size, args.force)
+    print(f"Converted {converted}, skipped {skipped} unchanged, {len(failures)} failed "
+          f"in {time.perf_counter() - start:.1f}s")
+    if failures:
+        print(f"See {os.path.join(args.output_dir, REPORT_FILE_NAME)}")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,7 +1,6 @@
 import streamlit as st
 import os
-from pathlib import Path
-import base64
+import hashlib
 import subprocess
 import sys
 import pandas as pd
@@ -10,6 +9,20 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 
+import applicability_domain
+import binding_pocket
+import complex_pack
+import contact_matrix
+import dataset_manifest
+import feature_effects
+import inline_viewer
+import qspr_models
+import score_index
+import static_structures
+import supplementary_tables
+import structure_codec
+import ngl_viewer
+
 # Page configuration
 st.set_page_config(
     page_title="QSPR/QSAR Molecular Visualization Tool",
@@ -122,58 +135,196 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def load_complex_pack(folder_name):
+    return complex_pack.open_pack(folder_name)
+
+@st.cache_resource
+def load_dataset_manifest(folder_name):
+    return dataset_manifest.get_manifest(folder_name)
+
+@st.cache_data(show_spinner=False)
+def load_supplementary_table(table_id, columns=None):
+    """Read a Supplementary Table (cached Parquet copy of the workbook); columns is a tuple of names."""
+    return supplementary_tables.read_table(table_id, columns=columns)
+
+@st.cache_data(show_spinner=False)
+def load_descriptor_columns(table_id, names):
+    """Read the named descriptor columns of a table, matching the workbook's spelling of each name."""
+    available = supplementary_tables.table_columns(table_id)
+    columns = {supplementary_tables.find_column(available, name): name for name in names}
+    return load_supplementary_table(table_id, tuple(columns)).rename(columns=columns)
+
+@st.cache_data(show_spinner=False)
+def load_qspr_data(model):
+    """Rows of one QSPR model (Tables S3-S5): CASRN, pIC50, Set and the descriptors."""
+    return qspr_models.model_data(model)
+
+def fit_qspr_models(descriptors, fit_set=qspr_models.TRAINING, outlier_fraction=0.0):
+    """Fit the four QSPR models live; qspr_models caches each fit by a hash of its inputs."""
+    fits, scores = {}, {}
+    for name in qspr_models.MODELS:
+        data = load_qspr_data(name)
+        model, rows = qspr_models.fit_model(data, descriptors, fit_set, outlier_fraction)
+        fits[name] = model
+        scores[name] = qspr_models.evaluate(model, data, rows)
+    return fits, scores
+
+@st.cache_data(show_spinner=False)
+def load_ale_effects(model_name, descriptors, fit_set, grid_size):
+    """ALE curves (long table) and bounds table of one QSPR model, all descriptors predicted in one batch."""
+    _, curves = feature_effects.model_curves(load_qspr_data(model_name), descriptors, fit_set, grid_size)
+    return feature_effects.curves_table(curves), feature_effects.bounds_table(curves)
+
+@st.cache_resource(show_spinner=False)
+def load_applicability_domain(model_name):
+    """Fitted model, applicability domain (one QR factorization) and Williams table of one QSPR model."""
+    data = load_qspr_data(model_name)
+    model, rows = qspr_models.fit_model(data)
+    domain = applicability_domain.domain_for(model, data, rows)
+    return model, domain, applicability_domain.williams_table(domain, model, data, rows)
+
+@st.cache_resource(show_spinner="Computing residue contacts...")
+def load_contact_matrix(folder_name, cutoff, manifest_hash):
+    # manifest_hash is only part of the cache key, so a changed dataset is recomputed
+    return contact_matrix.load_contacts(folder_name, cutoff)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_score_index():
+    # Re-checked at most once a minute; only new or changed complex files are re-read
+    return score_index.score_index()
+
 def get_ligand_list(folder_name):
-    folder_path = Path(folder_name)
-    if not folder_path.exists():
+    manifest = load_dataset_manifest(folder_name)
+    if manifest is None:
         return []
-    ligands = []
-    
-    # Handle different file naming patterns
-    if "T50" in folder_name:
-        # T50 files: either *_top_complex.pdb or *_out_complex.pdb
-        for file in folder_path.glob("*_complex.pdb"):
-            ligand_name = file.stem.replace("_top_complex", "").replace("_out_complex", "")
-            ligands.append(ligand_name)
+    return [entry["casrn"] for entry in manifest["ligands"]]
+
+def get_ligand_entry(folder_name, ligand):
+    manifest = load_dataset_manifest(folder_name)
+    if manifest is None:
+        return None
+    return next((entry for entry in manifest["ligands"] if entry["casrn"] == ligand), None)
+
+def load_complex(folder_name, ligand):
+    """Return the PDB bytes of a ligand complex, or None if it is missing."""
+    return complex_pack.read_complex(folder_name, ligand, load_complex_pack(folder_name))
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def publish_receptor(receptor_hash, _receptor_block):
+    return static_structures.publish_structure(structure_codec.encode_structure(_receptor_block), ext="qsb")
+
+@st.cache_data(show_spinner=False, max_entries=1024)
+def publish_complex_parts(folder_name, ligand, content_hash):
+    """Publish the receptor and ligand blocks of a complex as binary static files and return their URLs."""
+    receptor, ligand_block = complex_pack.split_complex(load_complex(folder_name, ligand))
+    # The receptor block is shared by every complex in a folder, so it is only encoded once
+    receptor_url = publish_receptor(hashlib.sha256(receptor).hexdigest(), receptor)
+    return receptor_url, static_structures.publish_structure(structure_codec.encode_structure(ligand_block), ext="qsb")
+
+@st.cache_resource
+def load_receptor_index(receptor_hash, _receptor_block):
+    return binding_pocket.ReceptorIndex(_receptor_block)
+
+@st.cache_data(show_spinner=False, max_entries=1024)
+def publish_binding_pocket(folder_name, ligand, content_hash, radius):
+    """Return (URL, Pocket) for the receptor residues within radius of the ligand."""
+    receptor, ligand_block = complex_pack.split_complex(load_complex(folder_name, ligand))
+    index = load_receptor_index(hashlib.sha256(receptor).hexdigest(), receptor)
+    pocket = index.pocket(binding_pocket.ligand_coordinates(ligand_block), radius)
+    return static_structures.publish_structure(structure_codec.encode_structure(pocket.pdb), ext="qsb"), pocket
+
+def show_structure_viewer(pdb_content, entry, folder_name, receptor_name, key):
+    ligand = entry["casrn"]
+    view_mode = st.radio("View mode:", ["Full receptor", "Binding pocket"], horizontal=True, key=f"{key}_mode")
+    pocket_url, pocket = None, None
+    if view_mode == "Binding pocket":
+        radius = st.slider("Pocket radius (Å):", 3.0, 12.0, binding_pocket.DEFAULT_RADIUS, 0.5, key=f"{key}_radius")
+        pocket_url, pocket = publish_binding_pocket(folder_name, ligand, entry["sha256"], radius)
+        if pocket.residues:
+            st.caption(f"{len(pocket.residues)} residues ({pocket.atom_count} of {pocket.receptor_atom_count} "
+                       f"receptor atoms) within {radius:g} Å of {ligand}")
+            with st.expander("Pocket residues"):
+                st.write(", ".join(f"{res_name} {res_seq}{chain}" for chain, res_name, res_seq in pocket.residues))
+        else:
+            st.warning(f"No receptor residues within {radius:g} Å of {ligand}; showing the full receptor.")
+            pocket = None
+
+    # With static serving enabled the persistent viewer keeps the receptor loaded and only swaps the ligand
+    if st.get_option("server.enableStaticServing"):
+        receptor_url, ligand_url = publish_complex_parts(folder_name, ligand, entry["sha256"])
+        if pocket is not None:
+            receptor_item = ngl_viewer.structure(pocket_url, kind="pocket", name=f"{receptor_name} pocket", format="qsb")
+        else:
+            receptor_item = ngl_viewer.structure(receptor_url, kind="receptor", name=receptor_name, format="qsb")
+        picked = ngl_viewer.ngl_viewer([
+            receptor_item,
+            ngl_viewer.structure(ligand_url, kind="ligand", name=ligand, format="qsb"),
+        ], key=key)
+        if picked:
+            st.caption(f"Selected atom: {picked['atom']} ({picked['element']}) in {picked['residue']} {picked['residue_number']} — {picked['structure']}")
     else:
-        # CE files: combined_*_out.pdb
-        for file in folder_path.glob("combined_*.pdb"):
-            ligand_name = file.stem.replace("combined_", "").replace("_out", "")
-            ligands.append(ligand_name)
-    
-    return sorted(ligands)
-
-def create_ngl_viewer(pdb_content, structure_name):
-    pdb_encoded = base64.b64encode(pdb_content.encode()).decode()
-    html_code = f"""
-    <div class='viewer-container'>
-        <div id='ngl-viewer' style='width: 100%; height: 520px; border: 1px solid #ddd; border-radius: 12px;'></div>
-    </div>
-    <script src='https://unpkg.com/ngl@0.10.4/dist/ngl.js'></script>
-    <script>
-        var stage = new NGL.Stage("ngl-viewer");
-        stage.setParameters({{ backgroundColor: "white" }});
-        
-        var pdbData = atob("{pdb_encoded}");
-        stage.loadFile(new Blob([pdbData], {{type: "chemical/x-pdb"}}), {{ext: "pdb"}}).then(function (component) {{
-            // Default representation - let NGL Viewer decide based on PDB content
-            component.addRepresentation("cartoon");
-            
-            // Try different selections for ligands
-            component.addRepresentation("ball+stick", {{ sele: "hetero" }});
-            component.addRepresentation("ball+stick", {{ sele: "UNL" }});
-            component.addRepresentation("ball+stick", {{ sele: "not protein" }});
-            
-            component.autoView();
-        }});
-        
-        // Prevent page scroll when zooming
-        var viewerDiv = document.getElementById("ngl-viewer");
-        viewerDiv.addEventListener('wheel', function(event) {{
-            event.preventDefault();
-        }}, {{ passive: false }});
-    </script>
-    """
-    return html_code
+        if pocket is not None:
+            pdb_content = pocket.pdb + complex_pack.split_complex(pdb_content)[1]
+        viewer_html = inline_viewer.create_ngl_viewer(pdb_content.decode(), f"{receptor_name} + {ligand}")
+        st.components.v1.html(viewer_html, height=600)
+
+MAX_OVERLAY_LIGANDS = 50
+OVERLAY_COLORS = px.colors.qualitative.Dark24
+
+def show_ligand_overlay(folder_name, ligands, receptor_name, key):
+    """Overlay several docked ligands on one receptor, loaded once."""
+    st.markdown("### Select Ligands to Overlay")
+    selected = st.multiselect(
+        f"Choose up to {MAX_OVERLAY_LIGANDS} ligands:",
+        ligands,
+        default=ligands[:5],
+        max_selections=MAX_OVERLAY_LIGANDS,
+        key=f"{key}_ligands"
+    )
+    if not selected:
+        st.info("Select at least one ligand to overlay.")
+        return
+
+    entries = [get_ligand_entry(folder_name, ligand) for ligand in selected]
+    table = pd.DataFrame({
+        "Show": True,
+        "Ligand": selected,
+        "Vina Score": [entry["vina_score"] for entry in entries],
+        "Atoms": [entry["ligand_atoms"] for entry in entries],
+        "Color": [OVERLAY_COLORS[i % len(OVERLAY_COLORS)] for i in range(len(selected))],
+    })
+    # Toggles reset when the selection changes, since rows no longer line up
+    selection_id = hashlib.md5("\n".join(selected).encode()).hexdigest()[:8]
+    table = st.data_editor(
+        table,
+        disabled=["Ligand", "Vina Score", "Atoms", "Color"],
+        hide_index=True,
+        key=f"{key}_table_{selection_id}"
+    )
+    shown = table[table["Show"]]
+    st.caption(f"{len(shown)} of {len(selected)} ligands shown ({shown['Atoms'].sum()} ligand atoms on one {receptor_name} receptor)")
+
+    st.markdown("### 🧬 Ligand Overlay")
+    if st.get_option("server.enableStaticServing"):
+        structures = []
+        for row in table.itertuples():
+            entry = entries[row.Index]
+            receptor_url, ligand_url = publish_complex_parts(folder_name, row.Ligand, entry["sha256"])
+            if not structures:
+                structures.append(ngl_viewer.structure(receptor_url, kind="receptor", name=receptor_name, format="qsb"))
+            # Hidden ligands stay loaded, so toggling them back on does not refetch anything
+            structures.append(ngl_viewer.structure(ligand_url, kind="ligand", name=row.Ligand,
+                                                   visible=bool(row.Show), color=row.Color, format="qsb"))
+        picked = ngl_viewer.ngl_viewer(structures, key=key)
+        if picked:
+            st.caption(f"Selected atom: {picked['atom']} ({picked['element']}) in {picked['residue']} {picked['residue_number']} — {picked['structure']}")
+    else:
+        blocks = [complex_pack.split_complex(load_complex(folder_name, ligand)) for ligand in shown["Ligand"]]
+        if not blocks:
+            return
+        pdb_text = b"".join([blocks[0][0]] + [ligand_block for _, ligand_block in blocks]).decode()
+        st.components.v1.html(inline_viewer.create_ngl_viewer(pdb_text, f"{receptor_name} overlay"), height=600)
 
 def open_pdb_file(file_path):
     try:
@@ -194,79 +345,10 @@ def show_ce_ligand_comparison():
     st.markdown("## CE Ligand Comparison: Alpha vs Beta Docking Scores")
     st.markdown("Compare the docking scores for each commonly exposed ligand between ERα and ERβ.")
 
-    # Updated data matching the provided table
-    data = [
-        {"CASRN": "39239-77-5", "Alpha Docking Score": -9.9, "Beta Docking Score": -9.7, "Difference (Alpha - Beta)": -0.2},
-        {"CASRN": "67905-19-5", "Alpha Docking Score": -9.8, "Beta Docking Score": -10.4, "Difference (Alpha - Beta)": 0.6},
-        {"CASRN": "4980-53-4", "Alpha Docking Score": -9.8, "Beta Docking Score": -9.3, "Difference (Alpha - Beta)": -0.5},
-        {"CASRN": "34395-24-9", "Alpha Docking Score": -9.8, "Beta Docking Score": -10.0, "Difference (Alpha - Beta)": 0.2},
-        {"CASRN": "307-55-1", "Alpha Docking Score": -9.7, "Beta Docking Score": -9.2, "Difference (Alpha - Beta)": -0.5},
-        {"CASRN": "2144-54-9", "Alpha Docking Score": -9.6, "Beta Docking Score": -9.6, "Difference (Alpha - Beta)": 0.0},
-        {"CASRN": "17741-60-5", "Alpha Docking Score": -9.6, "Beta Docking Score": -9.2, "Difference (Alpha - Beta)": -0.4},
-        {"CASRN": "60699-51-6", "Alpha Docking Score": -9.5, "Beta Docking Score": -9.9, "Difference (Alpha - Beta)": 0.4},
-        {"CASRN": "30046-31-2", "Alpha Docking Score": -9.5, "Beta Docking Score": -9.7, "Difference (Alpha - Beta)": 0.2},
-        {"CASRN": "307-35-7", "Alpha Docking Score": -9.4, "Beta Docking Score": -8.6, "Difference (Alpha - Beta)": -0.8},
-        {"CASRN": "375-95-1", "Alpha Docking Score": -9.3, "Beta Docking Score": -8.6, "Difference (Alpha - Beta)": -0.7},
-        {"CASRN": "335-76-2", "Alpha Docking Score": -9.3, "Beta Docking Score": -9.1, "Difference (Alpha - Beta)": -0.2},
-        {"CASRN": "31506-32-8", "Alpha Docking Score": -9.3, "Beta Docking Score": -8.4, "Difference (Alpha - Beta)": -0.9},
-        {"CASRN": "865-86-1", "Alpha Docking Score": -9.2, "Beta Docking Score": -9.0, "Difference (Alpha - Beta)": -0.2},
-        {"CASRN": "68758-57-6", "Alpha Docking Score": -9.2, "Beta Docking Score": -9.8, "Difference (Alpha - Beta)": 0.6},
-        {"CASRN": "507-63-1", "Alpha Docking Score": -9.2, "Beta Docking Score": -8.5, "Difference (Alpha - Beta)": -0.7},
-        {"CASRN": "2043-54-1", "Alpha Docking Score": -9.2, "Beta Docking Score": -9.4, "Difference (Alpha - Beta)": 0.2},
-        {"CASRN": "4151-50-2", "Alpha Docking Score": -9.1, "Beta Docking Score": -8.4, "Difference (Alpha - Beta)": -0.7},
-        {"CASRN": "27619-90-5", "Alpha Docking Score": -9.1, "Beta Docking Score": -8.8, "Difference (Alpha - Beta)": -0.3},
-        {"CASRN": "25268-77-3", "Alpha Docking Score": -9.1, "Beta Docking Score": -8.7, "Difference (Alpha - Beta)": -0.4},
-        {"CASRN": "68957-62-0", "Alpha Docking Score": -9.0, "Beta Docking Score": -8.2, "Difference (Alpha - Beta)": -0.8},
-        {"CASRN": "335-71-7", "Alpha Docking Score": -9.0, "Beta Docking Score": -8.2, "Difference (Alpha - Beta)": -0.8},
-        {"CASRN": "27905-45-9", "Alpha Docking Score": -9.0, "Beta Docking Score": -8.4, "Difference (Alpha - Beta)": -0.6},
-        {"CASRN": "2043-53-0", "Alpha Docking Score": -9.0, "Beta Docking Score": -8.4, "Difference (Alpha - Beta)": -0.6},
-        {"CASRN": "1996-88-9", "Alpha Docking Score": -9.0, "Beta Docking Score": -9.0, "Difference (Alpha - Beta)": 0.0},
-        {"CASRN": "376-14-7", "Alpha Docking Score": -8.9, "Beta Docking Score": -8.5, "Difference (Alpha - Beta)": -0.4},
-        {"CASRN": "21652-58-4", "Alpha Docking Score": -8.9, "Beta Docking Score": -8.5, "Difference (Alpha - Beta)": -0.4},
-        {"CASRN": "678-39-7", "Alpha Docking Score": -8.8, "Beta Docking Score": -8.4, "Difference (Alpha - Beta)": -0.4},
-        {"CASRN": "335-67-1", "Alpha Docking Score": -8.8, "Beta Docking Score": -8.2, "Difference (Alpha - Beta)": -0.6},
-        {"CASRN": "68555-76-0", "Alpha Docking Score": -8.7, "Beta Docking Score": -8.0, "Difference (Alpha - Beta)": -0.7},
-        {"CASRN": "376-27-2", "Alpha Docking Score": -8.7, "Beta Docking Score": -7.7, "Difference (Alpha - Beta)": -1.0},
-        {"CASRN": "335-66-0", "Alpha Docking Score": -8.7, "Beta Docking Score": -8.1, "Difference (Alpha - Beta)": -0.6},
-        {"CASRN": "6014-75-1", "Alpha Docking Score": -8.6, "Beta Docking Score": -10.1, "Difference (Alpha - Beta)": 1.5},
-        {"CASRN": "1691-99-2", "Alpha Docking Score": -8.6, "Beta Docking Score": -8.2, "Difference (Alpha - Beta)": -0.4},
-        {"CASRN": "68084-62-8", "Alpha Docking Score": -8.5, "Beta Docking Score": -8.4, "Difference (Alpha - Beta)": -0.1},
-        {"CASRN": "16517-11-6", "Alpha Docking Score": -8.5, "Beta Docking Score": -8.2, "Difference (Alpha - Beta)": -0.3},
-        {"CASRN": "65104-65-6", "Alpha Docking Score": -8.4, "Beta Docking Score": -8.6, "Difference (Alpha - Beta)": 0.2},
-        {"CASRN": "27619-91-6", "Alpha Docking Score": -8.4, "Beta Docking Score": -9.4, "Difference (Alpha - Beta)": 1.0},
-        {"CASRN": "65104-67-8", "Alpha Docking Score": -8.3, "Beta Docking Score": -9.4, "Difference (Alpha - Beta)": 1.1},
-        {"CASRN": "67584-56-9", "Alpha Docking Score": -8.2, "Beta Docking Score": -7.9, "Difference (Alpha - Beta)": -0.3},
-        {"CASRN": "59071-10-2", "Alpha Docking Score": -8.2, "Beta Docking Score": -8.0, "Difference (Alpha - Beta)": -0.2},
-        {"CASRN": "68555-75-9", "Alpha Docking Score": -7.9, "Beta Docking Score": -8.0, "Difference (Alpha - Beta)": 0.1},
-        {"CASRN": "68958-60-1", "Alpha Docking Score": -7.8, "Beta Docking Score": -7.9, "Difference (Alpha - Beta)": 0.1},
-        {"CASRN": "34362-49-7", "Alpha Docking Score": -7.8, "Beta Docking Score": -9.6, "Difference (Alpha - Beta)": 1.8},
-        {"CASRN": "65510-55-6", "Alpha Docking Score": -7.6, "Beta Docking Score": -9.6, "Difference (Alpha - Beta)": 2.0},
-        {"CASRN": "13252-13-6", "Alpha Docking Score": -7.2, "Beta Docking Score": -8.0, "Difference (Alpha - Beta)": 0.8},
-        {"CASRN": "307-24-4", "Alpha Docking Score": -7.1, "Beta Docking Score": -7.6, "Difference (Alpha - Beta)": 0.5},
-        {"CASRN": "67584-57-0", "Alpha Docking Score": -6.9, "Beta Docking Score": -8.3, "Difference (Alpha - Beta)": 1.4},
-        {"CASRN": "423-82-5", "Alpha Docking Score": -6.9, "Beta Docking Score": -8.3, "Difference (Alpha - Beta)": 1.4},
-        {"CASRN": "68958-61-2", "Alpha Docking Score": -6.8, "Beta Docking Score": -7.9, "Difference (Alpha - Beta)": 1.1},
-        {"CASRN": "65530-62-3", "Alpha Docking Score": -6.2, "Beta Docking Score": -6.9, "Difference (Alpha - Beta)": 0.7},
-        {"CASRN": "82113-65-3", "Alpha Docking Score": -6.1, "Beta Docking Score": -6.7, "Difference (Alpha - Beta)": 0.6},
-        {"CASRN": "375-22-4", "Alpha Docking Score": -5.8, "Beta Docking Score": -6.5, "Difference (Alpha - Beta)": 0.7},
-        {"CASRN": "65530-61-2", "Alpha Docking Score": -5.3, "Beta Docking Score": -5.6, "Difference (Alpha - Beta)": 0.3},
-        {"CASRN": "422-64-0", "Alpha Docking Score": -5.3, "Beta Docking Score": -5.3, "Difference (Alpha - Beta)": 0.0},
-        {"CASRN": "118400-71-8", "Alpha Docking Score": -7.7, "Beta Docking Score": -7.6, "Difference (Alpha - Beta)": -0.1},
-        {"CASRN": "27619-97-2", "Alpha Docking Score": -8.6, "Beta Docking Score": -8.0, "Difference (Alpha - Beta)": -0.6},
-        {"CASRN": "377-73-1", "Alpha Docking Score": -6.5, "Beta Docking Score": -6.5, "Difference (Alpha - Beta)": 0.0},
-        {"CASRN": "68140-18-1", "Alpha Docking Score": -4.8, "Beta Docking Score": -5.0, "Difference (Alpha - Beta)": 0.2},
-        {"CASRN": "68298-80-6", "Alpha Docking Score": -6.6, "Beta Docking Score": -7.4, "Difference (Alpha - Beta)": 0.8},
-        {"CASRN": "68298-81-7", "Alpha Docking Score": -7.9, "Beta Docking Score": -7.9, "Difference (Alpha - Beta)": 0.0},
-        {"CASRN": "68555-74-8", "Alpha Docking Score": -7.9, "Beta Docking Score": -7.4, "Difference (Alpha - Beta)": -0.5},
-        {"CASRN": "97659-47-7", "Alpha Docking Score": -9.9, "Beta Docking Score": -10.3, "Difference (Alpha - Beta)": 0.4},
-        {"CASRN": "61660-12-6", "Alpha Docking Score": -6.5, "Beta Docking Score": -6.5, "Difference (Alpha - Beta)": 0.0},
-        {"CASRN": "65530-66-7", "Alpha Docking Score": -5.8, "Beta Docking Score": -6.0, "Difference (Alpha - Beta)": 0.2},
-        {"CASRN": "78560-44-8", "Alpha Docking Score": -6.2, "Beta Docking Score": -6.5, "Difference (Alpha - Beta)": 0.3},
-        {"CASRN": "83048-65-1", "Alpha Docking Score": -6.0, "Beta Docking Score": -6.3, "Difference (Alpha - Beta)": 0.3},
-        {"CASRN": "21615-47-4", "Alpha Docking Score": -6.5, "Beta Docking Score": -6.8, "Difference (Alpha - Beta)": 0.3},
-        {"CASRN": "65530-63-4", "Alpha Docking Score": -6.0, "Beta Docking Score": -6.3, "Difference (Alpha - Beta)": 0.3}
-    ]
-    df = pd.DataFrame(data)
+    # Docking scores of the commonly exposed ligands (Table S5)
+    df = load_descriptor_columns("S5", ["CASRN", "ERα Docking Score (kcal/mol)", "ERβ Docking Score (kcal/mol)"])
+    df = df.rename(columns={"ERα Docking Score (kcal/mol)": "Alpha Docking Score", "ERβ Docking Score (kcal/mol)": "Beta Docking Score"})
+    df["Difference (Alpha - Beta)"] = (df["Alpha Docking Score"] - df["Beta Docking Score"]).round(2)
     st.markdown("### 📋 Docking Score Comparison Table")
     st.dataframe(df, use_container_width=True)
 
@@ -334,29 +416,26 @@ def show_chemical_descriptor_analysis():
     st.markdown("## Chemical Descriptor Analysis")
     st.markdown("Property distributions and trends based on normalized coefficients across QSPR models.")
 
-    # Updated descriptor coefficients from the provided table
-    data = [
-        ["# of H-Bond Acceptors", 0.0408, 0.1842, -0.4964, -0.3563],
-        ["# of H-Bond Donors", -0.0322, 0.0363, -0.0487, -0.0212],
-        ["LogD", 0.2422, 0.8252, 0.1923, -0.3679],
-        ["Average Mass", 49.2514, 30.1649, -4.1092, 7.8995],
-        ["Density", 0.0219, 0.0420, 0.0513, 0.0445],
-        ["F- Max", 0.0011, -0.0048, -0.0043, 0.0034],
-        ["HOMO", -0.0449, -0.0459, 0.7999, 0.1153],
-        ["LUMO", 0.0434, 0.1306, 0.1539, 0.3954],
-        ["Polar Surface Area", -0.9347, 0.2707, 10.6211, 4.1924],
-        ["Surface Tension", -1.3549, -1.3352, -2.3411, -1.5560],
-        ["# of Freely Rotating Bonds", -2.3991, -3.3561, 1.0370, 2.6684],
-    ]
-    df = pd.DataFrame(data, columns=[
-        "Descriptor",
-        "Top Binders ERα",
-        "Top Binders ERβ", 
-        "Commonly Exposed ERα",
-        "Commonly Exposed ERβ"
-    ])
+    all_descriptors = list(qspr_models.DESCRIPTORS)
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        descriptors = st.multiselect("Descriptors:", all_descriptors, default=all_descriptors, key="qspr_descriptors")
+    with col2:
+        fit_on = st.radio("Fit on:", ["Training set", "All chemicals"], key="qspr_fit_on")
+    if not descriptors:
+        st.warning("Select at least one descriptor.")
+        return
+
+    # Live fits of the four MLR models on the descriptor tables (Tables S3-S5)
+    fit_set = qspr_models.TRAINING if fit_on == "Training set" else None
+    fits, scores = fit_qspr_models(tuple(descriptors), fit_set)
+    df = qspr_models.coefficient_table(fits).round(4).reset_index()
     st.markdown("### 📋 QSPR Model Coefficients Table")
+    st.caption("Standardized coefficients: the change in pIC50, in standard deviations, per standard deviation of each descriptor.")
     st.dataframe(df, use_container_width=True)
+    fit_table = pd.DataFrame(scores).T[["n (Train)", "R² (Train)", "R² (Test)"]].astype({"n (Train)": int})
+    fit_table = fit_table.rename_axis("Model").reset_index()
+    st.dataframe(fit_table.round(3), use_container_width=True, hide_index=True)
 
     # Heatmap
     st.markdown("### 🔥 Descriptor Coefficient Heatmap")
@@ -391,17 +470,17 @@ def show_chemical_descriptor_analysis():
     st.plotly_chart(fig_heatmap, use_container_width=True, config={"displayModeBar": False, "staticPlot": True})
     
     # Add a note about the color scaling
-    st.caption("💡 **Color Scale Note**: The heatmap uses percentile-based scaling to better visualize coefficient patterns. Extreme values (like Average Mass) are scaled to show relative importance while maintaining visibility of other descriptors.")
+    st.caption("💡 **Color Scale Note**: The heatmap uses percentile-based scaling to better visualize coefficient patterns. The color range is clipped at the 5th/95th percentile so smaller coefficients stay visible.")
 
     # Top Influencers
     st.markdown("### ⭐ Top Influential Descriptors per Model")
     st.write("For each model, the top 3 positive and top 3 negative normalized coefficients are shown. This highlights the most important features for binding affinity prediction.")
-    models = ["Top Binders ERα", "Top Binders ERβ", "Commonly Exposed ERα", "Commonly Exposed ERβ"]
+    models = list(qspr_models.MODELS)
     for model in models:
         st.markdown(f"#### {model} Model")
         top_pos = df.nlargest(3, model)[["Descriptor", model]]
         top_neg = df.nsmallest(3, model)[["Descriptor", model]]
-        top = pd.concat([top_pos, top_neg])
+        top = pd.concat([top_pos, top_neg]).drop_duplicates("Descriptor")
         fig_bar = go.Figure()
         fig_bar.add_trace(go.Bar(
             y=top["Descriptor"],
@@ -421,14 +500,51 @@ def show_chemical_descriptor_analysis():
         )
         st.plotly_chart(fig_bar, use_container_width=True, config={"displayModeBar": False, "staticPlot": True})
 
+    # Accumulated local effects of the live fits (replaces the Code_S14 iml export)
+    st.markdown("### 📈 Accumulated Local Effects (ALE)")
+    st.write("How the predicted pIC50 changes across each descriptor's range, averaged over the chemicals in each quantile interval and centered on zero. The ALE range is the spread of a descriptor's effect on the prediction.")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        ale_model = st.selectbox("Model:", models, key="ale_model")
+    with col2:
+        grid_size = st.slider("Grid size:", 5, 50, feature_effects.DEFAULT_GRID_SIZE, key="ale_grid_size")
+    curves, bounds = load_ale_effects(ale_model, tuple(descriptors), fit_set, grid_size)
+    if bounds.empty:
+        st.warning("The selected descriptors are constant on the fitted rows; there is no effect to show.")
+    else:
+        shown = bounds.sort_values("ALE_range", ascending=False)["Descriptor"].tolist()
+        n_cols = 3
+        n_rows = -(-len(shown) // n_cols)
+        fig_ale = make_subplots(rows=n_rows, cols=n_cols, subplot_titles=shown, vertical_spacing=0.25 / n_rows + 0.04)
+        for i, name in enumerate(shown):
+            curve = curves[curves["Descriptor"] == name]
+            fig_ale.add_trace(go.Scatter(
+                x=curve["X"], y=curve["ALE"], mode="lines+markers", line=dict(color="#3b82f6"),
+                marker=dict(size=4), name=name, showlegend=False,
+                hovertemplate=f"{name}: %{{x:.4g}}<br>ALE: %{{y:.4f}}<extra></extra>"
+            ), row=i // n_cols + 1, col=i % n_cols + 1)
+        fig_ale.update_yaxes(zeroline=True, zerolinecolor="#9ca3af", showgrid=True, gridcolor="#e5e7eb")
+        fig_ale.update_xaxes(showgrid=True, gridcolor="#e5e7eb")
+        fig_ale.update_layout(height=260 * n_rows, plot_bgcolor='white', paper_bgcolor='white',
+                              title=f"ALE of predicted pIC50 ({ale_model})")
+        st.plotly_chart(fig_ale, use_container_width=True)
+        st.dataframe(bounds.sort_values("ALE_range", ascending=False).round(4), use_container_width=True, hide_index=True)
+        st.download_button(
+            "Download ALE bounds (CSV)",
+            bounds.to_csv(index=False),
+            file_name=f"ALE_bounds_{ale_model.replace(' ', '_')}.csv",
+            mime="text/csv",
+            key="ale_download"
+        )
+
+    key_descriptors = df.set_index("Descriptor")[models].abs().mean(axis=1).nlargest(3).index
     st.markdown("### 💡 Key Insights")
-    st.info("""
+    st.info(f"""
     - **Normalized Coefficients**: All values are standardized to allow meaningful comparison across different descriptor scales and units.
     - **Model-Specific Patterns**: Top Binders and Commonly Exposed models show distinct descriptor importance patterns.
     - **Receptor Differences**: ERα and ERβ models exhibit different coefficient patterns, indicating receptor-specific binding preferences.
-    - **Key Descriptors**: Average Mass, Polar Surface Area, and # of Freely Rotating Bonds show the largest coefficient magnitudes across models.
+    - **Key Descriptors**: {", ".join(key_descriptors)} show the largest coefficient magnitudes across models.
     - **Directional Effects**: Positive coefficients indicate increased binding affinity, while negative coefficients suggest decreased binding.
-    - **Scale Differences**: Some descriptors (like Average Mass) have much larger coefficient values due to their measurement scales, highlighting the importance of normalization.
     """)
 
 def show_qsar_results():
@@ -436,7 +552,7 @@ def show_qsar_results():
     st.markdown("## QSAR Results: Large Set Model Performance")
     st.markdown("Explore the performance of large set QSAR models for ERα and ERβ, including the effect of outlier removal.")
 
-    # Updated R² summary table with Train and Test values
+    # R² of the published large-set models (Tables S11/S12), Train and Test
     r2_data = [
         ["Alpha", "Original", 0.461, 0.385],
         ["Alpha", "10% Outliers Removed", 0.556, 0.528],
@@ -534,6 +650,134 @@ def show_qsar_results():
         beta_test_improvement = ((beta_data.iloc[2]['R² (Test)'] - beta_data.iloc[0]['R² (Test)']) / beta_data.iloc[0]['R² (Test)'] * 100).round(1)
         st.metric("Beta Test Improvement", f"{beta_test_improvement}%", f"0.446 → 0.679")
 
+    # Live fits of the Top Binders / Commonly Exposed models (Tables S3-S5)
+    st.markdown("### 🧮 Top Binders and Commonly Exposed Models (Live Fits)")
+    st.markdown("The four MLR models fitted in the app from Tables S3–S5. Removing the training chemicals with the largest residuals applies the same refinement to these smaller sets.")
+    outlier_percent = st.slider("Training outliers removed (%):", 0, 20, 0, 5, key="qsar_outliers")
+    _, scores = fit_qspr_models(tuple(qspr_models.DESCRIPTORS), qspr_models.TRAINING, outlier_percent / 100)
+    live_r2 = pd.DataFrame(scores).T.astype({"n (Train)": int, "n (Test)": int}).rename_axis("Model").reset_index()
+    st.dataframe(live_r2[["Model", "n (Train)", "R² (Train)", "R² (Test)", "RMSE (Train)", "RMSE (Test)"]].round(3),
+                 use_container_width=True, hide_index=True)
+    fig_live = go.Figure()
+    for label, color in (("Train", "#3b82f6"), ("Test", "#60a5fa")):
+        fig_live.add_trace(go.Bar(
+            name=label,
+            x=live_r2["Model"],
+            y=live_r2[f"R² ({label})"],
+            marker_color=color,
+            text=live_r2[f"R² ({label})"].round(3),
+            textposition='auto',
+        ))
+    fig_live.update_layout(
+        title=f"R² of the Live Fits ({outlier_percent}% Training Outliers Removed)",
+        xaxis_title="Model",
+        yaxis_title="R² Value",
+        barmode='group',
+        height=450,
+        yaxis=dict(range=[0, 1]),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+    )
+    st.plotly_chart(fig_live, use_container_width=True, config={"displayModeBar": False, "staticPlot": True})
+
+AD_SET_COLORS = {"Training": "#3b82f6", "Test": "#f59e0b", "Candidate": "#10b981"}
+
+def show_applicability_domain():
+    st.markdown("## 🎯 Applicability Domain")
+    st.markdown("Williams plots of the QSPR models: leverage against standardized residual. Enter new PFAS candidates to check whether a model can be trusted for them.")
+
+    model_name = st.selectbox("Model:", list(qspr_models.MODELS), key="ad_model")
+    model, domain, williams = load_applicability_domain(model_name)
+
+    st.markdown("### 🧪 Candidate Compounds")
+    st.write("Edit the descriptor values or add rows; candidates are scored as you type. A measured pIC50 is optional and adds the residual check.")
+    uploaded = st.file_uploader("Or upload a CSV of candidates (descriptor columns as in Tables S3–S5):", type=["csv"], key="ad_upload")
+    if uploaded is not None:
+        try:
+            candidates = applicability_domain.match_descriptor_columns(pd.read_csv(uploaded), model.descriptors)
+        except KeyError as e:
+            st.error(e.args[0])
+            return
+        if "CASRN" not in candidates.columns:
+            candidates.insert(0, "CASRN", [f"Candidate {i + 1}" for i in range(len(candidates))])
+        if "pIC50" not in candidates.columns:
+            candidates["pIC50"] = np.nan
+    else:
+        # Start from the median training compound
+        medians = load_qspr_data(model_name)[model.descriptors].median().round(4)
+        candidates = pd.DataFrame([{"CASRN": "Candidate 1", **medians.to_dict(), "pIC50": np.nan}])
+    source_id = hashlib.md5(f"{model_name}:{uploaded.name if uploaded else ''}".encode()).hexdigest()[:8]
+    candidates = st.data_editor(
+        candidates[["CASRN", *model.descriptors, "pIC50"]],
+        num_rows="dynamic",
+        hide_index=True,
+        key=f"ad_candidates_{source_id}"
+    )
+    values = candidates[[*model.descriptors, "pIC50"]].apply(pd.to_numeric, errors="coerce")
+    complete = values[model.descriptors].notna().all(axis=1)
+    if (~complete).any():
+        st.caption(f"{(~complete).sum()} candidate rows with missing descriptor values are not scored.")
+    scored = applicability_domain.score(domain, model, values[complete],
+                                        candidates.loc[complete, "CASRN"].fillna("").astype(str).to_numpy(), "Candidate")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Warning Leverage h*", f"{domain.h_star:.3f}", f"3(p+1)/n, p = {domain.p}, n = {domain.n}", delta_color="off")
+    with col2:
+        training = williams[williams["Set"] == "Training"]
+        st.metric("Training Outside AD", f"{training['Outside AD'].sum()} of {len(training)}")
+    with col3:
+        st.metric("Candidates Inside AD", f"{(~scored['Outside AD']).sum()} of {len(scored)}")
+
+    st.markdown("### 📉 Williams Plot")
+    points = pd.concat([williams, scored], ignore_index=True)
+    # Candidates without a measured pIC50 have no residual; they are drawn on the zero line
+    points["Plotted Residual"] = points["Standardized Residual"].fillna(0.0)
+    fig = go.Figure()
+    for set_name, group in points.groupby("Set", sort=False):
+        fig.add_trace(go.Scatter(
+            x=group["Leverage"],
+            y=group["Plotted Residual"],
+            mode="markers",
+            name=set_name,
+            marker=dict(
+                color=AD_SET_COLORS.get(set_name, "#6b7280"),
+                size=13 if set_name == "Candidate" else 8,
+                symbol="star" if set_name == "Candidate" else "circle",
+                line=dict(color=np.where(group["Outside AD"], "#dc2626", "white"), width=np.where(group["Outside AD"], 2, 0.5)),
+            ),
+            text=group["CASRN"],
+            customdata=group[["Predicted pIC50", "pIC50"]].to_numpy(),
+            hovertemplate="%{text}<br>Leverage %{x:.3f}<br>Std. residual %{y:.2f}<br>Predicted pIC50 %{customdata[0]:.2f}<br>pIC50 %{customdata[1]:.2f}<extra></extra>",
+        ))
+    limit = applicability_domain.RESIDUAL_LIMIT
+    fig.add_vline(x=domain.h_star, line_dash="dash", line_color="#6b7280", annotation_text=f"h* = {domain.h_star:.3f}")
+    for y in (-limit, limit):
+        fig.add_hline(y=y, line_dash="dash", line_color="#6b7280")
+    fig.update_layout(
+        title=f"Williams Plot: {model_name}",
+        xaxis_title="Leverage (h)",
+        yaxis_title="Standardized Residual",
+        height=550,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+    )
+    fig.update_xaxes(range=[0, max(points["Leverage"].max(), domain.h_star) * 1.1], showgrid=True, gridcolor="#e5e7eb")
+    fig.update_yaxes(showgrid=True, gridcolor="#e5e7eb")
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Red outlines mark compounds outside the domain (h > h* or |standardized residual| > 3). Training residuals are standardized as in R's rstandard(); test and candidate residuals as prediction errors, e / s√(1 + h).")
+
+    if len(scored):
+        st.markdown("### 📋 Candidate Scores")
+        st.dataframe(scored.round(4), use_container_width=True, hide_index=True)
+    st.download_button(
+        "Download Williams table (CSV)",
+        points[applicability_domain.WILLIAMS_COLUMNS].to_csv(index=False),
+        file_name=f"Williams_{model_name.replace(' ', '_')}.csv",
+        mime="text/csv",
+        key="ad_download"
+    )
+
 def main():
     st.markdown('<h1 class="main-header">🧬 QSPR/QSAR Molecular Visualization Tool</h1>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">Interactive 3D visualization of ERα and ERβ receptor-PFAS ligand structures</p>', unsafe_allow_html=True)
@@ -555,9 +799,11 @@ def main():
                 "ERα Receptor",
                 "ERβ Receptor",
                 "Data Analysis Dashboard",
+                "Residue Contacts",
                 "CE Ligand Comparison",
                 "Chemical Descriptor Analysis",
                 "QSAR Results",
+                "Applicability Domain",
                 "About"
             ]
         )
@@ -570,12 +816,16 @@ def main():
         show_beta_page()
     elif page == "Data Analysis Dashboard":
         show_data_analysis_dashboard()
+    elif page == "Residue Contacts":
+        show_residue_contacts()
     elif page == "CE Ligand Comparison":
         show_ce_ligand_comparison()
     elif page == "Chemical Descriptor Analysis":
         show_chemical_descriptor_analysis()
     elif page == "QSAR Results":
         show_qsar_results()
+    elif page == "Applicability Domain":
+        show_applicability_domain()
     elif page == "About":
         show_about_page()
 
@@ -642,13 +892,18 @@ def show_alpha_page():
     if dataset == "Commonly Exposed Set":
         folder_name = "Alpha_CE_Combined"
     else:  # Top 50 Set
-        folder_name = "Alpha_T50_Combined"
+        folder_name = "Alpha_TB_Combined"
     
     alpha_ligands = get_ligand_list(folder_name)
     if not alpha_ligands:
         st.error(f"No combined PDB files found in '{folder_name}' folder. Please run the combine_pdb.py script first.")
         return
     
+    mode = st.radio("Mode:", ["Single ligand", "Overlay ligands"], horizontal=True, key="alpha_page_mode")
+    if mode == "Overlay ligands":
+        show_ligand_overlay(folder_name, alpha_ligands, "ERα", key="alpha_overlay")
+        return
+
     st.markdown("### Select a Ligand")
     selected_ligand = st.selectbox(
         f"Choose a PFAS ligand to visualize with ERα ({dataset}):",
@@ -656,17 +911,12 @@ def show_alpha_page():
         index=0
     )
     if selected_ligand:
-        # Different file naming patterns for different datasets
-        if dataset == "Top 50 Set":
-            file_name = f"{selected_ligand}_top_complex.pdb"
-        else:  # Commonly Exposed Set
-            file_name = f"combined_{selected_ligand}_out.pdb"
-        
-        file_path = Path(folder_name) / file_name
-        if file_path.exists():
-            file_size = file_path.stat().st_size / 1024
+        entry = get_ligand_entry(folder_name, selected_ligand)
+        pdb_content = load_complex(folder_name, selected_ligand) if entry else None
+        if pdb_content is not None:
+            file_name = entry["file_name"]
+            file_size = entry["size"] / 1024
             st.info(f"**File Size:** {file_size:.1f} KB")
-            pdb_content = file_path.read_text()
             st.download_button(
                 label="📁 Download PDB File",
                 data=pdb_content,
@@ -676,8 +926,7 @@ def show_alpha_page():
             )
             st.markdown("### 🧬 Interactive 3D Molecular Viewer")
             st.markdown("**Rotate, zoom, and explore the molecular structure directly in your browser**")
-            viewer_html = create_ngl_viewer(pdb_content, f"ERα + {selected_ligand}")
-            st.components.v1.html(viewer_html, height=600)
+            show_structure_viewer(pdb_content, entry, folder_name, "ERα", key="alpha_viewer")
             st.markdown("""
             **Viewer Controls:**
             - **Mouse**: Rotate the structure
@@ -687,10 +936,10 @@ def show_alpha_page():
             """)
             st.markdown("### File Preview")
             with st.expander("View PDB file content (first 50 lines)"):
-                lines = pdb_content.split('\n')[:50]
+                lines = pdb_content.decode().splitlines()[:50]
                 st.code('\n'.join(lines))
         else:
-            st.error(f"❌ Combined PDB file not found: {file_path}")
+            st.error(f"❌ Combined PDB file not found for {selected_ligand} in {folder_name}")
 
 def show_beta_page():
     st.markdown("## 🧬 ERβ Receptor Visualization")
@@ -707,13 +956,18 @@ def show_beta_page():
     if dataset == "Commonly Exposed Set":
         folder_name = "Beta_CE_Combined"
     else:  # Top 50 Set
-        folder_name = "Beta_T50_Combined"
+        folder_name = "Beta_TB_Combined"
     
     beta_ligands = get_ligand_list(folder_name)
     if not beta_ligands:
         st.error(f"No combined PDB files found in '{folder_name}' folder. Please run the combine_pdb.py script first.")
         return
     
+    mode = st.radio("Mode:", ["Single ligand", "Overlay ligands"], horizontal=True, key="beta_page_mode")
+    if mode == "Overlay ligands":
+        show_ligand_overlay(folder_name, beta_ligands, "ERβ", key="beta_overlay")
+        return
+
     st.markdown("### Select a Ligand")
     selected_ligand = st.selectbox(
         f"Choose a PFAS ligand to visualize with ERβ ({dataset}):",
@@ -721,17 +975,12 @@ def show_beta_page():
         index=0
     )
     if selected_ligand:
-        # Different file naming patterns for different datasets
-        if dataset == "Top 50 Set":
-            file_name = f"{selected_ligand}_out_complex.pdb"
-        else:  # Commonly Exposed Set
-            file_name = f"combined_{selected_ligand}_out.pdb"
-        
-        file_path = Path(folder_name) / file_name
-        if file_path.exists():
-            file_size = file_path.stat().st_size / 1024
+        entry = get_ligand_entry(folder_name, selected_ligand)
+        pdb_content = load_complex(folder_name, selected_ligand) if entry else None
+        if pdb_content is not None:
+            file_name = entry["file_name"]
+            file_size = entry["size"] / 1024
             st.info(f"**File Size:** {file_size:.1f} KB")
-            pdb_content = file_path.read_text()
             st.download_button(
                 label="📁 Download PDB File",
                 data=pdb_content,
@@ -741,8 +990,7 @@ def show_beta_page():
             )
             st.markdown("### 🧬 Interactive 3D Molecular Viewer")
             st.markdown("**Rotate, zoom, and explore the molecular structure directly in your browser**")
-            viewer_html = create_ngl_viewer(pdb_content, f"ERβ + {selected_ligand}")
-            st.components.v1.html(viewer_html, height=600)
+            show_structure_viewer(pdb_content, entry, folder_name, "ERβ", key="beta_viewer")
             st.markdown("""
             **Viewer Controls:**
             - **Mouse**: Rotate the structure
@@ -752,70 +1000,48 @@ def show_beta_page():
             """)
             st.markdown("### File Preview")
             with st.expander("View PDB file content (first 50 lines)"):
-                lines = pdb_content.split('\n')[:50]
+                lines = pdb_content.decode().splitlines()[:50]
                 st.code('\n'.join(lines))
         else:
-            st.error(f"❌ Combined PDB file not found: {file_path}")
+            st.error(f"❌ Combined PDB file not found for {selected_ligand} in {folder_name}")
 
 def show_data_analysis_dashboard():
     st.markdown("## 📊 Data Analysis Dashboard")
     st.markdown("**Statistical summaries and visualizations of the 4 datasets**")
 
-    # Real statistics from parsed Excel files (means only)
-    summary_data = [
-        {
-            "Dataset": "CE Ligands",
-            "Ligand Count": 69,
-            "Alpha Docking Score": "-8.149275362",
-            "Beta Docking Score": "-8.253623188",
-            "LogP": "5.727246377",
-            "MW": "505.3214551",
-            "PSA": "41.26086957"
-        },
-        {
-            "Dataset": "Alpha TB",
-            "Ligand Count": 69,
-            "Alpha Docking Score": "-11.27",
-            "Beta Docking Score": "—",
-            "LogP": "6.01",
-            "MW": "507.02",
-            "PSA": "17.08"
-        },
-        {
-            "Dataset": "Beta TB",
-            "Ligand Count": 69,
-            "Alpha Docking Score": "—",
-            "Beta Docking Score": "-11.02608696",
-            "LogP": "5.519036232",
-            "MW": "568.5555623",
-            "PSA": "16.73855072"
-        }
-    ]
+    # Descriptor means from Tables S5 (CE), S3 (Alpha TB) and S4 (Beta TB)
+    descriptor_names = {"ACD/LogD (pH 7.4)": "LogP", "Average Mass (g/mol)": "MW", "Polar Surface Area (Å²)": "PSA"}
+    summary_data = []
+    for dataset, table_id in [("CE Ligands", "S5"), ("Alpha TB", "S3"), ("Beta TB", "S4")]:
+        table = load_descriptor_columns(table_id, list(descriptor_names)).rename(columns=descriptor_names)
+        summary_data.append({"Dataset": dataset, "Ligand Count": len(table), **table.mean().to_dict()})
     df_summary = pd.DataFrame(summary_data)
     st.markdown("### 📋 Dataset Comparison")
     st.dataframe(df_summary, use_container_width=True)
 
-    # Prepare data for charts (means only)
-    chart_data = pd.DataFrame({
-        "Dataset": ["CE Ligands (Alpha)", "CE Ligands (Beta)", "Alpha TB", "Beta TB"],
-        "Docking Score Mean": [-8.149275362, -8.253623188, -11.27, -11.02608696],
-        "Type": ["CE", "CE", "TB", "TB"],
-        "Receptor": ["Alpha", "Beta", "Alpha", "Beta"]
-    })
+    # Docking scores from the REMARK VINA RESULT records of the complex files
+    scores = load_score_index()
+    valid = score_index.valid_scores(scores)
+    docking_summary = score_index.summarize(valid)
+    colors = ["#2563eb", "#14b8a6", "#f59e42", "#e11d48"]
 
-    # Chart: Docking Score Means (no error bars)
     st.markdown("### 🎯 Docking Score Comparison")
+    st.dataframe(docking_summary.style.format(precision=3), use_container_width=True, hide_index=True)
+    excluded = scores[~scores.index.isin(valid.index)]
+    if len(excluded):
+        st.caption("Excluded (non-negative Vina score): " + ", ".join(
+            f"{row['CASRN']} in {row['Dataset']} ({row['Vina Score']:.1f} kcal/mol)" for _, row in excluded.iterrows()))
+
     fig_docking = go.Figure()
-    colors = ["#2563eb", "#14b8a6", "#f59e42", "#e11d48"]
-    for i, row in chart_data.iterrows():
+    for i, row in docking_summary.iterrows():
         fig_docking.add_trace(go.Bar(
             x=[row["Dataset"]],
-            y=[row["Docking Score Mean"]],
+            y=[row["Mean"]],
             name=row["Dataset"],
-            marker_color=colors[i]
+            marker_color=colors[i % len(colors)]
         ))
-    min_ds = min(chart_data["Docking Score Mean"])
-    max_ds = max(chart_data["Docking Score Mean"])
+    min_ds = docking_summary["Mean"].min()
+    max_ds = docking_summary["Mean"].max()
     fig_docking.update_layout(
         barmode='group',
         title="Average Docking Scores",
@@ -827,14 +1053,22 @@ def show_data_analysis_dashboard():
     )
     st.plotly_chart(fig_docking, use_container_width=True, config={"displayModeBar": False, "staticPlot": True})
 
+    fig_distribution = px.box(
+        valid, x="Dataset", y="Vina Score", color="Dataset", points="all",
+        hover_data=["CASRN"], color_discrete_sequence=colors,
+        title="Docking Score Distributions"
+    )
+    fig_distribution.update_layout(yaxis_title="Docking Score (kcal/mol)", height=400, showlegend=False)
+    st.plotly_chart(fig_distribution, use_container_width=True)
+
+    st.markdown("### 🏆 Top Ligands by Docking Score")
+    ranking_dataset = st.selectbox("Dataset:", list(docking_summary["Dataset"]), key="ranking_dataset")
+    top = score_index.top_ligands(valid[valid["Dataset"] == ranking_dataset], n=10)
+    st.dataframe(top[["CASRN", "Vina Score", "Ligand Atoms", "File"]], use_container_width=True, hide_index=True)
+
     # Chart: Descriptor Comparison (means only)
     st.markdown("### 🧬 Descriptor Comparison")
-    desc_data = pd.DataFrame({
-        "Dataset": ["CE Ligands", "Alpha TB", "Beta TB"],
-        "LogP": [5.727246377, 6.01, 5.519036232],
-        "MW": [505.3214551, 507.02, 568.5555623],
-        "PSA": [41.26086957, 17.08, 16.73855072]
-    })
+    desc_data = df_summary
     # LogP
     fig_logp = go.Figure()
     for i, row in desc_data.iterrows():
@@ -906,6 +1140,70 @@ def show_data_analysis_dashboard():
     - **Beta TB** ligands have lower LogP and PSA but higher MW than Alpha TB.
     """)
 
+def show_residue_contacts():
+    st.markdown("## 🔗 Residue Contact Frequency")
+    st.markdown("Which receptor residues contact the docked PFAS ligands most often in each dataset.")
+
+    datasets = {
+        "ERα Commonly Exposed": "Alpha_CE_Combined",
+        "ERβ Commonly Exposed": "Beta_CE_Combined",
+        "ERα Top Binders": "Alpha_TB_Combined",
+        "ERβ Top Binders": "Beta_TB_Combined",
+    }
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        dataset = st.selectbox("Dataset:", list(datasets), key="contacts_dataset")
+    with col2:
+        cutoff = st.slider("Contact distance (Å):", 3.0, 6.0, contact_matrix.DEFAULT_CUTOFF, 0.5, key="contacts_cutoff")
+    with col3:
+        min_frequency = st.slider("Minimum contact frequency:", 0.0, 1.0, 0.2, 0.05, key="contacts_min_frequency")
+
+    folder_name = datasets[dataset]
+    manifest = load_dataset_manifest(folder_name)
+    if manifest is None:
+        st.error(f"Dataset folder '{folder_name}' not found.")
+        return
+    contacts = load_contact_matrix(folder_name, cutoff, manifest["hash"])
+    frequency = contacts.residue_frequency()
+    columns = np.flatnonzero((frequency >= min_frequency) & (frequency > 0))
+    if not len(columns):
+        st.warning("No residues reach the minimum contact frequency; lower the threshold.")
+        return
+
+    matrix = contacts.dense()[:, columns]
+    labels = np.array(contacts.residue_labels())[columns]
+    residue_order = st.radio("Residue order:", ["Sequence", "Clustered"], horizontal=True, key="contacts_order")
+    if residue_order == "Clustered":
+        column_order = contact_matrix.cluster_order(matrix.T)
+        matrix, labels, columns = matrix[:, column_order], labels[column_order], columns[column_order]
+    row_order = contact_matrix.cluster_order(matrix)
+    ligands = np.array(contacts.ligands)[row_order]
+    matrix = matrix[row_order]
+
+    st.caption(f"{len(columns)} of {len(contacts.residues)} residues shown · {contacts.shape[0]} ligands · "
+               f"ligands clustered by shared contacts (Jaccard, average linkage)")
+
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.22, 0.78], vertical_spacing=0.02)
+    fig.add_trace(go.Bar(x=labels, y=frequency[columns], marker_color="#2563eb", showlegend=False,
+                         hovertemplate="%{x}: %{y:.0%} of ligands<extra></extra>"), row=1, col=1)
+    fig.add_trace(go.Heatmap(z=matrix.astype(int), x=labels, y=ligands, colorscale=[[0, "#f9fafb"], [1, "#e11d48"]],
+                             showscale=False, xgap=1, ygap=1,
+                             hovertemplate="%{y} – %{x}<extra></extra>"), row=2, col=1)
+    fig.update_yaxes(title_text="Frequency", tickformat=".0%", row=1, col=1)
+    fig.update_yaxes(title_text="Ligand (CASRN)", autorange="reversed", row=2, col=1)
+    fig.update_xaxes(tickangle=-60, row=2, col=1)
+    fig.update_layout(height=max(500, 14 * len(ligands) + 220), margin=dict(t=30))
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("### 🏅 Most Frequently Contacted Residues")
+    counts = contacts.residue_counts()
+    top = np.argsort(-counts, kind="stable")[:15]
+    st.dataframe(pd.DataFrame({
+        "Residue": np.array(contacts.residue_labels())[top],
+        "Ligands in Contact": counts[top],
+        "Frequency": [f"{value:.0%}" for value in frequency[top]],
+    }), use_container_width=True, hide_index=True)
+
 def show_about_page():
     st.markdown("## About QSPR/QSAR Molecular Visualization Tool")
     st.markdown("""
@@ -0,0 +1,234 @@
+"""
+QSPR regression engine for the ERα / ERβ x Top Binders / Commonly Exposed models.
+
+Fits the multiple linear regression pIC50 ~ descriptors behind Tables S3
+(Top Binders ERα), S4 (Top Binders ERβ) and S5 (Commonly Exposed, ERα and
+ERβ pIC50) on their Training rows; with the default descriptors the fits
+reproduce the tables' Predicted pIC50 columns. Descriptors and pIC50 are
+standardized (z-scores) in NumPy and the least-squares problem is solved
+with a QR decomposition (lstsq when a descriptor set is rank deficient), so
+the standardized coefficients compare across descriptors and models.
+
+Fitted models are cached in memory by a hash of their input arrays, so
+refitting on a subset or with another descriptor set takes milliseconds
+the first time and nothing after that.
+
+    python qspr_models.py
+    python qspr_models.py --descriptors LogD HOMO LUMO "Average Mass" --outliers 0.1
+"""
+
+import argparse
+import hashlib
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import supplementary_tables
+
+# model -> (table, pIC50 column, published prediction column)
+MODELS = {
+    "Top Binders ERα": ("S3", "pIC50", "Predicted pIC50"),
+    "Top Binders ERβ": ("S4", "pIC50", "Predicted pIC50"),
+    "Commonly Exposed ERα": ("S5", "ERα pIC50", "Predicted Alpha pIC50"),
+    "Commonly Exposed ERβ": ("S5", "ERβ pIC50", "Predicted Beta pIC50"),
+}
+# descriptor -> workbook column (matched with supplementary_tables.find_column)
+DESCRIPTORS = {
+    "# of H-Bond Acceptors": "#H bond acceptors",
+    "# of H-Bond Donors": "#H bond donors",
+    "LogD": "ACD/LogD (pH 7.4)",
+    "Average Mass": "Average Mass (g/mol)",
+    "Density": "Density (g/cm³)",
+    "F+ Max": "F+ Max",
+    "HOMO": "HOMO (eV)",
+    "LUMO": "LUMO (eV)",
+    "Polar Surface Area": "Polar Surface Area (Å²)",
+    "Surface Tension": "Surface Tension (dyne/cm)",
+    "# of Freely Rotating Bonds": "#Freely Rotating Bonds",
+}
+TRAINING, TEST = "Training", "Test"
+CACHE_SIZE = 256
+
+_fit_cache = OrderedDict()
+
+
+class MLRModel:
+    """Fitted multiple linear regression pIC50 = intercept + X @ coefficients."""
+
+    def __init__(self, descriptors, intercept, coefficients, standardized, n, r2, rank):
+        self.descriptors = list(descriptors)
+        self.intercept = intercept
+        self.coefficients = coefficients # per descriptor unit
+        self.standardized = standardized # per standard deviation, in standard deviations of pIC50
+        self.n = n
+        self.r2 = r2
+        self.rank = rank
+
+    def predict(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[self.descriptors]
+        return self.intercept + np.asarray(X, dtype=float) @ self.coefficients
+
+    def coefficient_series(self, standardized=True):
+        return pd.Series(self.standardized if standardized else self.coefficients, index=self.descriptors)
+
+
+def _fit_key(X, y, descriptors):
+    digest = hashlib.sha1()
+    digest.update(repr((X.shape, list(descriptors))).encode())
+    digest.update(X.tobytes())
+    digest.update(y.tobytes())
+    return digest.hexdigest()
+
+
+def _solve(Z, t):
+    """Least-squares Z @ beta = t; return (beta, rank).
+
+    QR when Z has full column rank, otherwise the minimum-norm lstsq
+    solution (e.g. a descriptor that is constant on the fitted rows).
+    """
+    q, r = np.linalg.qr(Z)
+    diagonal = np.abs(np.diag(r))
+    if len(diagonal) == Z.shape[1] and diagonal.min() > 1e-10 * max(diagonal.max(), 1.0):
+        return np.linalg.solve(r, q.T @ t), Z.shape[1]
+    beta, _, rank, _ = np.linalg.lstsq(Z, t, rcond=None)
+    return beta, rank
+
+
+def fit(X, y, descriptors):
+    """Fit y on the columns of X (named by descriptors); return an MLRModel, cached by input hash."""
+    X = np.ascontiguousarray(X, dtype=float)
+    y = np.ascontiguousarray(y, dtype=float)
+    if X.ndim != 2 or X.shape[1] != len(descriptors) or len(y) != len(X):
+        raise ValueError(f"X {X.shape} does not match y ({len(y)}) and {len(descriptors)} descriptors")
+    if len(y) < 2:
+        raise ValueError("at least 2 rows are needed to fit a model")
+    key = _fit_key(X, y, descriptors)
+    if key in _fit_cache:
+        _fit_cache.move_to_end(key)
+        return _fit_cache[key]
+
+    x_mean, y_mean = X.mean(axis=0), y.mean()
+    x_scale = X.std(axis=0, ddof=1)
+    x_scale[x_scale == 0] = 1.0 # A constant column centers to zeros and gets a zero coefficient
+    y_scale = y.std(ddof=1) or 1.0
+    beta, rank = _solve((X - x_mean) / x_scale, (y - y_mean) / y_scale)
+    coefficients = beta * y_scale / x_scale
+    intercept = y_mean - x_mean @ coefficients
+    residual = y - (intercept + X @ coefficients)
+    total = ((y - y_mean) ** 2).sum()
+    r2 = 1 - (residual ** 2).sum() / total if total else float("nan")
+    model = MLRModel(descriptors, intercept, coefficients, beta, len(y), r2, rank)
+
+    _fit_cache[key] = model
+    if len(_fit_cache) > CACHE_SIZE:
+        _fit_cache.popitem(last=False)
+    return model
+
+
+def model_data(model):
+    """Return the table rows of a model: CASRN, pIC50, Set, Published Prediction and the descriptors."""
+    table_id, target, predicted = MODELS[model]
+    available = supplementary_tables.table_columns(table_id)
+    columns = {"CASRN": "CASRN", target: "pIC50", "Set": "Set", predicted: "Published Prediction"}
+    for name, workbook_name in DESCRIPTORS.items():
+        column = supplementary_tables.find_column(available, workbook_name)
+        if column is None:
+            raise KeyError(f"Table {table_id} has no column for {name} ({workbook_name})")
+        columns[column] = name
+    data = supplementary_tables.read_table(table_id, columns=list(columns)).rename(columns=columns)
+    return data.dropna(subset=["pIC50", *DESCRIPTORS]).reset_index(drop=True)
+
+
+def fit_rows(data, fit_set=TRAINING):
+    """Boolean mask of the rows a model is fitted on (fit_set None = every row)."""
+    if fit_set is None:
+        return np.ones(len(data), dtype=bool)
+    return (data["Set"] == fit_set).to_numpy(dtype=bool)
+
+
+def fit_model(data, descriptors=None, fit_set=TRAINING, outlier_fraction=0.0):
+    """Fit pIC50 on descriptors over the fit_set rows of data; return (model, fitted row mask).
+
+    With outlier_fraction > 0, the model is refitted without that fraction
+    of fitted rows with the largest absolute residuals.
+    """
+    descriptors = list(descriptors or DESCRIPTORS)
+    rows = fit_rows(data, fit_set)
+    X = data[descriptors].to_numpy(dtype=float)
+    y = data["pIC50"].to_numpy(dtype=float)
+    model = fit(X[rows], y[rows], descriptors)
+    drop = int(round(outlier_fraction * rows.sum()))
+    if drop:
+        residual = np.where(rows, np.abs(y - model.predict(X)), -np.inf)
+        rows = rows.copy()
+        rows[np.argsort(-residual, kind="stable")[:drop]] = False
+        model = fit(X[rows], y[rows], descriptors)
+    return model, rows
+
+
+def _r2(y, predicted):
+    if len(y) < 2:
+        return float("nan")
+    total = ((y - y.mean()) ** 2).sum()
+    return 1 - ((y - predicted) ** 2).sum() / total if total else float("nan")
+
+
+def evaluate(model, data, fitted_rows=None):
+    """R², RMSE and row count of a model on its fitted rows and on the Test rows.
+
+    Only Test rows left out of the fit are scored, so a model fitted on every
+    row has no Test metrics (NaN, n 0) rather than in-sample ones.
+    """
+    y = data["pIC50"].to_numpy(dtype=float)
+    predicted = model.predict(data)
+    fitted_rows = fit_rows(data) if fitted_rows is None else fitted_rows
+    test_rows = fit_rows(data, TEST) & ~fitted_rows
+    scores = {}
+    for label, rows in (("Train", fitted_rows), ("Test", test_rows)):
+        scores[f"R² ({label})"] = _r2(y[rows], predicted[rows])
+        scores[f"RMSE ({label})"] = float(np.sqrt(np.mean((y[rows] - predicted[rows]) ** 2))) if rows.any() else float("nan")
+        scores[f"n ({label})"] = int(rows.sum())
+    return scores
+
+
+def coefficient_table(fits):
+    """Standardized coefficients of {model name: MLRModel} as a Descriptor x model DataFrame."""
+    table = pd.DataFrame({name: model.coefficient_series() for name, model in fits.items()})
+    order = [name for name in DESCRIPTORS if name in table.index]
+    return table.loc[order].rename_axis("Descriptor")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the QSPR models of Tables S3-S5 and print their coefficients.")
+    parser.add_argument("--descriptors", nargs="+", choices=list(DESCRIPTORS), default=None,
+                        help="descriptor set to fit (default: all)")
+    parser.add_argument("--all-rows", action="store_true", help="fit on Training and Test rows")
+    parser.add_argument("--outliers", type=float, default=0.0, help="fraction of largest residuals to drop and refit")
+    args = parser.parse_args()
+
+    pd.set_option("display.width", 160)
+    fits, scores = {}, {}
+    for name in MODELS:
+        data = model_data(name)
+        start = time.perf_counter()
+        model, rows = fit_model(data, args.descriptors, None if args.all_rows else TRAINING, args.outliers)
+        elapsed = time.perf_counter() - start
+        fits[name] = model
+        scores[name] = evaluate(model, data, rows)
+        if args.descriptors is None and not args.all_rows and not args.outliers:
+            difference = np.abs(model.predict(data) - data["Published Prediction"]).max()
+            scores[name]["Max |Δ| vs published"] = difference
+        scores[name]["Fit (ms)"] = elapsed * 1000
+    print("Standardized coefficients:")
+    print(coefficient_table(fits).round(4).to_string())
+    print()
+    print(pd.DataFrame(scores).T.astype({"n (Train)": int, "n (Test)": int}).round(4).to_string())
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,136 @@
+"""
+Docking score index built from the Vina REMARK records of the complex files.
+
+Each complex's ligand block starts with "REMARK VINA RESULT" (and, for some
+TB files, INTER + INTRA / INTER / INTRA / UNBOUND energies). The energies are
+extracted by dataset_manifest (which only reads the REMARK lines up to the
+first ligand atom) and stored per file with its SHA-256, so a file is only
+re-read when it is new or its content changed. This module turns the
+manifests into one typed table for the dashboard.
+
+    python score_index.py            # summary per dataset
+    python score_index.py --csv scores.csv
+"""
+
+import argparse
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+import complex_pack
+import dataset_manifest
+
+# column -> dtype of the score table
+SCORE_COLUMNS = {
+    "Dataset": "string",
+    "Receptor": "string",
+    "Set": "string",
+    "CASRN": "string",
+    "File": "string",
+    "Vina Score": "float64",
+    "Inter + Intra": "float64",
+    "Inter": "float64",
+    "Intra": "float64",
+    "Unbound": "float64",
+    "Ligand Atoms": "int32",
+    "SHA256": "string",
+}
+_ENERGY_COLUMNS = dict(zip(dataset_manifest.ENERGY_FIELDS, ["Vina Score", "Inter + Intra", "Inter", "Intra", "Unbound"]))
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def describe_dataset(folder):
+    """Return (receptor, set) labels for a dataset folder, e.g. ("Alpha", "TB")."""
+    receptor, set_name = Path(folder).name.split("_")[:2]
+    return receptor, set_name
+
+
+def _build_table(folder, manifest):
+    receptor, set_name = describe_dataset(folder)
+    rows = []
+    for entry in manifest["ligands"]:
+        row = {
+            "Dataset": manifest["folder"],
+            "Receptor": receptor,
+            "Set": set_name,
+            "CASRN": entry["casrn"],
+            "File": entry["file_name"],
+            "Ligand Atoms": entry["ligand_atoms"],
+            "SHA256": entry["sha256"],
+        }
+        for field, column in _ENERGY_COLUMNS.items():
+            row[column] = entry[field]
+        rows.append(row)
+    return pd.DataFrame(rows, columns=list(SCORE_COLUMNS)).astype(SCORE_COLUMNS)
+
+
+def score_table(folder, refresh=True):
+    """Return the typed score table for one dataset folder.
+
+    With refresh=True the folder's manifest is brought up to date first (a
+    stat when nothing changed; only new or modified files are read). The
+    table itself is rebuilt only when the manifest hash changes.
+    """
+    folder_path = Path(folder)
+    if refresh:
+        manifest = dataset_manifest.refresh_manifest(folder_path)
+    else:
+        manifest = dataset_manifest.get_manifest(folder_path)
+    if manifest is None:
+        return pd.DataFrame(columns=list(SCORE_COLUMNS)).astype(SCORE_COLUMNS)
+
+    key = str(folder_path.resolve())
+    with _tables_lock:
+        cached = _tables.get(key)
+        if cached is None or cached[0] != manifest["hash"]:
+            cached = _tables[key] = (manifest["hash"], _build_table(folder_path, manifest))
+    return cached[1]
+
+
+def score_index(folders=None, refresh=True):
+    """Return the score tables of all dataset folders concatenated."""
+    folders = folders or complex_pack.DATASET_FOLDERS
+    return pd.concat([score_table(folder, refresh) for folder in folders], ignore_index=True)
+
+
+def valid_scores(scores, column="Vina Score"):
+    """Drop poses with a non-negative score (clashing poses, e.g. +1.6e5 kcal/mol)."""
+    return scores[scores[column] < 0]
+
+
+def summarize(scores, column="Vina Score"):
+    """Per-dataset count, mean, std, median, min and max of a score column."""
+    summary = scores.groupby("Dataset", sort=False)[column].agg(["count", "mean", "std", "median", "min", "max"])
+    summary.columns = ["Ligands", "Mean", "Std", "Median", "Best", "Worst"]
+    return summary.reset_index()
+
+
+def top_ligands(scores, n=10, column="Vina Score"):
+    """Return the n best (most negative) scoring ligands of each dataset."""
+    ranked = scores.sort_values(column, kind="stable")
+    return ranked.groupby("Dataset", sort=False).head(n).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the docking score index from the complex files.")
+    parser.add_argument("folders", nargs="*", default=complex_pack.DATASET_FOLDERS)
+    parser.add_argument("--csv", help="write the full score table to this file")
+    args = parser.parse_args()
+
+    scores = score_index(args.folders)
+    invalid = len(scores) - len(valid_scores(scores))
+    if invalid:
+        print(f"Excluding {invalid} pose(s) with a non-negative Vina score")
+    print(summarize(valid_scores(scores)).to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    if args.csv:
+        scores.to_csv(args.csv, index=False)
+        print(f"Saved {len(scores)} rows to {args.csv}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,44 @@
+"""
+Content-addressed structure files for the NGL viewer.
+
+Structures are written once as gzip-compressed files under static/structures/,
+named by their SHA-256 hash, and served by Streamlit's static file handler
+(server.enableStaticServing in .streamlit/config.toml). Because a URL always
+refers to the same bytes, the browser can cache it indefinitely and a
+revisited ligand is answered from cache or with a 304, instead of re-sending
+the whole structure inside the page HTML.
+"""
+
+import gzip
+import hashlib
+import os
+from pathlib import Path
+
+STATIC_DIR = Path(__file__).parent / "static"
+STRUCTURE_DIR = STATIC_DIR / "structures"
+# Streamlit serves <app dir>/static/* at app/static/*; relative so it also works under a base URL path.
+# The ngl_viewer component resolves it against the app path, not its own /component/... URL.
+STATIC_URL_PREFIX = "app/static/"
+
+
+def structure_url(file_name):
+    return f"{STATIC_URL_PREFIX}structures/{file_name}"
+
+
+def publish_structure(data, content_hash=None, ext="pdb"):
+    """Write data (bytes) to the static structure cache and return its URL.
+
+    content_hash can be passed when it is already known (e.g. from the
+    dataset manifest) to skip hashing the data again.
+    """
+    if content_hash is None:
+        content_hash = hashlib.sha256(data).hexdigest()
+    file_name = f"{content_hash[:24]}.{ext}.gz"
+    path = STRUCTURE_DIR / file_name
+    if not path.exists():
+        STRUCTURE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{file_name}.{os.getpid()}.tmp")
+        # mtime=0 keeps the compressed bytes (and so the ETag) stable across rebuilds
+        tmp_path.write_bytes(gzip.compress(data, compresslevel=6, mtime=0))
+        tmp_path.replace(path)
+    return structure_url(file_name)
@@ -0,0 +1,220 @@
+"""
+Compact binary transfer format for structures sent to the browser viewer.
+
+PDB text is mostly fixed-width padding; this encoding keeps only what the
+viewer needs:
+    - coordinates quantized to 0.001 A (the PDB precision), delta-coded as
+      int16 with an int32 escape list for the rare larger jumps
+    - dictionary-encoded atom names, residue names, elements and chain IDs
+    - residues as runs (number, name, atom count, ATOM/HETATM flag)
+    - chains as runs of residues
+    - CONECT bonds as atom index pairs (uint16 when there are < 65536 atoms)
+      with a bond order
+
+Occupancy, B-factor, alternate locations and REMARK records are dropped.
+The matching decoder used by the viewer lives in
+ngl_viewer_frontend/structure_codec.js; decode_structure/to_pdb below mirror
+it so the round trip can be checked from Python.
+
+Layout (little-endian):
+    b"QSB1" | uint32 header length | JSON header (padded to 4 bytes) | arrays
+Arrays follow in array_layout(header) order (widest types first, so every
+array is aligned for typed-array views); lengths come from the header counts.
+"""
+
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"QSB1"
+COORD_SCALE = 1000
+_HEADER_LENGTH = struct.Struct("<I")
+
+COORD_ESCAPE = -32768
+
+# (array name, dtype, count key, values per item); "index" is uint16 or uint32 depending on the atom count
+ARRAY_FIELDS = [
+    ("coords", np.int16, "atoms", 3),
+    ("coord_escapes", np.int32, "escapes", 1),
+    ("res_seq", np.int32, "residues", 1),
+    ("chain_residues", np.uint32, "chains", 1),
+    ("bonds", "index", "bonds", 2),
+    ("atom_name", np.uint16, "atoms", 1),
+    ("res_name", np.uint16, "residues", 1),
+    ("res_atoms", np.uint16, "residues", 1),
+    ("element", np.uint8, "atoms", 1),
+    ("res_hetero", np.uint8, "residues", 1),
+    ("chain_id", np.uint8, "chains", 1),
+    ("bond_order", np.uint8, "bonds", 1),
+]
+
+
+def array_layout(header):
+    """Return [(name, dtype, length)] in storage order for a decoded header."""
+    layout = []
+    for name, dtype, count_key, width in ARRAY_FIELDS:
+        if dtype == "index":
+            dtype = np.uint16 if header["index_bytes"] == 2 else np.uint32
+        layout.append((name, np.dtype(dtype).newbyteorder("<"), header[count_key] * width))
+    # Stable sort keeps ARRAY_FIELDS order within each item size
+    return sorted(layout, key=lambda item: -item[1].itemsize)
+
+
+class _Dictionary:
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def add(self, value):
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+def _parse_conect(line):
+    fields = [line[i:i + 5].strip() for i in range(6, min(len(line), 31), 5)]
+    serials = [int(field) for field in fields if field]
+    if not serials:
+        return None, []
+    return serials[0], serials[1:]
+
+
+def encode_structure(pdb_data):
+    """Encode PDB bytes into the compact binary format."""
+    atom_names, res_names, elements, chain_ids = _Dictionary(), _Dictionary(), _Dictionary(), _Dictionary()
+    coords, atom_name, element = [], [], []
+    res_seq, res_name, res_atoms, res_hetero = [], [], [], []
+    chain_id, chain_residues = [], []
+    bond_orders = {}
+    serial_to_index = {}
+    last_residue = None
+
+    for line in pdb_data.splitlines():
+        record = line[:6]
+        if record in (b"ATOM  ", b"HETATM"):
+            index = len(atom_name)
+            hetero = record == b"HETATM"
+            name = line[12:16].strip().decode()
+            chain = line[21:22].decode().strip()
+            residue = (chain, line[22:27], line[17:20], hetero)
+            if residue != last_residue:
+                if not chain_id or chain_ids.values[chain_id[-1]] != chain:
+                    chain_id.append(chain_ids.add(chain))
+                    chain_residues.append(0)
+                chain_residues[-1] += 1
+                res_seq.append(int(line[22:26] or 0))
+                res_name.append(res_names.add(line[17:20].strip().decode()))
+                res_atoms.append(0)
+                res_hetero.append(1 if hetero else 0)
+                last_residue = residue
+            res_atoms[-1] += 1
+            coords.append((line[30:38], line[38:46], line[46:54]))
+            atom_name.append(atom_names.add(name))
+            element.append(elements.add(line[76:78].strip().decode() or name[:1]))
+            # Serials restart in each block of a combined complex; CONECT records follow their block
+            serial_to_index[int(line[6:11])] = index
+        elif record == b"CONECT":
+            serial, partners = _parse_conect(line)
+            if serial not in serial_to_index:
+                continue
+            a = serial_to_index[serial]
+            for partner in partners:
+                b = serial_to_index.get(partner)
+                if b is None or b == a:
+                    continue
+                key = (min(a, b), max(a, b))
+                # Each direction lists the bond; repeated partners mark double/triple bonds
+                bond_orders.setdefault(key, {}).setdefault(a, 0)
+                bond_orders[key][a] += 1
+        elif record == b"MODEL " or record.startswith(b"END"):
+            last_residue = None
+
+    quantized = np.rint(np.array(coords, dtype=np.float64).reshape(-1, 3) * COORD_SCALE).astype(np.int64)
+    deltas = np.diff(quantized, axis=0, prepend=np.zeros((1, 3), dtype=np.int64)).ravel()
+    escaped = (deltas <= COORD_ESCAPE) | (deltas > np.iinfo(np.int16).max)
+    escapes = deltas[escaped]
+    deltas[escaped] = COORD_ESCAPE
+    bonds = sorted(bond_orders)
+    arrays = {
+        "coords": deltas,
+        "coord_escapes": escapes,
+        "res_seq": res_seq,
+        "chain_residues": chain_residues,
+        "bonds": bonds,
+        "atom_name": atom_name,
+        "res_name": res_name,
+        "res_atoms": res_atoms,
+        "element": element,
+        "res_hetero": res_hetero,
+        "chain_id": chain_id,
+        "bond_order": [max(bond_orders[key].values()) for key in bonds],
+    }
+    header = {
+        "atoms": len(atom_name),
+        "residues": len(res_seq),
+        "chains": len(chain_id),
+        "bonds": len(bonds),
+        "escapes": len(escapes),
+        "index_bytes": 2 if len(atom_name) <= np.iinfo(np.uint16).max else 4,
+        "atom_names": atom_names.values,
+        "res_names": res_names.values,
+        "elements": elements.values,
+        "chain_ids": chain_ids.values,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    header_bytes += b" " * (-len(header_bytes) % 4)
+    parts = [MAGIC, _HEADER_LENGTH.pack(len(header_bytes)), header_bytes]
+    for name, dtype, length in array_layout(header):
+        parts.append(np.asarray(arrays[name], dtype=dtype).reshape(length).tobytes())
+    return b"".join(parts)
+
+
+def decode_structure(data):
+    """Decode the binary format into (header, dict of arrays) with absolute coordinates."""
+    if data[:4] != MAGIC:
+        raise ValueError("Not a QSB1 structure")
+    (header_length,) = _HEADER_LENGTH.unpack_from(data, 4)
+    offset = 8 + header_length
+    header = json.loads(data[8:offset])
+    arrays = {}
+    for name, dtype, length in array_layout(header):
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=length, offset=offset)
+        offset += arrays[name].nbytes
+    deltas = arrays["coords"].astype(np.int64)
+    deltas[deltas == COORD_ESCAPE] = arrays["coord_escapes"]
+    arrays["coords"] = np.cumsum(deltas.reshape(-1, 3), axis=0) / COORD_SCALE
+    arrays["bonds"] = arrays["bonds"].reshape(-1, 2)
+    return header, arrays
+
+
+def _format_atom_name(name, element):
+    # PDB convention: one-letter elements start in column 14 unless the name fills all four columns
+    if len(name) < 4 and len(element) == 1:
+        return f" {name:<3}"
+    return f"{name:<4}"
+
+
+def to_pdb(data):
+    """Rebuild minimal PDB text from the binary format (what the viewer loads)."""
+    header, arrays = decode_structure(data)
+    lines = []
+    residue_chain = np.repeat(arrays["chain_id"], arrays["chain_residues"])
+    atom = 0
+    for r, count in enumerate(arrays["res_atoms"]):
+        record = "HETATM" if arrays["res_hetero"][r] else "ATOM  "
+        res_name = header["res_names"][arrays["res_name"][r]]
+        chain = header["chain_ids"][residue_chain[r]] or " "
+        for _ in range(int(count)):
+            element = header["elements"][arrays["element"][atom]]
+            name = _format_atom_name(header["atom_names"][arrays["atom_name"][atom]], element)
+            x, y, z = arrays["coords"][atom]
+            lines.append(f"{record}{atom + 1:5d} {name} {res_name:>3} {chain}{int(arrays['res_seq'][r]):4d}    "
+                         f"{x:8.3f}{y:8.3f}{z:8.3f}  1.00  0.00          {element:>2}")
+            atom += 1
+    for (a, b), order in zip(arrays["bonds"], arrays["bond_order"]):
+        lines.extend([f"CONECT{int(a) + 1:5d}{int(b) + 1:5d}"] * int(order))
+    lines.append("END")
+    return "\n".join(lines) + "\n"
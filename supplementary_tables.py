@@ -0,0 +1,195 @@
+"""
+Cached Parquet copies of the Supplementary Table workbooks.
+
+Parsing the .xlsx files with openpyxl takes 0.2-3 s per workbook. The first
+time a workbook is read (or after its content changes) every sheet is
+converted to Parquet under table_cache/<table>/<content hash>/; later reads
+go straight to Parquet and only load the requested columns.
+
+    from supplementary_tables import read_table
+    ce = read_table("S5", columns=["CASRN", "ERα Docking Score (kcal/mol)"])
+
+Convert all workbooks up front with:
+    python supplementary_tables.py
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import shutil
+import sys
+import time
+import unicodedata
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent
+CACHE_DIR = BASE_DIR / "table_cache"
+CACHE_VERSION = 1
+
+_TABLE_FILE_RE = re.compile(r"^Supplementary Table .* \(Table (S[\w.]+)\)\.xlsx$")
+
+
+def find_tables(base_dir=BASE_DIR):
+    """Return {table id: workbook path}, e.g. {"S5": Path("Supplementary Table 5 (Table S5).xlsx")}."""
+    tables = {}
+    for path in Path(base_dir).glob("Supplementary Table *.xlsx"):
+        match = _TABLE_FILE_RE.match(path.name)
+        if match:
+            tables[match.group(1)] = path
+    return dict(sorted(tables.items(), key=lambda item: _table_sort_key(item[0])))
+
+
+def _table_sort_key(table_id):
+    # S2 before S10, S8.a before S8.b
+    return [int(part) if part.isdigit() else part for part in re.findall(r"\d+|\D+", table_id[1:])]
+
+
+def _file_hash(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _sheet_file_name(index, sheet):
+    return f"{index:02d}_{re.sub(r'[^A-Za-z0-9]+', '_', sheet).strip('_')}.parquet"
+
+
+def _normalize_column(column):
+    """Make a workbook column storable as a single Parquet type."""
+    if column.dtype != object and not pd.api.types.is_string_dtype(column):
+        return column
+    values = column.dropna()
+    numeric = pd.to_numeric(values, errors="coerce")
+    if len(values) and numeric.notna().all():
+        # Numbers typed as text (e.g. the docking scores in Table S11)
+        return pd.to_numeric(column, errors="coerce")
+    return column.map(lambda value: value if pd.isna(value) else str(value)).astype("string")
+
+
+def _normalize_sheet(frame):
+    frame = frame.dropna(how="all").dropna(axis=1, how="all")
+    frame.columns = [str(name).strip() for name in frame.columns]
+    return frame.apply(_normalize_column).reset_index(drop=True)
+
+
+def _read_meta(cache_path):
+    try:
+        meta = json.loads((cache_path / "sheets.json").read_text())
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == CACHE_VERSION else None
+
+
+def convert_table(table_id, path, cache_dir=CACHE_DIR, content_hash=None):
+    """Convert every sheet of a workbook to Parquet and return the cache metadata."""
+    content_hash = content_hash or _file_hash(path)
+    table_dir = Path(cache_dir) / table_id
+    cache_path = table_dir / content_hash[:16]
+    tmp_path = table_dir / f"{content_hash[:16]}.tmp"
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    tmp_path.mkdir(parents=True)
+
+    with warnings.catch_warnings():
+        # openpyxl warns about cells with out-of-range date formats (Table S1); they are kept as text
+        warnings.simplefilter("ignore", UserWarning)
+        sheets = pd.read_excel(path, sheet_name=None, engine="openpyxl")
+
+    meta = {"version": CACHE_VERSION, "table": table_id, "workbook": Path(path).name, "sha256": content_hash, "sheets": []}
+    for index, (sheet, frame) in enumerate(sheets.items()):
+        frame = _normalize_sheet(frame)
+        file_name = _sheet_file_name(index, sheet)
+        frame.to_parquet(tmp_path / file_name, index=False)
+        meta["sheets"].append({"name": sheet, "file": file_name, "rows": len(frame), "columns": list(frame.columns)})
+    (tmp_path / "sheets.json").write_text(json.dumps(meta, indent=1, ensure_ascii=False))
+
+    # Replace any cache built from an older version of the workbook
+    for old in table_dir.iterdir():
+        if old != tmp_path and old.is_dir():
+            shutil.rmtree(old)
+    tmp_path.rename(cache_path)
+    return meta
+
+
+def table_meta(table_id, cache_dir=CACHE_DIR):
+    """Return the cache metadata for a table, converting the workbook if needed."""
+    tables = find_tables()
+    if table_id not in tables:
+        raise KeyError(f"No workbook for table {table_id}")
+    path = tables[table_id]
+    content_hash = _file_hash(path)
+    cache_path = Path(cache_dir) / table_id / content_hash[:16]
+    meta = _read_meta(cache_path)
+    if meta is None or meta["sha256"] != content_hash:
+        meta = convert_table(table_id, path, cache_dir, content_hash)
+    meta["path"] = cache_path
+    return meta
+
+
+def sheet_names(table_id):
+    return [sheet["name"] for sheet in table_meta(table_id)["sheets"]]
+
+
+def _sheet_info(meta, sheet):
+    sheets = meta["sheets"]
+    info = sheets[0] if sheet is None else next((s for s in sheets if s["name"] == sheet), None)
+    if info is None:
+        raise KeyError(f"Table {meta['table']} has no sheet {sheet!r}")
+    return info
+
+
+def table_columns(table_id, sheet=None):
+    """Return the column names of a sheet without reading its data."""
+    return list(_sheet_info(table_meta(table_id), sheet)["columns"])
+
+
+def find_column(columns, name):
+    """Return the column matching name, ignoring spaces, case, a trailing colon and Unicode variants.
+
+    The workbooks spell the same descriptor slightly differently, e.g.
+    "ACD/LogD (pH 7.4)" vs "ACD/LogD(pH 7.4)" or "#H bond donors:", and
+    write Å as the Angstrom sign (U+212B).
+    """
+    def key(text):
+        return re.sub(r"\s+", "", unicodedata.normalize("NFKC", text)).rstrip(":").lower()
+    wanted = key(name)
+    return next((column for column in columns if key(column) == wanted), None)
+
+
+def read_table(table_id, sheet=None, columns=None):
+    """Read one sheet of a supplementary table as a DataFrame.
+
+    sheet defaults to the first sheet; columns limits the read to those
+    columns (Parquet column projection).
+    """
+    meta = table_meta(table_id)
+    info = _sheet_info(meta, sheet)
+    return pd.read_parquet(meta["path"] / info["file"], columns=list(columns) if columns else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the Supplementary Table workbooks to cached Parquet.")
+    parser.add_argument("tables", nargs="*", help="table ids (default: all), e.g. S3 S5")
+    parser.add_argument("--force", action="store_true", help="reconvert even if the cache is current")
+    args = parser.parse_args()
+
+    tables = find_tables()
+    for table_id in args.tables or tables:
+        if table_id not in tables:
+            print(f"{table_id}: Missing")
+            continue
+        start = time.perf_counter()
+        if args.force:
+            meta = convert_table(table_id, tables[table_id])
+        else:
+            meta = table_meta(table_id)
+        elapsed = time.perf_counter() - start
+        sheets = ", ".join(f"{s['name']} ({s['rows']} x {len(s['columns'])})" for s in meta["sheets"])
+        print(f"{table_id}: {sheets} in {elapsed:.2f}s")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
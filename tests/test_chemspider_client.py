@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from chemspider_client import CHEMSPIDER_URL, REPLAY_MISS_STATUS, ChemSpiderClient, search_url
+from chemspider_stub_server import StubServer
+
+SEARCH_PATH = "/Search.aspx?q=335-67-1"
+RECORD_PATH = "/Chemical-Structure.9180.html"
+PAGES = {
+    SEARCH_PATH: "<h3>Found 1 result</h3>",
+    RECORD_PATH: "<span>C(=O)(C(C(F)(F)F)(F)F)O</span>",
+}
+
+
+@pytest.fixture
+def server():
+    with StubServer(PAGES) as stub:
+        yield stub
+
+
+def make_client(tmp_path, server, **kwargs):
+    options = dict(cache_path=tmp_path / "cache.sqlite", rate=0, backoff=0.01, base_url=server.url)
+    options.update(kwargs)
+    return ChemSpiderClient(**options)
+
+
+def test_base_url_keeps_chemspider_urls(tmp_path, server):
+    with make_client(tmp_path, server) as client:
+        response = client.get(search_url("335-67-1"))
+    assert response.status_code == 200
+    assert response.text == PAGES[SEARCH_PATH]
+    assert response.url == CHEMSPIDER_URL + SEARCH_PATH
+    assert server.hits(SEARCH_PATH) == 1
+
+
+def test_cache_answers_repeated_requests(tmp_path, server):
+    url = CHEMSPIDER_URL + RECORD_PATH
+    with make_client(tmp_path, server) as client:
+        first = client.get(url)
+        second, third = client.fetch_many([url, url])
+    assert not first.from_cache
+    assert second.from_cache and third.from_cache
+    assert second.text == first.text
+    assert server.hits(RECORD_PATH) == 1
+
+
+def test_replay_reads_only_the_cache(tmp_path, server):
+    url = CHEMSPIDER_URL + RECORD_PATH
+    with make_client(tmp_path, server) as client:
+        client.get(url)
+    with make_client(tmp_path, server, replay=True) as client:
+        cached = client.get(url)
+        missing = client.get(search_url("335-67-1"))
+    assert cached.from_cache and cached.text == PAGES[RECORD_PATH]
+    assert missing.status_code == REPLAY_MISS_STATUS and missing.error
+    assert server.hits(RECORD_PATH) == 1
+    assert server.hits(SEARCH_PATH) == 0
+
+
+def test_retries_server_errors(tmp_path, server):
+    server.queue_response(RECORD_PATH, 503, times=2)
+    with make_client(tmp_path, server, retries=3) as client:
+        response = client.get(CHEMSPIDER_URL + RECORD_PATH)
+    assert response.status_code == 200
+    assert server.hits(RECORD_PATH) == 3
+
+
+def test_gives_up_after_retries_and_does_not_cache(tmp_path, server):
+    server.queue_response(RECORD_PATH, 500, times=3)
+    with make_client(tmp_path, server, retries=2) as client:
+        failed = client.get(CHEMSPIDER_URL + RECORD_PATH)
+        retried = client.get(CHEMSPIDER_URL + RECORD_PATH)
+    assert failed.status_code == 500
+    assert retried.status_code == 200 and not retried.from_cache
+    assert server.hits(RECORD_PATH) == 4
+
+
+def test_honours_retry_after(tmp_path, server):
+    server.queue_response(RECORD_PATH, 429, headers={"Retry-After": "1"})
+    with make_client(tmp_path, server, retries=1, backoff=0) as client:
+        start = time.monotonic()
+        response = client.get(CHEMSPIDER_URL + RECORD_PATH)
+        elapsed = time.monotonic() - start
+    assert response.status_code == 200
+    assert elapsed >= 1.0
+    assert server.hits(RECORD_PATH) == 2
+
+
+def test_connection_errors_are_returned(tmp_path):
+    stub = StubServer(PAGES)
+    closed_url = stub.url
+    stub.stop() # Nothing listens on this port any more
+    with ChemSpiderClient(tmp_path / "cache.sqlite", rate=0, retries=1, backoff=0.01, base_url=closed_url) as client:
+        response = client.get(CHEMSPIDER_URL + RECORD_PATH)
+    assert response.status_code is None
+    assert response.error
+
+
+def test_serves_saved_pages_from_a_folder(tmp_path):
+    (tmp_path / "search").mkdir()
+    (tmp_path / "search" / "335-67-1.html").write_text(PAGES[SEARCH_PATH])
+    (tmp_path / "Chemical-Structure.9180.html").write_text(PAGES[RECORD_PATH])
+    with StubServer(tmp_path) as stub, make_client(tmp_path, stub) as client:
+        search, record, missing = client.fetch_many([search_url("335-67-1"), CHEMSPIDER_URL + RECORD_PATH,
+                                                     CHEMSPIDER_URL + "/Chemical-Structure.1.html"])
+    assert search.text == PAGES[SEARCH_PATH]
+    assert record.text == PAGES[RECORD_PATH]
+    assert missing.status_code == 404
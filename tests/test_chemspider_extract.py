@@ -0,0 +1,20 @@
+import pytest
+
+import chemspider_extract
+from chemspider_extract import RESULT_MESSAGE_ID, SMILES_SPAN_ID, extract
+
+# Unclosed <td> cells: html.parser (bs4) nests them, browsers and lxml close them at the next cell
+BROKEN_PAGE = (f'<h3 id="{RESULT_MESSAGE_ID}">Found 1 result</h3><span id="{SMILES_SPAN_ID}">OC(=O)C(F)(F)F</span>'
+               '<table><tr><td class="prop_title">Density:<td class="prop_value_nowrap">1.7 g/cm3</tr>'
+               '<tr><td class="prop_title">Boiling Point:</td><td class="prop_value">72 C</td></tr></table>')
+
+
+def test_default_backend_is_stream(monkeypatch):
+    monkeypatch.delenv("CHEMSPIDER_PARSER", raising=False)
+    assert chemspider_extract.default_backend() == "stream"
+
+
+def test_stream_matches_bs4_on_unclosed_cells():
+    pytest.importorskip("bs4")
+    assert extract(BROKEN_PAGE, "stream") == extract(BROKEN_PAGE, "bs4")
+    assert extract(BROKEN_PAGE) == extract(BROKEN_PAGE, "bs4")
@@ -0,0 +1,44 @@
+import pandas as pd
+
+from chemspider_client import ChemSpiderClient
+from chemspider_extract import RESULT_MESSAGE_ID, SMILES_SPAN_ID
+from chemspider_pipeline import LINK_COLUMN, STATUS_COLUMN, enrich
+from chemspider_stub_server import StubServer
+
+
+def record_page(smiles):
+    return (f'<h3 id="{RESULT_MESSAGE_ID}">Found 1 result</h3><span id="{SMILES_SPAN_ID}">{smiles}</span>'
+            '<table><tr><td class="prop_title">Density:</td><td class="prop_value_nowrap">1.7 g/cm3</td></tr></table>')
+
+
+PAGES = {
+    "/Search.aspx?q=335-67-1": record_page("OC(=O)C(F)(F)F"),
+    "/Search.aspx?q=375-95-1": record_page("OC(=O)C(F)(F)C(F)(F)F"),
+    "/Search.aspx?q=000-00-0": f'<h3 id="{RESULT_MESSAGE_ID}">Found 3 results</h3>',
+}
+
+
+def run(input_file, output_file, stub, cache_path):
+    with ChemSpiderClient(cache_path, rate=0, retries=1, backoff=0.01, base_url=stub.url) as client:
+        return list(enrich(input_file, output_file, properties=["Density"], batch_size=2, client=client))
+
+
+def test_rerun_retries_only_unresolved_chemicals(tmp_path):
+    input_file = tmp_path / "input.csv"
+    output_file = str(tmp_path / "output.csv")
+    pd.DataFrame({"CASRN": ["335-67-1", "375-95-1", "000-00-0"]}).to_csv(input_file, index=False)
+    with StubServer(PAGES) as stub:
+        stub.queue_response("/Search.aspx?q=375-95-1", 503, times=2)
+        run(input_file, output_file, stub, tmp_path / "cache.sqlite")
+        first = pd.read_csv(output_file, dtype=str).set_index("CASRN")[STATUS_COLUMN]
+        assert first.to_dict() == {"335-67-1": "ok", "375-95-1": "HTTP 503", "000-00-0": "no single result"}
+
+        run(input_file, output_file, stub, tmp_path / "cache.sqlite")
+        assert stub.hits("/Search.aspx?q=335-67-1") == 1 # Resolved chemicals are not fetched again
+        assert stub.hits("/Search.aspx?q=375-95-1") == 3
+
+    output = pd.read_csv(output_file, dtype=str)
+    assert sorted(output["CASRN"]) == ["000-00-0", "335-67-1", "375-95-1"] # One row per CASRN
+    statuses = output.set_index("CASRN")[STATUS_COLUMN]
+    assert statuses["375-95-1"] == "ok" and statuses["000-00-0"] == "no single result"
+    assert output.set_index("CASRN").loc["375-95-1", LINK_COLUMN].endswith("/Search.aspx?q=375-95-1")
@@ -0,0 +1,16 @@
+import hashlib
+
+import ngl_viewer
+
+
+def test_vendored_bundle_matches_pin():
+    data = ngl_viewer.NGL_BUNDLE_PATH.read_bytes()
+    assert hashlib.sha256(data).hexdigest() == ngl_viewer.NGL_SHA256
+    assert ngl_viewer.bundle_problem() is None
+
+
+def test_bundle_problem_reports_missing_and_modified_bundles(tmp_path):
+    assert "missing" in ngl_viewer.bundle_problem(tmp_path / "missing.js")
+    modified = tmp_path / "ngl.js"
+    modified.write_text("window.NGL = {};")
+    assert "checksum" in ngl_viewer.bundle_problem(modified)
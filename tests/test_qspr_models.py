@@ -0,0 +1,17 @@
+import math
+
+import qspr_models
+
+
+def test_test_metrics_only_score_held_out_rows():
+    data = qspr_models.model_data("Top Binders ERα")
+
+    model, rows = qspr_models.fit_model(data)
+    scores = qspr_models.evaluate(model, data, rows)
+    assert scores["n (Test)"] == int((data["Set"] == qspr_models.TEST).sum()) > 0
+    assert not math.isnan(scores["R² (Test)"])
+
+    model, rows = qspr_models.fit_model(data, fit_set=None)
+    scores = qspr_models.evaluate(model, data, rows)
+    assert scores["n (Test)"] == 0
+    assert math.isnan(scores["R² (Test)"]) and math.isnan(scores["RMSE (Test)"])
@@ -0,0 +1,51 @@
+import os
+
+import dataset_manifest
+import score_index
+
+RECEPTOR = b"ATOM      1  N   SER A 305      10.000  10.000  10.000  1.00  0.00           N\nEND\n"
+
+
+def write_complex(folder, casrn, score):
+    ligand = (f"MODEL 1\nREMARK VINA RESULT:    {score:5.1f}      0.000      0.000\n"
+              "HETATM    1  C   UNL     1       1.000   1.000   1.000  1.00  0.00           C\nENDMDL\n")
+    path = folder / f"combined_{casrn}_out.pdb"
+    path.write_bytes(RECEPTOR + ligand.encode())
+    return path
+
+
+def test_ranking_follows_a_complex_edited_in_place(tmp_path):
+    folder = tmp_path / "Alpha_TB_Combined"
+    folder.mkdir()
+    write_complex(folder, "50-28-2", -8.0)
+    edited = write_complex(folder, "57-63-6", -7.0)
+
+    top = score_index.top_ligands(score_index.score_table(folder))
+    assert list(top["CASRN"]) == ["50-28-2", "57-63-6"]
+
+    # Rewriting a file in place leaves the folder mtime (and the file size) unchanged
+    folder_mtime = folder.stat().st_mtime_ns
+    stat = edited.stat()
+    write_complex(folder, "57-63-6", -9.0)
+    os.utime(edited, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    os.utime(folder, ns=(folder.stat().st_atime_ns, folder_mtime))
+    assert edited.stat().st_size == stat.st_size
+
+    scores = score_index.score_table(folder)
+    assert list(score_index.top_ligands(scores)["CASRN"]) == ["57-63-6", "50-28-2"]
+    assert scores.set_index("CASRN").loc["57-63-6", "Vina Score"] == -9.0
+    manifest = dataset_manifest.refresh_manifest(folder)
+    assert {entry["casrn"]: entry["vina_score"] for entry in manifest["ligands"]}["57-63-6"] == -9.0
+
+
+def test_unchanged_folder_reuses_the_manifest(tmp_path):
+    folder = tmp_path / "Beta_CE_Combined"
+    folder.mkdir()
+    write_complex(folder, "50-28-2", -8.0)
+    manifest = dataset_manifest.refresh_manifest(folder)
+    written = dataset_manifest.manifest_path_for(folder).stat().st_mtime_ns
+    assert dataset_manifest.refresh_manifest(folder) == manifest
+    assert dataset_manifest.manifest_path_for(folder).stat().st_mtime_ns == written
+
+    write_complex(folder, "57-63-6", -7.0)
+    assert [entry["casrn"] for entry in dataset_manifest.refresh_manifest(folder)["ligands"]] == ["50-28-2", "57-63-6"]
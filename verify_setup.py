@@ -55,6 +55,52 @@ def check_data_files():
     print(f"✅ Total PDB files: {total_files}")
     return total_files > 0
 
+def check_complex_packs():
+    """Check that the packed complex files match the PDB folders."""
+    print("\n🗜️  Checking packed complexes...")
+
+    try:
+        import complex_pack
+    except Exception as e:
+        print(f"❌ complex_pack import error: {e}")
+        return False
+
+    ok = True
+    for folder in complex_pack.DATASET_FOLDERS:
+        if not complex_pack.pack_path_for(folder).exists():
+            print(f"⚠️  {folder}: No pack built yet (built on first launch, or run: python complex_pack.py)")
+            continue
+        try:
+            mismatches = complex_pack.verify_pack(folder)
+        except (OSError, ValueError) as e:
+            print(f"❌ {folder}: Unreadable pack: {e}")
+            ok = False
+            continue
+        if mismatches:
+            # Stale packs are rebuilt when the app opens them
+            print(f"⚠️  {folder}: Pack is out of date for {len(mismatches)} ligands (rebuilt on next launch)")
+        else:
+            print(f"✅ {folder}: Pack matches PDB files")
+    return ok
+
+def check_viewer_bundle():
+    """Check that the vendored NGL bundle is present and matches its pinned checksum."""
+    print("\n🧬 Checking 3D viewer bundle...")
+
+    try:
+        import ngl_viewer
+    except Exception as e:
+        print(f"❌ ngl_viewer import error: {e}")
+        return False
+
+    problem = ngl_viewer.bundle_problem()
+    if problem:
+        print(f"❌ {problem}")
+        print("   Restore it from git or run: python ngl_viewer.py --vendor")
+        return False
+    print(f"✅ NGL {ngl_viewer.NGL_VERSION} bundle - Checksum OK")
+    return True
+
 def check_application():
     """Check if the main application can be imported."""
     print("\n🔧 Checking application...")
@@ -99,6 +145,8 @@ def main():
         check_python_version,
         check_dependencies,
         check_data_files,
+        check_complex_packs,
+        check_viewer_bundle,
         check_application,
         check_launch_scripts
     ]